@@ -7,7 +7,17 @@
     simulation. By changing the parameters of a function, the model will be
     modified. We can observe the results of changing the constants here.
     
+    Every value of a parameter is simulated NUM_SIMS times. The simulations
+    are spread over a pool of processes (see sweep), each with its own
+    SimConfig and seed, so the Variables module is never modified.
+    The water and temperature layers of the world are made once for every
+    distinct world and shared with the workers through shared memory.
+    
     Functions:
+        sweep - Runs simulations for every value of a parameter in parallel
+        runSim - Runs one simulation of a sweep
+        average - Averages a result over the simulations of each value
+        driftReport - Compares float32 grids against float64 grids
         anRabToPlant - Changes amount of rabbits
         anLakeToRab - Changes size of lake
         anDissipationtoRab - Changes scent dissipation rate
@@ -34,6 +44,7 @@
 
 # Notes:
 # - Written for Python 3.7
+# - Needs Python 3.8 or newer for the shared memory of sweep (Shared.py)
 # - To test simply run the file in the canopy distribution of python
 #  or through some other IDE like visual studio or spyder
 # - Documentation style inspired by CSS 458 professor Johnny Lin
@@ -41,8 +52,170 @@
 #==============================================================================
 # PROGRAM IMPORTS _____________________________________________________________
 import Ecosystem as sim
+import Config as cf
+import Shared as sh
 import Variables as const
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+# SWEEP FUNCTIONS _____________________________________________________________
+# FUNCTION: sweep -------------------------------------------------------------
+def sweep(name, values, fixed=None, sims=None, weeks=None, seed=0,\
+          workers=None):
+    """ Description: Runs sims simulations for every value of a parameter.
+                     Each (value, replicate) pair is sent to a process pool
+                     with its own parameters and seed. Replicate j of every
+                     value uses the seed seed + j, so the values are compared
+                     on the same random draws.
+                     Simulations with the same world (see
+                     EcoSystem.worldKey) share its water and temperature
+                     layers: they are made once here and the workers attach
+                     to them read only.
+        
+        Variables:
+        -name: name of the Variables constant that is changed
+        -values: values given to the constant
+        -fixed: dictionary of other constants set for every simulation
+        -sims: simulations per value, NUM_SIMS by default
+        -weeks: weeks simulated, NUM_WEEKS by default
+        -seed: seed of the first replicate
+        -workers: number of processes, all cores by default. 1 runs the
+                  simulations in this process.
+        
+        Output: list with a list of results (see runSim) for every value,
+                in the order of values
+    """
+    if(sims is None):
+        sims = const.NUM_SIMS
+    if(weeks is None):
+        weeks = const.NUM_WEEKS
+    
+    #Workers get the world layers as shared memory specs, and the arrays
+    #of every world are dropped once they are published
+    arena = None if workers == 1 else sh.Arena()
+    try:
+        tasks = []
+        worlds = {}
+        for value in values:
+            overrides = dict(fixed or {})
+            overrides[name] = value
+            config = cf.SimConfig(**overrides)
+            for j in range(sims):
+                key = sim.EcoSystem.worldKey(config, seed + j)
+                if(key not in worlds):
+                    world = sim.EcoSystem.makeWorld(config, seed + j)
+                    if(arena is not None):
+                        world = {layer: arena.put('%d/%s' % (len(worlds),\
+                                                  layer), world[layer])\
+                                 for layer in world}
+                    worlds[key] = world
+                tasks.append((overrides, seed + j, weeks, worlds[key]))
+        
+        if(arena is None):
+            results = [runSim(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(runShared, tasks))
+    finally:
+        if(arena is not None):
+            arena.close()
+    
+    return [results[k * sims:(k + 1) * sims] for k in range(len(values))]
+
+# FUNCTION: runSim ------------------------------------------------------------
+def runSim(task):
+    """ Description: Runs one simulation of a sweep
+        
+        Variables:
+        -task: tuple of (constants to change, seed, weeks simulated, world
+               layers made by EcoSystem.makeWorld or None)
+        
+        Output: dictionary of the counters of the simulation
+    """
+    overrides, seed, weeks, world = task
+    eco = sim.EcoSystem(cf.SimConfig(**overrides), seed=seed, world=world)
+    for i in range(weeks):
+        eco.runAWeek()
+    
+    return {'herbivores': len(eco.fauna.herbivores()),
+            'carnivores': len(eco.fauna.carnivores()),
+            'plants': int(eco.plant_grid.sum()),
+            'plantsEaten': eco.plantsEaten,
+            'plantsDied': eco.plantsDied,
+            'herbiDied': eco.herbiDied,
+            'carniDied': eco.carniDied,
+            'animalsDeath': list(eco.animalsDeath),
+            'timesDrunk': eco.timesDrunk}
+
+# FUNCTION: runShared ---------------------------------------------------------
+def runShared(task):
+    """ Description: Runs one simulation of a sweep in a worker process.
+                     The world layers are attached from shared memory.
+        
+        Variables:
+        -task: tuple of (constants to change, seed, weeks simulated, specs
+               of the world layers made by Shared.Arena.put)
+    """
+    overrides, seed, weeks, specs = task
+    world = {layer: sh.attach(specs[layer], writeable=False)\
+             for layer in specs}
+    return runSim((overrides, seed, weeks, world))
+
+# FUNCTION: average -----------------------------------------------------------
+def average(runs, key, cause=None):
+    """ Description: Averages a result over the simulations of every value
+        
+        Variables:
+        -runs: results returned by sweep
+        -key: name of the result
+        -cause: index into animalsDeath when key is 'animalsDeath'
+        
+        Output: list with the average for every value
+    """
+    output = []
+    for results in runs:
+        if(cause is None):
+            values = [result[key] for result in results]
+        else:
+            values = [result[key][cause] for result in results]
+        output.append(sum(values) / len(values))
+    return output
+
+# FUNCTION: driftReport -------------------------------------------------------
+def driftReport(sims=None, weeks=None, seed=0, workers=None):
+    """ Description: Runs the same simulations with float64 and float32
+                     grids (FIELD_DTYPE) and prints how far the results of
+                     float32 drift from float64. Both precisions use the
+                     same seeds, so the differences come from rounding.
+        
+        Variables:
+        -sims: simulations per precision, NUM_SIMS by default
+        -weeks: weeks simulated, NUM_WEEKS by default
+        -seed: seed of the first replicate
+        -workers: number of processes, see sweep
+        
+        Output: dictionary keyed by result of (float64 mean, float32 mean,
+                relative change, replicates with equal results)
+    """
+    runs = sweep('FIELD_DTYPE', ['float64', 'float32'], sims=sims,\
+                 weeks=weeks, seed=seed, workers=workers)
+    
+    keys = [(key, None) for key in runs[0][0] if key != 'animalsDeath'] +\
+           [('animalsDeath', cause) for cause in\
+            range(len(runs[0][0]['animalsDeath']))]
+    
+    report = {}
+    print("%-16s %10s %10s %9s %6s" % ("Result", "float64", "float32",\
+                                       "Change", "Equal"))
+    for key, cause in keys:
+        name = key if cause is None else key + "[%d]" % cause
+        wide, narrow = average(runs, key, cause)
+        change = (narrow - wide) / wide if wide != 0 else 0.0
+        equal = sum(average([[a]], key, cause) == average([[b]], key, cause)\
+                    for a, b in zip(runs[0], runs[1]))
+        report[name] = (wide, narrow, change, equal)
+        print("%-16s %10.2f %10.2f %8.2f%% %3d/%d" % (name, wide, narrow,\
+              100 * change, equal, len(runs[0])))
+    return report
 
 # ANALYSIS FUNCTIONS __________________________________________________________
 # FUNCTION: anRabToPlant ------------------------------------------------------
@@ -55,29 +228,12 @@ def anRabToPlant():
         Output: Average result of the simulations displayed in a line plot.
     """
 
-    rabbits = [1,2,3,4,5,6,7]
-    output = []
+    rabbits = [1,2,3,4,5,6,7]       # must be less than 9
     
-    for k in range(len(rabbits)):
-        # grab value for restoring value
-        hold = const.RABBITS_PER_BURROW
-        
-        #Parameters passed
-        const.RABBITS_PER_BURROW = rabbits[k] # must be less than 9
-        
-        eatenPlants = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()           #Initialize Ecosystem
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            eatenPlants.append(eco.plantsEaten)
-            
-        # restore value
-        const.RABBITS_PER_BURROW = hold
-        
-        output.append(sum(eatenPlants) / len(eatenPlants))
+    runs = sweep('RABBITS_PER_BURROW', rabbits)
+    output = average(runs, 'plantsEaten')
 
+    plt = sim.pyplot()
     plt.plot(rabbits, output)
     plt.xlabel("Rabbits per Burrow")
     plt.ylabel("Grass Eaten")
@@ -94,29 +250,12 @@ def anLakeToAnimals():
         Output: Average result of the simulations displayed in a line plot.
     """
     lakeSpread = [1,2,3,4,5,6,7]
-    output1 = []
-    output2 = []
     
-    for k in range(len(lakeSpread)):
-        hold = const.LAKE_SPREAD # grab value for restoring value
-        
-        const.LAKE_SPREAD = lakeSpread[k]
-        
-        deadHerbi = []
-        deadCarni = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            deadHerbi.append(eco.herbiDied)
-            deadCarni.append(eco.carniDied)
-            
-        const.LAKE_SPREAD = hold # restore value
-        
-        output1.append(sum(deadHerbi) / len(deadHerbi))
-        output2.append(sum(deadCarni) / len(deadCarni))
+    runs = sweep('LAKE_SPREAD', lakeSpread)
+    output1 = average(runs, 'herbiDied')
+    output2 = average(runs, 'carniDied')
     
+    plt = sim.pyplot()
     plt.plot(lakeSpread, output1, label='Herbivores')
     plt.plot(lakeSpread, output2, label='Carnivores')
     plt.xlabel("Lake Size Multiplyer")
@@ -135,25 +274,11 @@ def anDissipationtoRab():
         Output: Average result of the simulations displayed in a line plot.
     """
     scentFade = [0.5, 0.6, 0.7, 0.8, 0.9]
-    output = []
     
-    for k in range(len(scentFade)):
-        hold = const.DISSIPATION_RATE # grab value for restoring value
-        
-        const.DISSIPATION_RATE = scentFade[k]
-        
-        eatenRabbits = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek() 
-            eatenRabbits.append(eco.animalsDeath[4])
-        
-        output.append(sum(eatenRabbits) / len(eatenRabbits))
-        
-        const.DISSIPATION_RATE = hold # restore value
+    runs = sweep('DISSIPATION_RATE', scentFade)
+    output = average(runs, 'animalsDeath', 4)
     
+    plt = sim.pyplot()
     plt.plot(scentFade, output)
     plt.xlabel("Scent Trail Fade Percent")
     plt.ylabel("Animals Eaten")
@@ -170,28 +295,12 @@ def anFoxToRabAndPlant():
         Output: Average result of the simulations displayed in a line plot.
     """
     foxes = [1,2,3,4,5,6,7]
-    output1 = []
-    output2 = []
     
-    for k in range(len(foxes)):
-        hold = const.NUM_FOXES # grab value for restoring value
-        
-        const.NUM_FOXES = foxes[k]
-        eatenRabbits = []
-        eatenPlants = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            eatenRabbits.append(eco.animalsDeath[4])
-            eatenPlants.append(eco.plantsEaten)
-            
-        output1.append(sum(eatenRabbits) / len(eatenRabbits))
-        output2.append(sum(eatenPlants) / len(eatenPlants))
-        
-        const.NUM_FOXES = hold # restore value
+    runs = sweep('NUM_FOXES', foxes)
+    output1 = average(runs, 'animalsDeath', 4)
+    output2 = average(runs, 'plantsEaten')
         
+    plt = sim.pyplot()
     plt.plot(foxes, output1)
     plt.xlabel("Number of Inital Foxes")
     plt.ylabel("Number Animals Eaten")
@@ -213,34 +322,14 @@ def anPondsToAnimals():
         
         Output: Average result of the simulations displayed in a line plot.
     """
-    temp = const.MIN_MOISTURE
-    const.MIN_MOISTURE = 0
-    hold = const.NUM_PONDS # grab value for restoring value
-    
     ponds = [0,1,2,3,4,5,6]
-    output1 = []
-    output2 = []
-    output3 = []
     
-    for k in range(len(ponds)):
-        const.NUM_PONDS = ponds[k]
-        
-        deadHerbi = []
-        deadCarni = []
-        deadPlants = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            deadHerbi.append(eco.herbiDied)
-            deadCarni.append(eco.carniDied)
-            deadPlants.append(eco.plantsDied)
-        
-        output1.append(sum(deadHerbi) / len(deadHerbi))
-        output2.append(sum(deadCarni) / len(deadCarni))
-        output3.append(sum(deadPlants) / len(deadPlants))
+    runs = sweep('NUM_PONDS', ponds, fixed={'MIN_MOISTURE': 0})
+    output1 = average(runs, 'herbiDied')
+    output2 = average(runs, 'carniDied')
+    output3 = average(runs, 'plantsDied')
     
+    plt = sim.pyplot()
     plt.plot(ponds, output1, label='Herbivores')
     plt.plot(ponds, output2, label='Carnivores')
     plt.xlabel("Number of Ponds")
@@ -254,9 +343,6 @@ def anPondsToAnimals():
     plt.ylabel("Plants Dead")
     plt.title("Pond Count v. Plant Deaths")
     plt.show()
-    
-    const.NUM_PONDS = hold # restore value
-    const.MIN_MOISTURE = temp 
  
 # FUNCTION: anFoxStepToRab -------------------------------------------------------- 
 def anFoxStepToRab():
@@ -267,31 +353,17 @@ def anFoxStepToRab():
         
         Output: Average result of the simulations displayed in a line plot.
     """
-    hold = const.EXTRA_FOX_STEPS        # grab value for restoring value
-    
     foxsteps = [1,2,3,4,5]
-    output = []
     
-    for k in range(len(foxsteps)):
-        const.EXTRA_FOX_STEPS = foxsteps[k]
-        eatenRabbits = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            eatenRabbits.append(eco.animalsDeath[4])
-            
-        output.append(sum(eatenRabbits) / len(eatenRabbits))
-        
+    runs = sweep('EXTRA_FOX_STEPS', foxsteps)
+    output = average(runs, 'animalsDeath', 4)
     
+    plt = sim.pyplot()
     plt.plot(foxsteps, output)
     plt.xlabel("Number of Extra Fox Moves per Hour")
     plt.ylabel("Number Animals Eaten")
     plt.title("Extra Fox Movement v. Animals Consumption")
     plt.show()  
-    
-    const.EXTRA_FOX_STEPS = hold
  
 # FUNCTION: anEnergyToAnimals -------------------------------------------------
 def anWaterCostToDessicate():
@@ -303,28 +375,13 @@ def anWaterCostToDessicate():
         
         Output: Average result of the simulations displayed in a line plot.
     """       
-    hold = const.WATER_MOVE_FACTOR      # grab value for restoring value
-
     waterMove = [2,4,6,8,10]
-    output1 = []
-    output2 = []
     
-    for k in range(len(waterMove)):
-        const.WATER_MOVE_FACTOR = waterMove[k]
-        
-        numDessicate = []
-        drinks = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            numDessicate.append(eco.animalsDeath[1])
-            drinks.append(eco.timesDrunk)
-        
-        output1.append(sum(numDessicate) / len(numDessicate))
-        output2.append(sum(drinks) / len(drinks))
+    runs = sweep('WATER_MOVE_FACTOR', waterMove)
+    output1 = average(runs, 'animalsDeath', 1)
+    output2 = average(runs, 'timesDrunk')
     
+    plt = sim.pyplot()
     plt.plot(waterMove, output1)
     plt.xlabel("Water Move Cost Factor")
     plt.ylabel("Animals Dessicated")
@@ -336,8 +393,6 @@ def anWaterCostToDessicate():
     plt.ylabel("Times Fauna Drunk")
     plt.title("Water Move Cost v. Times Drunk")
     plt.show()
-    
-    const.WATER_MOVE_FACTOR = hold # restore value
 
 # FUNCTION: anEnergyToAnimals -------------------------------------------------
 def anEnergyCostToStarve():
@@ -349,31 +404,17 @@ def anEnergyCostToStarve():
         
         Output: Average result of the simulations displayed in a line plot.
     """       
-    hold = const.ENERGY_MOVE_FACTOR         # grab value for restoring value
-    
     energyMove = [2,4,6,8,10]
-    output = []
     
-    for k in range(len(energyMove)):
-        const.ENERGY_MOVE_FACTOR = energyMove[k]
-        
-        numStarve = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            numStarve.append(eco.animalsDeath[0])
-        
-        output.append(sum(numStarve) / len(numStarve))
+    runs = sweep('ENERGY_MOVE_FACTOR', energyMove)
+    output = average(runs, 'animalsDeath', 0)
     
+    plt = sim.pyplot()
     plt.plot(energyMove, output)
     plt.xlabel("Energy Move Cost Factor")
     plt.ylabel("Animals Starved")
     plt.title("Energy Move Cost v. Animal Starved")
     plt.show()
-    
-    const.ENERGY_MOVE_FACTOR = hold         # restore value
  
 # FUNCTION: anHungerToStarve --------------------------------------------------
 def anHungerToStarve():
@@ -384,32 +425,18 @@ def anHungerToStarve():
         
         Output: Average result of the simulations displayed in a line plot.
     """       
-    hold = const.HUNGRY_PERCENT         # grab value for restoring value
-    
     hunger = [0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9]
-    output = []
     
-    for k in range(len(hunger)):
-        const.HUNGRY_PERCENT = hunger[k]
-        
-        numStarve = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            numStarve.append(eco.animalsDeath[0])
-        
-        output.append(sum(numStarve) / len(numStarve))
+    runs = sweep('HUNGRY_PERCENT', hunger)
+    output = average(runs, 'animalsDeath', 0)
     
+    plt = sim.pyplot()
     plt.plot(hunger, output)
     plt.xlabel("Animal Hungry Threshold Percent")
     plt.ylabel("Animals Starved")
     plt.title("Hungry Threashold v. Animal Starved")
     plt.show()
     
-    const.HUNGRY_PERCENT = hold      # restore value
-    
 # FUNCTION: anThirstToDessicate -----------------------------------------------  
 def anThirstToDessicate():
     """ Description: Runs multiple simulations. 
@@ -419,32 +446,18 @@ def anThirstToDessicate():
         
         Output: Average result of the simulations displayed in a line plot.
     """    
-    hold = const.THIRSTY_PERCENT         # grab value for restoring value
-    
     thirst = [0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7]
-    output = []
     
-    for k in range(len(thirst)):
-        const.THIRSTY_PERCENT = thirst[k]
-        
-        numDessicate = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            numDessicate.append(eco.animalsDeath[1])
-        
-        output.append(sum(numDessicate) / len(numDessicate))
+    runs = sweep('THIRSTY_PERCENT', thirst)
+    output = average(runs, 'animalsDeath', 1)
     
+    plt = sim.pyplot()
     plt.plot(thirst, output)
     plt.xlabel("Animal Thirst Threashold Percent")
     plt.ylabel("Animals Dessicated")
     plt.title("Thirst Threashold v. Animal Dessicated")
     plt.show()
     
-    const.THIRSTY_PERCENT = hold      # restore value
-    
 # FUNCTION: anPlantChanceToAnimals --------------------------------------------    
 def anPlantChanceToAnimals():
     """ Description: Runs multiple simulations. 
@@ -455,28 +468,13 @@ def anPlantChanceToAnimals():
         
         Output: Average result of the simulations displayed in a line plot.
     """    
-    hold = const.PLANT_CHANCE         # grab value for restoring value
-    
     plantChance = [0.2, 0.4, 0.6, 0.8, 1.0]
-    output1 = []
-    output2 = []
     
-    for k in range(len(plantChance)):
-        const.PLANT_CHANCE = plantChance[k]
-        
-        deadHerbi = []
-        deadCarni = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            deadHerbi.append(eco.herbiDied)
-            deadCarni.append(eco.carniDied)
-        
-        output1.append(sum(deadHerbi) / len(deadHerbi))
-        output2.append(sum(deadCarni) / len(deadCarni))
+    runs = sweep('PLANT_CHANCE', plantChance)
+    output1 = average(runs, 'herbiDied')
+    output2 = average(runs, 'carniDied')
     
+    plt = sim.pyplot()
     plt.plot(plantChance, output1, label='Herbivores')
     plt.plot(plantChance, output2, label='Carnivores')
     plt.xlabel("Plant Initialization Chance")
@@ -485,8 +483,6 @@ def anPlantChanceToAnimals():
     plt.legend()
     plt.show()
     
-    const.PLANT_CHANCE = hold      # restore value
-    
 # FUNCTION: anPlantChanceToAnimals --------------------------------------------  
 def anPlantUnitsToDeaths():
     """ Description: Runs multiple simulations. 
@@ -496,32 +492,14 @@ def anPlantUnitsToDeaths():
         
         Output: Average result of the simulations displayed in a line plot.
     """    
-    hold = const.PLANT_UNITS_TO_EAT         # grab value for restoring value
-    
     plantUnits = [1, 2, 3, 4, 5]
-    output1 = []
-    output2 = []
-    output3 = []
     
-    for k in range(len(plantUnits)):
-        const.PLANT_UNITS_TO_EAT = plantUnits[k]
-        
-        deadHerbi = []
-        deadCarni = []
-        deadPlants = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            deadHerbi.append(eco.herbiDied)
-            deadCarni.append(eco.carniDied)
-            deadPlants.append(eco.plantsEaten)
-        
-        output1.append(sum(deadHerbi) / len(deadHerbi))
-        output2.append(sum(deadCarni) / len(deadCarni))
-        output3.append(sum(deadPlants) / len(deadPlants))
+    runs = sweep('PLANT_UNITS_TO_EAT', plantUnits)
+    output1 = average(runs, 'herbiDied')
+    output2 = average(runs, 'carniDied')
+    output3 = average(runs, 'plantsEaten')
     
+    plt = sim.pyplot()
     plt.plot(plantUnits, output1, label='Herbivores')
     plt.plot(plantUnits, output2, label='Carnivores')
     plt.xlabel("Units of Plant Eaten at A Time")
@@ -536,8 +514,6 @@ def anPlantUnitsToDeaths():
     plt.title("Plant Units v. Plant Deaths")
     plt.show()
     
-    const.PLANT_UNITS_TO_EAT = hold    # restore value
-    
 # FUNCTION: anPlantStatsToAnimals ---------------------------------------------  
 def anPlantWaterToNumDrinks():
     """ Description: Runs multiple simulations. 
@@ -547,59 +523,54 @@ def anPlantWaterToNumDrinks():
         
         Output: Average result of the simulations displayed in a line plot.
     """    
-    hold = const.FLORA_WATER_PERCENT         # grab value for restoring value
-    
     floraWater = [0.0, 0.025, 0.05, 0.075, 0.1]
-    output = []
     
-    for k in range(len(floraWater)):
-        const.FLORA_WATER_PERCENT = floraWater[k]
-        
-        drinks = []
-        
-        for j in range(const.NUM_SIMS):
-            eco = sim.EcoSystem()
-            for i in range(const.NUM_WEEKS):
-                eco.runAWeek()
-            drinks.append(eco.timesDrunk)
-        
-        output.append(sum(drinks) / len(drinks))
+    runs = sweep('FLORA_WATER_PERCENT', floraWater)
+    output = average(runs, 'timesDrunk')
     
+    plt = sim.pyplot()
     plt.plot(floraWater, output)
     plt.xlabel("Plant Water Consumed Percent")
     plt.ylabel("Times Fauna Drunk")
     plt.title("Plant Water Percent v. Times Drunk")
     plt.show()
-    
-    const.FLORA_WATER_PERCENT = hold      # restore value
 
 # PROGRAM GLOBALS _____________________________________________________________
 # Not User Modifiable
     
+# FUNCTION: main --------------------------------------------------------------
+def main():
+    """ Description: Entry point when the file is run as a script, prints the
+                     settings and runs the chosen analyses
+    """
+    print("# Simulations:", const.NUM_SIMS)
+    print("# Days Per Sim:", const.NUM_WEEKS * const.DAYS_PER_WEEK)
+    
+    # uncomment to re run the analysis
+    #anRabToPlant()             # DONE
+    #anFoxToRabAndPlant()       # DONE
+    #anFoxStepToRab()           # DONE    
+    #anDissipationtoRab()       # DONE
+    
+    #anLakeToAnimals()          # DONE
+    #anPondsToAnimals()         # DONE
+    
+    #anEnergyCostToStarve()     # DONE
+    #anHungerToStarve()         # DONE
+    
+    #anWaterCostToDessicate()   # DONE
+    #anThirstToDessicate()      # DONE
+    
+    #anPlantChanceToAnimals()   # DONE
+    #anPlantUnitsToDeaths()     # DONE
+    #anPlantWaterToNumDrinks()  # DONE
+    
+    #driftReport()              # float32 grids against float64
+
 # PROGRAM SCRIPT ______________________________________________________________
 # Driver code for program
-print("# Simulations:", const.NUM_SIMS)
-print("# Days Per Sim:", const.NUM_WEEKS * const.DAYS_PER_WEEK)
-
-# uncomment to re run the analysis
-#anRabToPlant()             # DONE
-#anFoxToRabAndPlant()       # DONE
-#anFoxStepToRab()           # DONE    
-#anDissipationtoRab()       # DONE
-
-#anLakeToAnimals()          # DONE
-#anPondsToAnimals()         # DONE
-
-#anEnergyCostToStarve()     # DONE
-#anHungerToStarve()         # DONE
-
-#anWaterCostToDessicate()   # DONE
-#anThirstToDessicate()      # DONE
-
-#anPlantChanceToAnimals()   # DONE
-#anPlantUnitsToDeaths()     # DONE
-#anPlantWaterToNumDrinks()  # DONE
+if __name__ == '__main__':
+    main()
 
-  
 #==============================================================================
 # END FILE
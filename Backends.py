@@ -0,0 +1,683 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the compute backends that run the hourly and daily
+    phases of the ecosystem simulation.
+    A backend is picked when the ecosystem is created:
+        - reference: the rules written as loops over one animal, cell and
+                     plant at a time, in population order. Used to check
+                     the other backends with checkBackends and
+                     checkSpread.
+        - numpy: every phase works on whole arrays of animals and grids
+        - numba: the numpy backend with compiled grid kernels. Only
+                 available if numba is installed, and numba is only
+                 imported when this backend is made.
+        - tiled: the numpy backend run tile by tile on a process pool
+                 (see Tiled.py)
+        - auto: numba if it is available, numpy otherwise
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.7
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import Fauna as fa
+import numpy as nu
+import importlib.util
+
+#==============================================================================
+# PROGRAM CONSTANTS ___________________________________________________________
+# EcoSystem methods run at the end of every day, in order
+DAILY = ('wheatherCheck', 'updateTemp', 'checkPlantGrowth', 'checkStarved')
+
+#==============================================================================
+# CLASS: Backend ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class Backend:
+    """ Description: Runs the phases of a simulation step on an ecosystem.
+                     This is the numpy backend, other backends replace the
+                     phases they compute differently.
+
+        Variables:
+        -name: name used to pick the backend
+
+        Methods: moveHerbivores() - Herbivores drink, forage or walk
+                 moveCarnivores() - Carnivores drink, track or walk
+                 eat() - Hungry animals eat and the eaten are removed
+                 updateScent() - Spreads and dissipates the scent grid
+                 spreadMax() - Largest value within the scent spread
+                 plantsAbsorb() - Plants take in light and water
+                 endOfDay() - Weather, temperature, growth and deaths
+    """
+    name = 'numpy'
+
+    # MEATHOD: moveHerbivores -------------------------------------------------
+    def moveHerbivores(self, eco, idx=None):
+        """ Description: Thirsty herbivores look for water, hungry ones for
+                         plants and the rest walk randomly
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the herbivores that move, all by default
+        """
+        if(idx is None):
+            idx = eco.fauna.herbivores()
+        eco.step = 0
+        eco.randomWalk(eco.forage(eco.findWater(idx)))
+
+    # MEATHOD: moveCarnivores -------------------------------------------------
+    def moveCarnivores(self, eco, idx=None):
+        """ Description: Thirsty carnivores look for water, hungry ones track
+                         scent and the rest walk randomly. Carnivores take
+                         EXTRA_FOX_STEPS steps every hour.
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the carnivores that move, all by default
+        """
+        if(idx is None):
+            idx = eco.fauna.carnivores()
+        for k in range(eco.config.EXTRA_FOX_STEPS):
+            eco.step = k
+            eco.randomWalk(eco.track(eco.findWater(idx)))
+
+    # MEATHOD: eat ------------------------------------------------------------
+    def eat(self, eco):
+        """ Description: Hungry animals eat, eaten animals are removed
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        eco.animalsEat()
+        eco.removeDead()
+
+    # MEATHOD: updateScent ----------------------------------------------------
+    def updateScent(self, eco):
+        """ Description: Updates the scent grid of the ecosystem
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        eco.updateScent(lambda grid, out, work:\
+                        self.spreadMax(eco, grid, out, work))
+
+    # MEATHOD: spreadMax ------------------------------------------------------
+    def spreadMax(self, eco, grid, out, work):
+        """ Description: Finds the largest value of grid within SCENT_SPREAD
+                         cells of every cell
+
+            Variables:
+            -eco: ecosystem being simulated
+            -grid: values to spread
+            -out: grid the result is written into
+            -work: grid used for the intermediate result
+        """
+        eco.spreadMax(grid, out, work)
+
+    # MEATHOD: plantsAbsorb ---------------------------------------------------
+    def plantsAbsorb(self, eco):
+        """ Description: Plants take in light and water
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        eco.plantsAbsorb()
+
+    # MEATHOD: endOfDay -------------------------------------------------------
+    def endOfDay(self, eco, phase=None):
+        """ Description: Runs the work done once at the end of a day. Every
+                         daily phase is called through the phase hook, so
+                         a wrapper can time or trace them without changing
+                         the ecosystem.
+
+            Variables:
+            -eco: ecosystem being simulated
+            -phase: called as phase(name, function) for every daily phase,
+                    must call function. runPhase by default.
+        """
+        if(phase is None):
+            phase = runPhase
+        for name in DAILY:
+            phase(name, getattr(eco, name))
+
+# CLASS: ReferenceBackend +++++++++++++++++++++++++++++++++++++++++++++++++++++
+class ReferenceBackend(Backend):
+    """ Description: The rules of the simulation written the way the
+                     original simulation was: plain loops over one animal,
+                     one neighbouring cell and one plant at a time, in
+                     population order. It does not call the vectorised
+                     EcoSystem and Population methods the other backends
+                     share, so checkBackends finds mistakes in them too.
+                     The water field is the one map it reads, and
+                     checkWaterField checks it against a scan of the
+                     grid. The scent spread is its own loop as well, see
+                     checkSpread. Slow, used to compare the other backends
+                     against.
+    """
+    name = 'reference'
+
+    # MEATHOD: moveHerbivores -------------------------------------------------
+    def moveHerbivores(self, eco, idx=None):
+        """ Description: Each herbivore drinks, forages or walks in turn
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the herbivores that move, all by default
+        """
+        if(idx is None):
+            idx = eco.fauna.herbivores()
+        if(eco.water_field_version != eco.water_version):
+            eco.buildWaterField()
+        eco.step = 0
+        for i in idx:
+            if(not self.findWater(eco, i) and not self.forage(eco, i)):
+                self.randomWalk(eco, i)
+
+    # MEATHOD: moveCarnivores -------------------------------------------------
+    def moveCarnivores(self, eco, idx=None):
+        """ Description: Each carnivore takes all its steps in turn
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the carnivores that move, all by default
+        """
+        if(idx is None):
+            idx = eco.fauna.carnivores()
+        if(eco.water_field_version != eco.water_version):
+            eco.buildWaterField()
+        for i in idx:
+            for k in range(eco.config.EXTRA_FOX_STEPS):
+                eco.step = k
+                if(not self.findWater(eco, i) and not self.track(eco, i)):
+                    self.randomWalk(eco, i)
+
+    # MEATHOD: eat ------------------------------------------------------------
+    def eat(self, eco):
+        """ Description: Each hungry herbivore eats the plant it stands on,
+                         then each hungry carnivore eats the herbivores on
+                         the first cell of its neighbourhood that has any,
+                         or the plant it stands on
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        fauna = eco.fauna
+        stats = fauna.stats
+        for i in range(len(fauna)):
+            if(fauna.alive[i] and not stats['carnivore'][fauna.species[i]]\
+               and fauna.energy[i] <= stats['hungry'][fauna.species[i]]):
+                self.eatPlant(eco, i)
+
+        hungry = [i for i in range(len(fauna)) if fauna.alive[i] and\
+                  stats['carnivore'][fauna.species[i]] and\
+                  stats['hungry'][fauna.species[i]] > fauna.energy[i]]
+        for i in hungry:
+            if(not self.hunt(eco, i)):
+                self.eatPlant(eco, i)
+        eco.removeDead()
+
+    # MEATHOD: neighbours -----------------------------------------------------
+    def neighbours(self, eco, i):
+        """ Description: Returns the cells of the Moore neighbourhood of an
+                         animal that are inside the grid, in MOVE order
+        """
+        cells = []
+        for moveY, moveX in zip(eco.MOVE_Y, eco.MOVE_X):
+            y = eco.fauna.y[i] + moveY
+            x = eco.fauna.x[i] + moveX
+            if(0 <= y < eco.length and 0 <= x < eco.width):
+                cells.append((y, x))
+        return cells
+
+    # MEATHOD: pick -----------------------------------------------------------
+    def pick(self, eco, i, cells):
+        """ Description: Picks one of the cells with the animal's pre-drawn
+                         cell choice of this step
+        """
+        draw = eco.draws[i, 2 * eco.step + 1]
+        return cells[min(int(draw * len(cells)), len(cells) - 1)]
+
+    # MEATHOD: stat -----------------------------------------------------------
+    def stat(self, eco, name, i):
+        """ Description: Looks up a species value of one animal"""
+        return eco.fauna.stats[name][eco.fauna.species[i]]
+
+    # MEATHOD: count ----------------------------------------------------------
+    def count(self, eco, i, moveType):
+        """ Description: Adds one move of an animal to the move counters"""
+        if(self.stat(eco, 'carnivore', i)):
+            eco.carniMove[moveType] += 1
+        else:
+            eco.herbiMove[moveType] += 1
+
+    # MEATHOD: relocate -------------------------------------------------------
+    def relocate(self, eco, i, cell, moveType):
+        """ Description: Moves an animal to a cell. Its temperature moves
+                         towards the cell's by TEMP_TRANSFER of the cell's,
+                         and it pays the move cost.
+        """
+        fauna = eco.fauna
+        tempValue = eco.temp_grid[cell]
+        change = abs(tempValue) * eco.config.TEMP_TRANSFER
+        if(tempValue < fauna.temp[i]):
+            fauna.temp[i] = max(fauna.temp[i] - change, tempValue)
+        elif(tempValue > fauna.temp[i]):
+            fauna.temp[i] = min(fauna.temp[i] + change, tempValue)
+        fauna.energy[i] -= self.stat(eco, 'move_energy_cost', i)
+        fauna.water[i] -= self.stat(eco, 'move_water_cost', i)
+        fauna.y[i], fauna.x[i] = cell
+        self.count(eco, i, moveType)
+
+    # MEATHOD: findWater ------------------------------------------------------
+    def findWater(self, eco, i):
+        """ Description: A thirsty animal steps towards the closest water and
+                         drinks, if there is water to find
+
+            Output: True if the animal moved
+        """
+        fauna = eco.fauna
+        y, x = fauna.y[i], fauna.x[i]
+        if(fauna.water[i] > self.stat(eco, 'thirsty', i) or\
+           eco.water_dist[y, x] < 0):
+            return False
+        self.relocate(eco, i, (y + eco.water_step_y[y, x],\
+                               x + eco.water_step_x[y, x]), 2)
+        fauna.water[i] += self.stat(eco, 'drink_amount', i)
+        eco.timesDrunk += 1
+        return True
+
+    # MEATHOD: forage ---------------------------------------------------------
+    def forage(self, eco, i):
+        """ Description: A hungry herbivore next to plants moves onto one
+
+            Output: True if the animal moved
+        """
+        if(eco.fauna.energy[i] > self.stat(eco, 'hungry', i)):
+            return False
+        food = [cell for cell in self.neighbours(eco, i)\
+                if eco.plant_grid[cell]]
+        if(len(food) == 0):
+            return False
+        self.relocate(eco, i, self.pick(eco, i, food), 1)
+        return True
+
+    # MEATHOD: track ----------------------------------------------------------
+    def track(self, eco, i):
+        """ Description: A hungry carnivore moves to the neighbouring cell
+                         with the strongest scent
+
+            Output: True if the animal moved
+        """
+        if(eco.fauna.energy[i] > self.stat(eco, 'hungry', i)):
+            return False
+        cells = self.neighbours(eco, i)
+        strongest = max(eco.scent_grid[cell] for cell in cells)
+        cells = [cell for cell in cells if eco.scent_grid[cell] == strongest]
+        self.relocate(eco, i, self.pick(eco, i, cells), 1)
+        return True
+
+    # MEATHOD: randomWalk -----------------------------------------------------
+    def randomWalk(self, eco, i):
+        """ Description: An animal walks to a random neighbouring cell or
+                         waits and pays the wait cost
+        """
+        fauna = eco.fauna
+        if(eco.draws[i, 2 * eco.step] > eco.config.MOVE_CHANCE):
+            self.relocate(eco, i, self.pick(eco, i, self.neighbours(eco, i)),\
+                          0)
+        else:
+            fauna.energy[i] -= self.stat(eco, 'wait_energy_cost', i)
+            fauna.water[i] -= self.stat(eco, 'wait_water_cost', i)
+            self.count(eco, i, 3)
+
+    # MEATHOD: feed -----------------------------------------------------------
+    def feed(self, eco, i, energy, water):
+        """ Description: An animal eats and drinks up to its eat and drink
+                         amounts
+        """
+        eco.fauna.energy[i] += min(energy, self.stat(eco, 'eat_amount', i))
+        eco.fauna.water[i] += min(water, self.stat(eco, 'drink_amount', i))
+
+    # MEATHOD: eatPlant -------------------------------------------------------
+    def eatPlant(self, eco, i):
+        """ Description: An animal eats PLANT_UNITS_TO_EAT units of the plant
+                         it stands on, the plant dies when none are left
+        """
+        plants = eco.plants
+        cell = (eco.fauna.y[i], eco.fauna.x[i])
+        if(not plants.alive[cell]):
+            return
+        size = plants.size[cell]
+        eaten = min(eco.config.PLANT_UNITS_TO_EAT, size)
+        value = eaten * plants.energy_per_unit     # water as well
+        size = size - eaten
+        plants.size[cell] = size
+        plants.energy[cell] = min(plants.energy[cell],\
+                                  plants.max_energy_unit * size)
+        plants.water[cell] = min(plants.water[cell],\
+                                 plants.max_water_unit * size)
+        plants.alive[cell] = size > 0
+        self.feed(eco, i, value, value)
+        if(not plants.alive[cell]):
+            eco.plant_grid[cell] = False
+            eco.plantsEaten += 1
+
+    # MEATHOD: hunt -----------------------------------------------------------
+    def hunt(self, eco, i):
+        """ Description: A carnivore eats every living herbivore on its own
+                         cell, or else on the first neighbouring cell that
+                         has any
+
+            Output: True if the carnivore ate
+        """
+        fauna = eco.fauna
+        for cell in [(fauna.y[i], fauna.x[i])] + self.neighbours(eco, i):
+            prey = [k for k in range(len(fauna)) if fauna.alive[k] and\
+                    not self.stat(eco, 'carnivore', k) and\
+                    (fauna.y[k], fauna.x[k]) == cell]
+            for k in prey:
+                fauna.alive[k] = False
+                fauna.cause[k] = fa.EATEN
+            for k in prey:
+                self.feed(eco, i, self.stat(eco, 'energy_value', k),\
+                          self.stat(eco, 'water_value', k))
+            if(len(prey) > 0):
+                return True
+        return False
+
+    # MEATHOD: spreadMax ------------------------------------------------------
+    def spreadMax(self, eco, grid, out, work):
+        """ Description: Finds the largest value of grid within SCENT_SPREAD
+                         cells of every cell, not counting the cell itself,
+                         one cell at a time
+
+            Variables:
+            -eco: ecosystem being simulated
+            -grid: values to spread
+            -out: grid the result is written into
+            -work: unused
+        """
+        spread = eco.config.SCENT_SPREAD
+        for y in range(eco.length):
+            for x in range(eco.width):
+                top = max(y - spread, 0)
+                left = max(x - spread, 0)
+                window = grid[top:y + spread + 1, left:x + spread + 1].copy()
+                window[y - top, x - left] = -nu.inf     # not the cell itself
+                out[y, x] = window.max()
+
+# CLASS: NumbaBackend +++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class NumbaBackend(Backend):
+    """ Description: The numpy backend with the scent spread compiled by
+                     numba. Needs numba to be installed.
+    """
+    name = 'numba'
+
+    # MEATHOD: INIT -----------------------------------------------------------
+    def __init__(self):
+        """ Description: Class constructor, imports numba and compiles the
+                         kernels
+        """
+        try:
+            import numba
+        except ImportError:
+            raise ImportError('the numba backend needs numba to be installed')
+        self.kernel = numba.njit(cache=True)(spreadMaxKernel)
+
+    # MEATHOD: spreadMax ------------------------------------------------------
+    def spreadMax(self, eco, grid, out, work):
+        """ Description: Finds the largest value of grid within SCENT_SPREAD
+                         cells of every cell, not counting the cell itself,
+                         with the compiled kernel
+
+            Variables:
+            -eco: ecosystem being simulated
+            -grid: values to spread
+            -out: grid the result is written into
+            -work: unused
+        """
+        self.kernel(grid, out, eco.config.SCENT_SPREAD)
+
+# FUNCTION: runPhase ----------------------------------------------------------
+def runPhase(name, function):
+    """ Description: Default phase hook of endOfDay, calls the phase
+
+        Variables:
+        -name: name of the phase (see DAILY)
+        -function: the phase
+    """
+    return function()
+
+# FUNCTION: spreadMaxKernel ---------------------------------------------------
+def spreadMaxKernel(grid, out, spread):
+    """ Description: Loop version of the scent spread, compiled by numba.
+                     The cell itself is not part of its spread.
+
+        Variables:
+        -grid: values to spread
+        -out: grid the result is written into
+        -spread: number of cells the values spread
+    """
+    length, width = grid.shape
+    for y in range(length):
+        for x in range(width):
+            best = -nu.inf
+            for cellY in range(max(y - spread, 0), min(y + spread + 1, length)):
+                for cellX in range(max(x - spread, 0),\
+                                   min(x + spread + 1, width)):
+                    if(cellY == y and cellX == x):
+                        continue
+                    if(grid[cellY, cellX] > best):
+                        best = grid[cellY, cellX]
+            out[y, x] = best
+
+# FUNCTION: spreadNeighbours --------------------------------------------------
+def spreadNeighbours(grid, spread):
+    """ Description: The scent spread the way the original simulation wrote
+                     it: every cell passes its value to the cells around it
+                     but not to itself. Slow, used by checkSpread.
+
+        Variables:
+        -grid: values to spread
+        -spread: number of cells the values spread
+
+        Output: grid of the largest value passed to every cell
+    """
+    length, width = grid.shape
+    out = nu.full(grid.shape, -nu.inf)
+    for y in range(length):
+        for x in range(width):
+            for cellY in range(max(y - spread, 0), min(y + spread + 1, length)):
+                for cellX in range(max(x - spread, 0),\
+                                   min(x + spread + 1, width)):
+                    if(cellY != y or cellX != x):
+                        out[cellY, cellX] = max(out[cellY, cellX], grid[y, x])
+    return out
+
+# FUNCTION: checkSpread -------------------------------------------------------
+def checkSpread(spreads=(1, 2, 3)):
+    """ Description: Compares the scent spread of every available backend
+                     with spreadNeighbours on a small fixed grid. The grid
+                     has one high cell, which must not spread to itself.
+
+        Variables:
+        -spreads: scent spreads checked
+
+        Output: list of (backend, spread) whose spread differs
+    """
+    import Ecosystem as sim
+    import Config as cf
+
+    grid = nu.random.default_rng(0).normal(size=(5, 7))
+    grid[2, 3] = 10
+    failed = []
+    for spread in spreads:
+        config = cf.SimConfig(GRID_X=7, GRID_Y=5, SCENT_SPREAD=spread)
+        expected = spreadNeighbours(grid, spread)
+        for name in BACKENDS:
+            if(name == 'numba' and not hasNumba()):
+                continue
+            eco = sim.EcoSystem(config, name, generate=False)
+            out = nu.zeros_like(grid)
+            eco.backend.spreadMax(eco, grid, out, nu.zeros_like(grid))
+            if(not nu.array_equal(out, expected)):
+                failed.append((name, spread))
+    return failed
+
+# FUNCTION: waterSteps --------------------------------------------------------
+def waterSteps(water, y, x):
+    """ Description: Number of Moore moves from a cell to the closest water,
+                     found by scanning every water cell. Slow, used by
+                     checkWaterField.
+
+        Variables:
+        -water: boolean grid of the water cells
+        -y, x: position of the cell
+
+        Output: the number of moves, -1 if there is no water
+    """
+    best = -1
+    for waterY, waterX in zip(*nu.nonzero(water)):
+        steps = max(abs(int(waterY) - y), abs(int(waterX) - x))
+        if(best < 0 or steps < best):
+            best = steps
+    return best
+
+# FUNCTION: checkWaterField ---------------------------------------------------
+def checkWaterField(eco):
+    """ Description: Checks the water field the animals find water with
+                     against a scan of the water grid: every cell has the
+                     distance to the closest water, and its step stays in
+                     the grid and leads to a cell one move closer
+
+        Variables:
+        -eco: ecosystem whose water field is checked
+
+        Output: list of the (y, x) cells that are wrong
+    """
+    eco.buildWaterField()
+    water = eco.water_grid >= 1
+    failed = []
+    for y in range(eco.length):
+        for x in range(eco.width):
+            steps = waterSteps(water, y, x)
+            nextY = y + eco.water_step_y[y, x]
+            nextX = x + eco.water_step_x[y, x]
+            if(eco.water_dist[y, x] != steps or\
+               (steps > 0 and not (0 <= nextY < eco.length and\
+                                   0 <= nextX < eco.width and\
+                                   eco.water_dist[nextY, nextX] == steps - 1))):
+                failed.append((y, x))
+    return failed
+
+# FUNCTION: checkBackends -----------------------------------------------------
+def checkBackends(days=2, configs=None, seed=1):
+    """ Description: Runs small simulations with every available backend
+                     and compares them with the reference backend after
+                     every day: the animals, the plants and the counters
+                     of moves, drinks, eating and deaths. The water field
+                     of every simulation is checked as well.
+
+        Variables:
+        -days: days every simulation runs
+        -configs: SimConfigs to run, small grids with ponds, rain,
+                  extra carnivore steps and thirsty animals by default
+        -seed: seed of the simulations
+
+        Output: list of (backend, config number, day, what differs)
+    """
+    import Ecosystem as sim
+    import Config as cf
+
+    if(configs is None):
+        configs = [cf.SimConfig(GRID_X=30, GRID_Y=24),\
+                   cf.SimConfig(GRID_X=40, GRID_Y=30, NUM_PONDS=3,\
+                                RAIN_CHANCE=0.3, EXTRA_FOX_STEPS=3,\
+                                NUM_FOXES=6, SCENT_SPREAD=2,\
+                                THIRSTY_PERCENT=0.99)]
+    counters = ('herbiMove', 'carniMove', 'timesDrunk', 'plantsEaten',\
+                'plantsDied', 'herbiDied', 'carniDied', 'animalsDeath')
+    arrays = ['fauna.' + name for name in ('energy', 'water', 'temp', 'y',\
+                                          'x', 'species', 'alive')] +\
+             ['plants.' + name for name in ('size', 'energy', 'water',\
+                                            'alive')] +\
+             ['plant_grid', 'scent_grid']
+    failed = []
+    for number, config in enumerate(configs):
+        names = [name for name in BACKENDS if name != 'reference' and\
+                 (name != 'numba' or hasNumba())]
+        ecos = {name: sim.EcoSystem(config, name, seed=seed) for name in\
+                ['reference'] + names}
+        for day in range(days):
+            for eco in ecos.values():
+                eco.runADay()
+            reference = ecos['reference']
+            for name in names:
+                eco = ecos[name]
+                for path in arrays:
+                    if(not nu.array_equal(attribute(eco, path),\
+                                          attribute(reference, path))):
+                        failed.append((name, number, day, path))
+                for counter in counters:
+                    if(nu.any(nu.asarray(getattr(eco, counter)) !=\
+                              nu.asarray(getattr(reference, counter)))):
+                        failed.append((name, number, day, counter))
+        if(len(checkWaterField(ecos['reference'])) > 0):
+            failed.append(('reference', number, days - 1, 'water field'))
+    return failed
+
+# FUNCTION: attribute ---------------------------------------------------------
+def attribute(obj, path):
+    """ Description: Gets an attribute by dotted path, e.g. 'fauna.y'"""
+    for name in path.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+# FUNCTION: hasNumba ----------------------------------------------------------
+def hasNumba():
+    """ Description: Returns if numba is installed, without importing it"""
+    return importlib.util.find_spec('numba') is not None
+
+# FUNCTION: make --------------------------------------------------------------
+def make(backend):
+    """ Description: Creates a backend from its name
+
+        Variables:
+        -backend: 'reference', 'numpy', 'numba', 'tiled' or 'auto', or a
+                  backend instance which is returned as is
+
+        Output: the backend
+    """
+    if(isinstance(backend, Backend)):
+        return backend
+    if(backend == 'auto'):
+        backend = 'numba' if hasNumba() else 'numpy'
+    if(backend == 'tiled'):
+        import Tiled        # imports the ecosystem, so only when used
+        return Tiled.TiledBackend()
+    if(backend not in BACKENDS):
+        raise ValueError('unknown backend: ' + str(backend))
+    return BACKENDS[backend]()
+
+# Backends by name
+BACKENDS = {'reference': ReferenceBackend,
+            'numpy': Backend,
+            'numba': NumbaBackend}
+
+# PROGRAM SCRIPT ______________________________________________________________
+# Driver code for program
+if __name__ == '__main__':
+    failed = checkSpread()
+    print('scent spread differs: %s' % failed if failed else\
+          'scent spread matches')
+    failed = checkBackends()
+    print('backends differ: %s' % failed if failed else\
+          'backends match the reference')
+
+#==============================================================================
+# END FILE
@@ -0,0 +1,305 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the benchmarks of the ecosystem simulation.
+    The hot paths of the simulation are timed over several grid sizes and
+    population densities, each run with a fixed seed. Speed is reported as
+    the work a phase does per second: agent-hours for a whole day, grid
+    cells for the phases that go over the grids, animals for the animal
+    phases and living animals and plants for the starvation check.
+    Fast phases are called in batches so every timing is long enough to
+    measure. Results can be stored as a JSON baseline and later runs
+    compared against it to flag regressions.
+
+    Usage:
+        python Benchmark.py --save baseline.json
+        python Benchmark.py --compare baseline.json
+        python Benchmark.py --sizes 50 200 --densities default
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.7
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import Ecosystem as sim
+import Config as cf
+import numpy as nu
+import argparse
+import json
+import platform
+import time
+
+#==============================================================================
+# PROGRAM CONSTANTS ___________________________________________________________
+SIZES = (50, 200, 1000)         # Grid sizes, the grids are square
+SEED = 2020                     # Seed of every benchmarked simulation
+TOLERANCE = 0.10                # Slowdown flagged as a regression
+NOISE = 20e-6                   # Slowdown per call in seconds always ignored
+MIN_TIME = 0.2                  # Least seconds every phase is timed for
+MAX_CALLS = 256                 # Most calls in one timed batch
+MAX_CELLS = 2 ** 22             # Most grid cells forked for one batch
+
+# Population densities, burrows and foxes are per 50x50 cells
+DENSITIES = {'sparse': {'RABBITS_PER_BURROW': 2, 'NUM_BURROWS': 2,
+                        'NUM_FOXES': 1, 'PLANT_CHANCE': 0.2},
+             'default': {'RABBITS_PER_BURROW': 5, 'NUM_BURROWS': 5,
+                         'NUM_FOXES': 3, 'PLANT_CHANCE': 0.4},
+             'dense': {'RABBITS_PER_BURROW': 8, 'NUM_BURROWS': 20,
+                       'NUM_FOXES': 10, 'PLANT_CHANCE': 0.8}}
+
+# Timed phases and the unit of the work one call does
+PHASES = (('runADay', 'agent-hours'), ('updateScent', 'cells'),\
+          ('findWater', 'animals'), ('animalsEat', 'animals'),\
+          ('makePlants', 'cells'), ('checkStarved', 'agents'),\
+          ('displayFrame', 'cells'))
+
+#==============================================================================
+# BENCHMARK FUNCTIONS _________________________________________________________
+# FUNCTION: makeConfig --------------------------------------------------------
+def makeConfig(size, density):
+    """ Description: Configuration of a benchmark case. Burrows and foxes
+                     are scaled with the area of the grid.
+
+        Variables:
+        -size: rows and columns of the grid
+        -density: name of the population density (key of DENSITIES)
+
+        Output: the SimConfig
+    """
+    values = dict(DENSITIES[density])
+    area = max(1, (size * size) // 2500)
+    values['NUM_BURROWS'] *= area
+    values['NUM_FOXES'] *= area
+    values['MAX_RABBITS'] = values['NUM_BURROWS'] *\
+                            values['RABBITS_PER_BURROW']
+    return cf.SimConfig(GRID_X=size, GRID_Y=size, **values)
+
+# FUNCTION: phaseCall ---------------------------------------------------------
+def phaseCall(eco, phase):
+    """ Description: Runs one call of a benchmarked phase
+
+        Variables:
+        -eco: ecosystem the phase runs on
+        -phase: name of the phase
+    """
+    if(phase == 'runADay'):
+        eco.runADay()
+    elif(phase == 'updateScent'):
+        eco.backend.updateScent(eco)
+    elif(phase == 'findWater'):
+        eco.drawHour()
+        eco.findWater(nu.arange(len(eco.fauna)))
+    elif(phase == 'animalsEat'):
+        eco.animalsEat()
+    elif(phase == 'makePlants'):
+        eco.makePlants(eco.config.PLANT_REPOP_CHANCE)
+    elif(phase == 'checkStarved'):
+        eco.checkStarved()
+    elif(phase == 'displayFrame'):
+        eco.displayFrame(pause=0)
+
+# FUNCTION: agents ------------------------------------------------------------
+def agents(eco):
+    """ Description: Returns the number of living animals and plants"""
+    return int(nu.count_nonzero(eco.fauna.alive)) +\
+           int(nu.count_nonzero(eco.plants.alive))
+
+# FUNCTION: work --------------------------------------------------------------
+def work(eco, unit):
+    """ Description: Returns the work one call of a phase does
+
+        Variables:
+        -eco: ecosystem the phase runs on
+        -unit: unit of the work of the phase (see PHASES)
+    """
+    if(unit == 'agent-hours'):
+        return agents(eco) * eco.config.HOURS_PER_DAY
+    elif(unit == 'cells'):
+        return eco.length * eco.width
+    elif(unit == 'animals'):
+        return int(nu.count_nonzero(eco.fauna.alive))
+    return agents(eco)
+
+# FUNCTION: timePhase ---------------------------------------------------------
+def timePhase(eco, phase, repeats=5, minimum=MIN_TIME):
+    """ Description: Times calls of one phase. Every call runs on its own
+                     fork of the simulation, made just before the call and
+                     not timed, so one fork is kept at a time. Each repeat
+                     times a batch of calls, and the batch is doubled until
+                     the repeats take at least the minimum time together.
+                     Batches fork at most MAX_CELLS grid cells, large grids
+                     are timed with fewer calls.
+
+        Variables:
+        -eco: ecosystem the forks are made from
+        -phase: name of the phase
+        -repeats: timed batches
+        -minimum: least seconds all batches take together
+
+        Output: (fastest seconds per call, calls per batch)
+    """
+    most = max(1, min(MAX_CALLS, MAX_CELLS // (eco.length * eco.width)))
+    calls = 1
+    best = nu.inf
+    k = 0
+    while(k < repeats):
+        seconds = 0.0
+        for i in range(calls):
+            copy = eco.fork(1, seed=(SEED, k, i))[0]
+            copy.frame_image = eco.frame_image  # frames share one figure
+            start = time.perf_counter()
+            phaseCall(copy, phase)
+            seconds += time.perf_counter() - start
+            copy = None
+        if(seconds * repeats < minimum and calls < most):
+            calls = min(2 * calls, most)
+            continue
+        best = min(best, seconds / calls)
+        k += 1
+    return best, calls
+
+# FUNCTION: timeCase ----------------------------------------------------------
+def timeCase(size, density, repeats=5, backend='numpy'):
+    """ Description: Times every phase on one grid size and density, on a
+                     simulation that has run for a day
+
+        Variables:
+        -size: rows and columns of the grid
+        -density: name of the population density
+        -repeats: timed batches of every phase
+        -backend: compute backend of the simulation
+
+        Output: dictionary of phase results: seconds per call, calls per
+                batch, work per call and its unit, and work per second
+    """
+    import matplotlib.pyplot as plt
+
+    eco = sim.EcoSystem(makeConfig(size, density), backend, seed=SEED)
+    eco.runADay()
+    eco.displayFrame(pause=0)       # the figure every frame is drawn in
+
+    results = {}
+    try:
+        for phase, unit in PHASES:
+            seconds, calls = timePhase(eco, phase, repeats)
+            count = work(eco, unit)
+            results[phase] = {'seconds': seconds, 'calls': calls,\
+                              'work': count, 'unit': unit,\
+                              'work_per_second': count / seconds}
+    finally:
+        plt.close(eco.frame_image.figure)
+    return results
+
+# FUNCTION: run ---------------------------------------------------------------
+def run(sizes=SIZES, densities=None, repeats=5, backend='numpy'):
+    """ Description: Runs every benchmark case
+
+        Variables:
+        -sizes: grid sizes
+        -densities: names of the densities, all of DENSITIES by default
+        -repeats: timed batches of every phase
+        -backend: compute backend of the simulations
+
+        Output: dictionary of results, cases are keyed 'size/density'
+    """
+    import matplotlib
+    matplotlib.use('Agg')       # frames are drawn without a window
+
+    if(densities is None):
+        densities = list(DENSITIES)
+    cases = {}
+    for size in sizes:
+        for density in densities:
+            key = '%d/%s' % (size, density)
+            cases[key] = timeCase(size, density, repeats, backend)
+            report(key, cases[key])
+    return {'seed': SEED, 'backend': backend, 'repeats': repeats,\
+            'python': platform.python_version(), 'numpy': nu.__version__,\
+            'cases': cases}
+
+# FUNCTION: report ------------------------------------------------------------
+def report(key, results):
+    """ Description: Prints the results of a benchmark case"""
+    print(key)
+    for phase in results:
+        print('   %-14s %12.6f s %16.0f %s/s' %\
+              (phase, results[phase]['seconds'],\
+               results[phase]['work_per_second'], results[phase]['unit']))
+
+# FUNCTION: compare -----------------------------------------------------------
+def compare(baseline, current, tolerance=TOLERANCE, noise=NOISE):
+    """ Description: Compares results against a baseline. A phase that is
+                     slower than the baseline by more than the tolerance
+                     is a regression, unless a call is slower by less than
+                     the noise.
+
+        Variables:
+        -baseline: results loaded from a baseline file
+        -current: results of this run
+        -tolerance: allowed slowdown, 0.1 is 10 percent
+        -noise: slowdown per call in seconds that is never a regression
+
+        Output: list of (case, phase, change) of the regressions, change is
+                the relative change in work per second
+    """
+    regressions = []
+    for key in current['cases']:
+        if(key not in baseline['cases']):
+            continue
+        for phase in current['cases'][key]:
+            old = baseline['cases'][key].get(phase, {})
+            new = current['cases'][key][phase]
+            if(old.get('unit') != new['unit']):
+                continue        # not measured the same way
+            change = new['work_per_second'] / old['work_per_second'] - 1
+            slower = new['seconds'] - old['seconds']
+            flag = ''
+            if(change < -tolerance and slower > noise):
+                regressions.append((key, phase, change))
+                flag = '  REGRESSION'
+            print('%-16s %-14s %+7.1f%%%s' % (key, phase, 100 * change, flag))
+    return regressions
+
+# FUNCTION: main --------------------------------------------------------------
+def main(args=None):
+    """ Description: Entry point when the file is run as a script
+
+        Output: exit status, 1 if a regression was found
+    """
+    parser = argparse.ArgumentParser(description='Benchmarks the ecosystem')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--densities', nargs='+', choices=list(DENSITIES))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--backend', default='numpy')
+    parser.add_argument('--save', help='write the results to a JSON file')
+    parser.add_argument('--compare', help='JSON baseline to compare with')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--noise', type=float, default=NOISE)
+    options = parser.parse_args(args)
+
+    results = run(options.sizes, options.densities, options.repeats,\
+                  options.backend)
+    if(options.save is not None):
+        with open(options.save, 'w') as file:
+            json.dump(results, file, indent=2)
+    if(options.compare is not None):
+        with open(options.compare) as file:
+            baseline = json.load(file)
+        if(len(compare(baseline, results, options.tolerance,\
+                       options.noise)) > 0):
+            return 1
+    return 0
+
+# PROGRAM SCRIPT ______________________________________________________________
+# Driver code for program
+if __name__ == '__main__':
+    raise SystemExit(main())
+
+#==============================================================================
+# END FILE
@@ -0,0 +1,126 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the configuration of an ecosystem simulation.
+    A SimConfig holds every constant of Variables.py, with some of them
+    changed for one simulation. Configurations can't be modified once made,
+    so any number of simulations with different constants can run in the
+    same process without changing the Variables module.
+    Values that are derived from the constants, like the thresholds and
+    costs of every species, are computed once when the configuration is
+    made.
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.7
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import Variables as const
+import Fauna as fa
+
+#==============================================================================
+# CLASS: SimConfig ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class SimConfig:
+    """ Description: Immutable set of simulation constants. Every constant of
+                     Variables.py is an attribute, e.g. config.GRID_X.
+
+        Variables:
+        -fauna_stats: per species arrays of thresholds and costs, indexed
+                      by species code (see Fauna.statsTable)
+
+        Methods: replace() - Copy of the configuration with changed constants
+                 values() - Dictionary of every constant
+    """
+
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self, **overrides):
+        """ Description: Class constructor, starts from the values in
+                         Variables.py
+
+            Variables:
+            -overrides: constants that are changed, e.g. NUM_FOXES=5
+        """
+        values = defaults()
+        for name in overrides:
+            if(name not in values):
+                raise TypeError('unknown simulation constant: ' + name)
+        values.update(overrides)
+
+        for name in values:
+            object.__setattr__(self, name, values[name])
+        object.__setattr__(self, '_names', tuple(sorted(values)))
+
+        #Derived values
+        object.__setattr__(self, 'fauna_stats', fa.statsTable(self))
+
+    # MEATHOD: setattr --------------------------------------------------------
+    def __setattr__(self, name, value):
+        raise AttributeError('SimConfig is immutable, use replace()')
+
+    # MEATHOD: delattr --------------------------------------------------------
+    def __delattr__(self, name):
+        raise AttributeError('SimConfig is immutable, use replace()')
+
+    # MEATHOD: replace --------------------------------------------------------
+    def replace(self, **overrides):
+        """ Description: Makes a copy of the configuration with some
+                         constants changed
+
+            Variables:
+            -overrides: constants that are changed
+
+            Output: the new configuration
+        """
+        values = self.values()
+        values.update(overrides)
+        return SimConfig(**values)
+
+    # MEATHOD: values ---------------------------------------------------------
+    def values(self):
+        """ Description: Returns a dictionary of every constant"""
+        return {name: getattr(self, name) for name in self._names}
+
+    # MEATHOD: reduce ---------------------------------------------------------
+    def __reduce__(self):
+        # rebuilt from its constants when sent to another process
+        return (rebuild, (self.values(),))
+
+    # MEATHOD: eq -------------------------------------------------------------
+    def __eq__(self, other):
+        return isinstance(other, SimConfig) and\
+               self.values() == other.values()
+
+    # MEATHOD: hash -----------------------------------------------------------
+    def __hash__(self):
+        return hash(tuple(self.values().items()))
+
+    # MEATHOD: repr -----------------------------------------------------------
+    def __repr__(self):
+        changed = []
+        base = defaults()
+        for name in self._names:
+            if(getattr(self, name) != base.get(name)):
+                changed.append(name + '=' + repr(getattr(self, name)))
+        return 'SimConfig(' + ', '.join(changed) + ')'
+
+# FUNCTION: defaults ----------------------------------------------------------
+def defaults():
+    """ Description: Returns the constants of Variables.py as a dictionary.
+                     Constants are the upper case names of the module.
+    """
+    return {name: getattr(const, name) for name in dir(const)\
+            if name.isupper() and not name.startswith('_')}
+
+# FUNCTION: rebuild -----------------------------------------------------------
+def rebuild(values):
+    """ Description: Makes a configuration from a dictionary of constants"""
+    return SimConfig(**values)
+
+#==============================================================================
+# END FILE
@@ -14,6 +14,8 @@
     to track.
     
     This file also contains functions for vizualizing the simulation.
+    Frames can be written to PNG, GIF or MP4 files without a display
+    (see showSim and Frames.py).
 """
 
 # ADDITIONAL DOCUMENTATION ____________________________________________________
@@ -23,19 +25,36 @@
 
 # Notes:
 # - Written for Python 3.7
+# - Needs numpy 1.25 or newer (Generator.spawn and BitGenerator.seed_seq)
 # - To test simply run the file in the canopy distribution of python
 #  or through some other IDE like visual studio or spyder
 # - Documentation style inspired by CSS 458 professor Johnny Lin
 
 #==============================================================================
 # PROGRAM IMPORTS _____________________________________________________________
-import Variables as const
+import Config as cf
+import Backends as bk
 import Fauna as fa
 import Flora as fo
+import Frames as fr
 import numpy as nu
-import matplotlib.pyplot as plt
-import random
-import math
+import copy
+import json
+import os
+import threading
+
+plt = None      # matplotlib.pyplot, imported by the first display
+
+# FUNCTION: pyplot ------------------------------------------------------------
+def pyplot():
+    """ Description: Imports matplotlib.pyplot the first time it is needed,
+                     so the simulation can run without loading it
+    """
+    global plt
+    if(plt is None):
+        import matplotlib.pyplot
+        plt = matplotlib.pyplot
+    return plt
 
 #==============================================================================
 # CLASS: Ecosystem ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -46,37 +65,68 @@ class EcoSystem:
     
     
         Variables: 
-        -var: 
+        -config: SimConfig holding the constants of the simulation
+        -backend: computes the phases of every step (see Backends.py)
+        -rng: random number generator every random draw is taken from
+        -recorder: Recorder.Recorder taking time series, None to not record
+        -history: History.HistoryWriter copying grids, None to not record
+        -timer: Timer.PhaseTimer timing the phases, None to not time
     
-        Methods: displayFrame() - Displays main simulation with rabbits and foxes
+        Methods: frameCodes() - Builds a frame as a grid of colour codes
+                 buildFrame() - Builds a frame as an RGB image
+                 displayFrame() - Displays main simulation with rabbits and foxes
                  displayScent() - Displays scent grid
                  displayTemp() - Displays temperature grid
                  displayLight() - Displays light grid
                  displayWater() - Displays water grid
                  displayGrids() - Calls all display functions
                  displayResults() - Prints results of the simulation
-                 randomWalk() - Move an animal in its moore neighborhood
-                 track() - Move a carnivore to a nearby area with the highest scent
-                 forage() - Move an herbivore to a nearby area with edible flora
-                 animalsEat() - Iterate through all animal objects and has them eat
-                                if hungry
+                 state() - Copies the state of the simulation into arrays
+                 save() - Writes the state of the simulation to a file
+                 load() - Reads a simulation written by save()
+                 checkpoint() - Saves the simulation from a background thread
+                 waitForSave() - Waits until the last checkpoint is written
+                 autoSave() - Checkpoints the simulation every few days
+                 fork() - Clones the simulation into variants
+                 clone() - Copies the simulation with its own state
+                 nearby() - Cells within one step of a set cell of a grid
+                 plantsNearby() - Cells within one step of a plant
+                 drawHour() - Draws the random numbers animals use in an hour
+                 draw() - Looks up the pre-drawn random numbers of animals
+                 randomWalk() - Move animals in their moore neighborhood
+                 track() - Move carnivores to a nearby area with the highest scent
+                 forage() - Move herbivores to a nearby area with edible flora
+                 findWater() - Move thirsty animals towards the closest water
+                 buildWaterField() - Finds the way to water from every cell
+                 animalsEat() - Iterate through all hungry animals and has them eat
+                 herbivoresEat() - Hungry herbivores eat plants
+                 carnivoresEat() - Hungry carnivores eat herbivores or plants
                  eatPlant() - Has an herbivore eat if a plant is nearby
                  carnivoreEat() - Checks if there is a nearby herbivore and eats it
-                 plantsAbsorb() - Has every plant update themselves
-                 checkPlantGrowth() - Has every plant call its growth function
+                 plantsAbsorb() - Has every plant update itself
+                 checkPlantGrowth() - Has every plant grow
                  checkStarved() - Checks and removes dead fauna
+                 removeDead() - Removes dead entities and counts their deaths
                  updateScent() - Spreads scent where scented entities are and dissipates
                                  scents that have been left over time.
+                 spreadMax() - Largest value within the scent spread of each cell
+                 regions() - Number of regions the world is laid out in
                  initWater() - initializes water locations
                  makeWaterBody() - creates a body of water with given dimensions
                  weatherCheck() - changes weather depending on conditions
                  makeClouds() - creates clouds
+                 clearSky() - replaces the light with full sunlight
                  updateTemp() - changes temperature depending on movement of entities
+                 baseTemp() - temperature of the water, kept until it changes
+                 makeWorld() - water and temperature layers shared by sweeps
+                 worldKey() - key of simulations with the same world layers
                  makePlants() - Test every grid space to spawn a plant
                  initRabbits() - spawn rabbit burrows
                  spawnRabbits() - spawn rabbits around the burrows
                  initFoxes() - spawn foxes
                  runADay() - run simulation for a day
+                 recordHour() - record the hour if recording is on
+                 timings() - Timing report of the phases
                  runAWeek() - run simulation for 7 days
                  runAMonth() - run simulation for 30 days
                  testSim() - runs simulation calls displayGrids()
@@ -84,42 +134,139 @@ class EcoSystem:
         
     """
     
+    # Frame colours indexed by the codes of frameCodes()
+    FRAME_COLORS = nu.array([[0.2, 0.2, 0],       # ground
+                             [0.5, 0.7, 0.9],     # shallow water
+                             [0, 0.3, 0.7],       # water
+                             [0, 0.4, 0],         # plant
+                             [0.7, 0.7, 0.7],     # burrow
+                             [1, 1, 1],           # herbivore
+                             [1, 0.6, 0]])        # carnivore
+    
+    # Pond centres as fractions of a region, along both axes
+    POND_SPOTS = (0.1, 0.2, 0.3, 0.7, 0.8, 0.9)
+    
+    # Region cells per cell of water body spread, smaller regions get a
+    # smaller spread so the water leaves land for burrows
+    CELLS_PER_SPREAD = 10
+    
+    # Random burrow spots tried for every burrow before the rest are
+    # picked among the free land cells
+    BURROW_TRIES = 100
+    
+    # Moore neighbourhood offsets used for animal movement
+    MOVE_Y = nu.array([1, 0, -1, 1, -1, 1, 0, -1])
+    MOVE_X = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
+    
+    # State written by save(), grids and counters are EcoSystem attributes
+    SAVED_GRIDS = ('light_grid', 'water_grid', 'scent_grid', 'temp_grid',\
+                   'plant_grid', 'herbivore_grid', 'burrow_grid',\
+                   'carnivore_grid')
+    SAVED_COUNTERS = ('frame', 'iterations', 'rained', 'water_version',\
+                      'plantsEaten', 'plantsDied', 'carniDied', 'herbiDied',\
+                      'animalsDeath', 'timesDrunk', 'timesRained',\
+                      'carniMove', 'herbiMove')
+    SAVED_PLANTS = ('size', 'energy', 'water', 'alive')
+    SAVED_FAUNA = ('energy', 'water', 'temp', 'y', 'x', 'species', 'alive',\
+                   'cause')
+    
+    # Grids that are replaced instead of changed in place, shared by forks
+    SHARED_GRIDS = ('light_grid', 'water_grid', 'temp_grid', 'burrow_grid',\
+                    'base_temp')
+    # Constants the world layers (see makeWorld) are made from
+    WORLD_CONSTANTS = ('GRID_X', 'GRID_Y', 'REGION_SIZE', 'FIELD_DTYPE',\
+                       'MIN_MOISTURE', 'NUM_PONDS', 'POND_SPREAD', 'HAS_LAKE',\
+                       'LAKE_SPREAD', 'NATRUAL_TEMP', 'WATER_TEMP')
+    
+    # Grids every fork gets its own copy of
+    OWNED_GRIDS = ('scent_grid', 'plant_grid', 'herbivore_grid',\
+                   'carnivore_grid')
     
     # MEATHOD: INIT -----------------------------------------------------------
-    def __init__(self):
+    def __init__(self, config=None, backend='numpy', seed=None,\
+                 generate=True, world=None):
         """ Description: Class constructor
             
             Variables: 
                 -self: class instance
+                -config: SimConfig of the simulation, the constants of
+                         Variables.py by default
+                -backend: name of the compute backend ('reference', 'numpy',
+                          'numba', 'tiled' or 'auto') or a Backends.Backend
+                          instance
+                -seed: seed of the random number generator, runs with the
+                       same seed, config and backend are identical
+                -generate: False leaves the world empty, used by load()
+                -world: world layers made by makeWorld() for the same
+                        config and seed, used read only instead of
+                        generating the water
             Output: 
                 Object is created and variables are initialized.
         """
+        if(config is None):
+            config = cf.SimConfig()
+        self.config = config
+        self.backend = bk.make(backend)
+        self.rng = nu.random.default_rng(seed)
+        # Separate stream for the world layout, so the layout can be made
+        # ahead of the simulation without changing its other draws
+        self.world_rng = nu.random.default_rng(\
+                             self.rng.bit_generator.seed_seq.spawn(1)[0])
+        self.draws = nu.zeros((0, 2))   # Random numbers of the current hour
+        self.step = 0                   # Movement step within the hour
         self.frame = 0
+        self.frame_image = None     # image of the displayFrame window
         self.iterations = 0
         self.rained = False
 
         #Grid Size variables
-        self.length = const.GRID_Y
-        self.width = const.GRID_X
+        self.length = self.config.GRID_Y
+        self.width = self.config.GRID_X
         
         # These grids track constant values accross the grid
-        self.light_grid = nu.ones((self.length, self.width))    # Light Data
-        self.water_grid = nu.ones((self.length, self.width))*const.MIN_MOISTURE # Water Data
-        self.scent_grid = nu.zeros((self.length, self.width))   # Scent Data
-        self.temp_grid = nu.zeros((self.length+1, self.width))  # Temperature Data
-        self.temp_grid[-1,0] = const.MIN_TEMP       # Initialize temp grid
-        self.temp_grid[-1,-1] = const.MAX_TEMP
+        field = nu.dtype(self.config.FIELD_DTYPE)   # Precision of the grids
+        self.light_grid = nu.ones((self.length, self.width), field)    # Light Data
+        if(world is None):
+            self.water_grid = nu.ones((self.length, self.width), field)*self.config.MIN_MOISTURE # Water Data
+        else:
+            self.water_grid = world['water_grid']   # shared, not allocated
+        self.scent_grid = nu.zeros((self.length, self.width), field)   # Scent Data
+        self.scent_buffers = [nu.zeros((self.length, self.width), field)\
+                              for i in range(4)]  # Scent update buffers
+        self.temp_grid = nu.zeros((self.length+1, self.width), field)  # Temperature Data
+        self.temp_grid[-1,0] = self.config.MIN_TEMP       # Initialize temp grid
+        self.temp_grid[-1,-1] = self.config.MAX_TEMP
+        
+        # Water part of the temperature, rebuilt when the water changes
+        self.base_temp = None
+        self.base_temp_version = -1
+        
+        # The temperature is rebuilt only when the water or light changes
+        self.light_version = 0              # Counts changes to light_grid
+        self.clear_sky = True               # light_grid is full sunlight
+        self.temp_version = None            # (water, light) versions of temp
+        
+        # Cached distance to water, rebuilt when the water version changes
+        self.water_version = 0              # Counts changes to water_grid
+        self.water_field_version = -1       # Water version of the field
+        self.water_source = None            # Water cells of the field
 
-        # These grids are booleans(0/1) for when animals are at a location
-        self.plant_grid = nu.zeros((self.length, self.width))       # Plant Locations
-        self.herbivore_grid = nu.zeros((self.length, self.width))   # Herbivore Locations
-        self.burrow_grid = nu.zeros((self.length, self.width))      # Rabbit burrow locations
-        self.carnivore_grid = nu.zeros((self.length, self.width))   # Carnivore locations
-        
-        # These lists hold every individual plant and animal
-        self.plant_list = []        # List of plant objects in simulation
-        self.herbivore_list = []    # List of herbivore objects in simulation
-        self.carnivore_list = []    # List of carnivore objects in simulation
+        # These grids are booleans for when animals are at a location
+        shape = (self.length, self.width)
+        self.plant_grid = nu.zeros(shape, dtype=bool)       # Plant Locations
+        self.herbivore_grid = nu.zeros(shape, dtype=bool)   # Herbivore Locations
+        self.burrow_grid = nu.zeros(shape, dtype=bool)      # Rabbit burrow locations
+        self.carnivore_grid = nu.zeros(shape, dtype=bool)   # Carnivore locations
+        self.plants_near = None     # Cells next to plants, None if outdated
+        
+        # These map each grid cell to the animals standing on it
+        self.herbivore_index = fa.CellIndex(self.length, self.width)
+        self.carnivore_index = fa.CellIndex(self.length, self.width)
+        
+        # These hold every individual plant and animal
+        self.plants = fo.PlantField(self.length, self.width, config,\
+                                   self.rng) # Plant data
+        self.fauna = fa.Population(config, self.rng)    # Table of animals in simulation
         
         #Counting variables
         self.plantsEaten = 0        # Total amount of plants eaten
@@ -132,53 +279,92 @@ class EcoSystem:
         self.carniMove = [0, 0, 0, 0]   # Tracks movement data of carnivores
         self.herbiMove = [0, 0, 0, 0]   # Tracks movement data of herbivores
         
+        self.recorder = None            # Time series recorder
+        self.history = None             # Grid history writer
+        self.timer = None               # Phase timer
+        
+        # Background checkpoints
+        self.saver = None               # Thread writing the last checkpoint
+        self.save_path = None           # File written by autoSave
+        self.save_days = 0              # Days between autoSave checkpoints
+        
+        if(not generate):
+            return
+        
         # initalization functions
+        if(world is None):
+            self.initWater()
+        else:
+            self.base_temp = world['base_temp']
+            self.water_version += 1
+            self.base_temp_version = self.water_version
         self.wheatherCheck()
-        self.initWater()
         self.updateTemp()
         self.initRabbits()
-        self.makePlants(const.PLANT_CHANCE)
+        self.makePlants(self.config.PLANT_CHANCE)
         self.initFoxes()
-        self.updateScent()
+        self.backend.updateScent(self)
         
         # inital display
         #self.displayGrids()
         
+    # MEATHOD: frameCodes -----------------------------------------------------
+    def frameCodes(self):
+        """ Description: builds a frame of the simulation as colour codes
+                         (indices into FRAME_COLORS)
+            
+            Variables: 
+                -self: the SimGrid object instance
+                
+            Output:
+                grid of colour codes with the first grid row at the bottom
+        """
+        # later layers are drawn over earlier ones
+        codes = nu.zeros((self.length, self.width), dtype=nu.uint8)
+        codes[self.water_grid >= .75] = 1
+        codes[self.water_grid >= 1] = 2
+        codes[self.plant_grid] = 3
+        codes[self.burrow_grid] = 4
+        codes[self.herbivore_grid] = 5
+        codes[self.carnivore_grid] = 6
+        return codes[::-1]
+    
+    # MEATHOD: buildFrame -----------------------------------------------------
+    def buildFrame(self):
+        """ Description: builds the RGB frame of the simulation
+            
+            Variables: 
+                -self: the SimGrid object instance
+        """
+        return self.FRAME_COLORS[self.frameCodes()]
+    
     # MEATHOD: displayFrame ---------------------------------------------------
-    def displayFrame(self):
-        """ Description: displays a frame from the simulation
+    def displayFrame(self, pause=0.5):
+        """ Description: displays a frame from the simulation. The same
+                         window is reused for every frame.
             
             Variables: 
                 -self: the SimGrid object instance
+                -pause: seconds the frame is shown for, 0 only draws it
         """
-        # get boarder values of rgb grid
-        simFrame = nu.full((self.length, self.width, 3), [0.2, 0.2, 0])
-        
-        # get values of rgb grid
-        shape = nu.shape(simFrame)
-        
-        for y in range(shape[0]):
-            for x in range(shape[1]):
-                if(self.carnivore_grid[y,x] == 1):
-                    simFrame[shape[0]-y-1, x, :] = [1, 0.6, 0]
-                elif(self.herbivore_grid[y,x] == 1):
-                    simFrame[shape[0]-y-1, x, :] = [1, 1, 1] 
-                elif(self.burrow_grid[y,x] == 1):
-                    simFrame[shape[0]-y-1, x, :] = [0.7, 0.7, 0.7]
-                elif(self.plant_grid[y,x] == 1):
-                    simFrame[shape[0]-y-1, x, :] = [0, 0.4, 0]
-                elif(self.water_grid[y,x] >= 1):
-                    simFrame[shape[0]-y-1, x, :] = [0, 0.3, 0.7]
-                elif(self.water_grid[y,x] >= .75):
-                    simFrame[shape[0]-y-1, x, :] = [0.5, 0.7, 0.9]
-
+        plt = pyplot()
+        simFrame = self.buildFrame()
+        
         # formatting
-        fig, axs = plt.subplots(1, 1)
-        plt.title("EcoSystem Simulation Frame: " + str(self.frame))
-        axs.axis("off")
-        axs.imshow(simFrame)
-        plt.pause(0.5)
-
+        if(self.frame_image is None or\
+           not plt.fignum_exists(self.frame_image.figure.number)):
+            fig, axs = plt.subplots(1, 1)
+            axs.axis("off")
+            self.frame_image = axs.imshow(simFrame)
+        else:
+            self.frame_image.set_data(simFrame)
+        self.frame_image.axes.set_title("EcoSystem Simulation Frame: " +\
+                                        str(self.frame))
+        if(pause > 0):
+            plt.pause(pause)
+        else:
+            self.frame_image.figure.canvas.draw()
+    
     # MEATHOD: displayScent ---------------------------------------------------
     def displayScent(self):
         """ Description: displays constant grid color maps
@@ -186,6 +372,7 @@ class EcoSystem:
             Variables: 
                 -self: the SimGrid object instance
         """
+        plt = pyplot()
         
         cm = 'PRGn'
         fig, axs = plt.subplots(1, 1)
@@ -203,6 +390,7 @@ class EcoSystem:
             Variables: 
                 -self: the SimGrid object instance
         """
+        plt = pyplot()
         
         cm = 'coolwarm'
         fig, axs = plt.subplots(1, 1)
@@ -220,6 +408,7 @@ class EcoSystem:
             Variables: 
                 -self: the SimGrid object instance
         """
+        plt = pyplot()
         
         cm = 'YlOrBr_r'
         fig, axs = plt.subplots(1, 1)
@@ -238,6 +427,7 @@ class EcoSystem:
             Variables: 
                 -self: the SimGrid object instance
         """
+        plt = pyplot()
         
         cm = 'Blues'
         fig, axs = plt.subplots(1, 1)
@@ -308,257 +498,526 @@ class EcoSystem:
         print("   -Times Waited:", self.carniMove[3])
         print("")
     
+    # MEATHOD: state ----------------------------------------------------------
+    def state(self):
+        """ Description: Copies the state of the simulation into a dictionary
+                         of arrays. The configuration, backend, random
+                         generator state and the seed sequence the
+                         generator was made from are stored as JSON text.
+            
+            Variables: 
+                -self: the SimGrid object instance
+            
+            Output:
+                dictionary of arrays that load() can restore
+        """
+        state = {}
+        for name in self.SAVED_GRIDS:
+            state[name] = getattr(self, name).copy()
+        for name in self.SAVED_COUNTERS:
+            state[name] = nu.array(getattr(self, name))
+        for name in self.SAVED_PLANTS:
+            state['plants_' + name] = getattr(self.plants, name).copy()
+        for name in self.SAVED_FAUNA:
+            state['fauna_' + name] = getattr(self.fauna, name).copy()
+        
+        state['config'] = nu.array(json.dumps(self.config.values()))
+        state['backend'] = nu.array(self.backend.name)
+        state['rng'] = nu.array(json.dumps(self.rng.bit_generator.state))
+        seq = self.rng.bit_generator.seed_seq
+        state['seed_seq'] = nu.array(json.dumps({'entropy': seq.entropy,\
+                                     'spawn_key': list(seq.spawn_key),\
+                                     'pool_size': seq.pool_size,\
+                                     'n_children_spawned':\
+                                         seq.n_children_spawned}))
+        return state
+    
+    # MEATHOD: save -----------------------------------------------------------
+    def save(self, path, state=None):
+        """ Description: Writes the state of the simulation to a compressed
+                         .npz file. The file is replaced only once it is
+                         completely written.
+            
+            Variables: 
+                -self: the SimGrid object instance
+                -path: file to write
+                -state: state to write, the current state by default
+        """
+        if(state is None):
+            state = self.state()
+        temp = path + '.tmp'
+        with open(temp, 'wb') as file:
+            nu.savez_compressed(file, **state)
+        os.replace(temp, path)
+    
+    # MEATHOD: load -----------------------------------------------------------
+    @classmethod
+    def load(cls, path, backend=None):
+        """ Description: Reads a simulation written by save(). The simulation
+                         continues exactly as the saved one would have.
+            
+            Variables: 
+                -path: file to read
+                -backend: backend of the loaded simulation, the saved one by
+                          default
+            
+            Output:
+                the restored EcoSystem
+        """
+        with nu.load(path) as state:
+            config = cf.SimConfig(**json.loads(str(state['config'])))
+            if(backend is None):
+                backend = str(state['backend'])
+            eco = cls(config, backend, generate=False)
+            
+            for name in cls.SAVED_GRIDS:
+                nu.copyto(getattr(eco, name), state[name], casting='unsafe')
+            for name in cls.SAVED_COUNTERS:
+                setattr(eco, name, state[name].tolist())
+            for name in cls.SAVED_PLANTS:
+                nu.copyto(getattr(eco.plants, name), state['plants_' + name])
+            for name in cls.SAVED_FAUNA:
+                setattr(eco.fauna, name, state['fauna_' + name])
+            if('seed_seq' in state):
+                #Forks spawn their generators from the seed sequence
+                seq = json.loads(str(state['seed_seq']))
+                seq['spawn_key'] = tuple(seq['spawn_key'])
+                eco.rng = nu.random.Generator(type(eco.rng.bit_generator)(\
+                              nu.random.SeedSequence(**seq)))
+                eco.plants.rng = eco.rng
+                eco.fauna.rng = eco.rng
+            eco.rng.bit_generator.state = json.loads(str(state['rng']))
+            eco.clear_sky = False       # the saved light may have clouds
+        
+        eco.updateOccupancy()
+        return eco
+    
+    # MEATHOD: checkpoint -----------------------------------------------------
+    def checkpoint(self, path):
+        """ Description: Saves the simulation from a background thread. The
+                         state is copied first, so the simulation can keep
+                         running while the file is written.
+            
+            Variables: 
+                -self: the SimGrid object instance
+                -path: file to write
+        """
+        self.waitForSave()
+        self.saver = threading.Thread(target=self.save,\
+                                      args=(path, self.state()))
+        self.saver.start()
+    
+    # MEATHOD: waitForSave ----------------------------------------------------
+    def waitForSave(self):
+        """ Description: Waits until the last checkpoint is written"""
+        if(self.saver is not None):
+            self.saver.join()
+            self.saver = None
+    
+    # MEATHOD: autoSave -------------------------------------------------------
+    def autoSave(self, path, days):
+        """ Description: Checkpoints the simulation at the end of every few
+                         days
+            
+            Variables: 
+                -self: the SimGrid object instance
+                -path: file to write, replaced by every checkpoint
+                -days: days between checkpoints, 0 to stop
+        """
+        self.save_path = path
+        self.save_days = days
+    
+    # MEATHOD: fork -----------------------------------------------------------
+    def fork(self, n, overrides=None, seed=None):
+        """ Description: Clones the simulation into variants that continue
+                         from its current state. The light, water,
+                         temperature and burrow grids are shared until a
+                         variant replaces them, so they are made read only,
+                         in this simulation too: after a fork, its methods
+                         replace these grids instead of changing them, and
+                         code that writes into them directly raises.
+                         Everything else is copied. The grid size and
+                         precision (FIELD_DTYPE) cannot be changed.
+            
+            Variables: 
+                -self: the SimGrid object instance
+                -n: number of variants
+                -overrides: dictionary of constants changed in the variants
+                -seed: seed the random generators of the variants are made
+                       from, by default they are spawned from this one's
+            
+            Output:
+                list of the variants
+        """
+        config = self.config.replace(**(overrides or {}))
+        if(config.GRID_X != self.width or config.GRID_Y != self.length):
+            raise ValueError('forks must keep the grid size')
+        if(config.FIELD_DTYPE != self.config.FIELD_DTYPE):
+            raise ValueError('forks must keep the grid precision')
+        
+        if(seed is None):
+            rngs = self.rng.spawn(n)
+        else:
+            rngs = [nu.random.default_rng(child) for child in\
+                    nu.random.SeedSequence(seed).spawn(n)]
+        
+        for name in self.SHARED_GRIDS:
+            if(getattr(self, name) is not None):
+                getattr(self, name).flags.writeable = False
+        return [self.clone(config, rng) for rng in rngs]
+    
+    # MEATHOD: clone ----------------------------------------------------------
+    def clone(self, config, rng):
+        """ Description: Copies the simulation, sharing the read only grids
+            
+            Variables: 
+                -self: the SimGrid object instance
+                -config: SimConfig of the copy
+                -rng: random number generator of the copy
+            
+            Output:
+                the copy
+        """
+        eco = copy.copy(self)
+        eco.config = config
+        eco.rng = rng
+        eco.frame_image = None
+        eco.recorder = None
+        eco.history = None
+        eco.timer = None
+        eco.saver = None
+        eco.save_path = None
+        eco.save_days = 0
+        if(config.NATRUAL_TEMP != self.config.NATRUAL_TEMP or\
+           config.WATER_TEMP != self.config.WATER_TEMP):
+            eco.base_temp_version = -1  # the shared base is for other values
+        if(config != self.config):
+            eco.temp_version = None     # the temperature may be for others
+        
+        for name in self.OWNED_GRIDS:
+            setattr(eco, name, getattr(self, name).copy())
+        eco.scent_buffers = [nu.zeros_like(grid) for grid in\
+                             self.scent_buffers]
+        eco.animalsDeath = list(self.animalsDeath)
+        eco.carniMove = list(self.carniMove)
+        eco.herbiMove = list(self.herbiMove)
+        
+        eco.plants = self.plants.copy(config, rng)
+        eco.fauna = self.fauna.copy(config, rng)
+        eco.herbivore_index = fa.CellIndex(self.length, self.width)
+        eco.carnivore_index = fa.CellIndex(self.length, self.width)
+        eco.updateOccupancy()
+        return eco
+    
+    # MEATHOD: neighbours -----------------------------------------------------
+    def neighbours(self, idx):
+        """ Description: Moore neighbourhood of the given animals
+        
+            Variables: 
+            -idx: row indices of the animals
+        
+            Output: 
+                y and x positions of the 8 neighbouring cells of each animal
+                and a mask of the cells inside the borders of the grid
+        """
+        moveY = self.fauna.y[idx][:, None] + self.MOVE_Y
+        moveX = self.fauna.x[idx][:, None] + self.MOVE_X
+        
+        #Check Borders
+        valid = nu.logical_not(nu.logical_or(\
+                nu.logical_or(moveY >= self.length, moveY < 0),\
+                nu.logical_or(moveX >= self.width, moveX < 0)))
+        
+        #Clip so invalid cells can still be used to index grids
+        moveY = nu.clip(moveY, 0, self.length - 1)
+        moveX = nu.clip(moveX, 0, self.width - 1)
+        return [moveY, moveX, valid]
+    
+    # MEATHOD: nearby ---------------------------------------------------------
+    def nearby(self, grid):
+        """ Description: Finds the cells within one step of a set cell of a
+                         boolean grid, for the whole grid at once. The Moore
+                         neighbourhood is taken with shifted ORs, first along
+                         y and then along x.
+        
+            Variables: 
+            -grid: boolean grid, e.g. plant_grid
+        
+            Output: 
+                boolean grid, True where the cell or one of its 8
+                neighbours is set
+        """
+        work = grid.copy()
+        work[1:] |= grid[:-1]
+        work[:-1] |= grid[1:]
+        near = work.copy()
+        near[:, 1:] |= work[:, :-1]
+        near[:, :-1] |= work[:, 1:]
+        return near
+    
+    # MEATHOD: plantsNearby ---------------------------------------------------
+    def plantsNearby(self):
+        """ Description: Returns nearby(plant_grid), kept until the plants
+                         change
+        """
+        if(self.plants_near is None):
+            self.plants_near = self.nearby(self.plant_grid)
+        return self.plants_near
+    
+    # MEATHOD: drawHour -------------------------------------------------------
+    def drawHour(self):
+        """ Description: Draws every random number the animals use to move
+                         in the coming hour in one call. Each animal owns a
+                         row with two numbers for every movement step: the
+                         choice to walk or wait and the choice of cell.
+        """
+        steps = max(1, self.config.EXTRA_FOX_STEPS)
+        self.draws = self.rng.uniform(0, 1, (len(self.fauna), 2 * steps))
+        self.step = 0
+    
+    # MEATHOD: draw -----------------------------------------------------------
+    def draw(self, idx, column):
+        """ Description: Looks up the pre-drawn random numbers of animals for
+                         the current movement step
+        
+            Variables: 
+            -idx: row indices of the animals
+            -column: 0 for the walk choice, 1 for the cell choice
+        """
+        return self.draws[idx, 2 * self.step + column]
+    
+    # MEATHOD: pickRandom -----------------------------------------------------
+    def pickRandom(self, mask, draws):
+        """ Description: Picks one random True column from every row of mask
+        
+            Variables: 
+            -mask: boolean array, one row per animal
+            -draws: uniform random number for each row
+        
+            Output: 
+                column index chosen for each row
+        """
+        count = nu.count_nonzero(mask, axis=1)
+        choice = nu.minimum((draws * count).astype(int), count - 1)
+        return nu.argmax(nu.cumsum(mask, axis=1) > choice[:, None], axis=1)
+    
+    # MEATHOD: relocate -------------------------------------------------------
+    def relocate(self, idx, y, x, moveType):
+        """ Description: Moves the given animals and records the movement
+        
+            Variables: 
+            -idx: row indices of the animals
+            -y: new y positions
+            -x: new x positions
+            -moveType: movement counter to increment
+                       0 random, 1 food, 2 water, 3 waited
+        """
+        self.fauna.move(idx, y, x, self.temp_grid[y, x])
+        self.countMoves(idx, moveType)
+    
+    # MEATHOD: countMoves -----------------------------------------------------
+    def countMoves(self, idx, moveType):
+        """ Description: Adds the given animals to the movement counters
+        
+            Variables: 
+            -idx: row indices of the animals
+            -moveType: movement counter to increment
+        """
+        carnivore = self.fauna.stat('carnivore', idx)
+        carni = int(nu.count_nonzero(carnivore))
+        self.carniMove[moveType] += carni
+        self.herbiMove[moveType] += len(carnivore) - carni
+    
+    # MEATHOD: updateOccupancy ------------------------------------------------
+    def updateOccupancy(self):
+        """ Description: Rebuilds the cell indices and the herbivore and 
+                         carnivore grids from the positions of the living 
+                         animals. Called after animals move, spawn or die.
+        """
+        fauna = self.fauna
+        herbs = fauna.herbivores()
+        carns = fauna.carnivores()
+        self.herbivore_index.rebuild(fauna.y[herbs], fauna.x[herbs], herbs)
+        self.carnivore_index.rebuild(fauna.y[carns], fauna.x[carns], carns)
+        nu.copyto(self.herbivore_grid, self.herbivore_index.occupied())
+        nu.copyto(self.carnivore_grid, self.carnivore_index.occupied())
+    
     # MEATHOD: randomWalk -----------------------------------------------------
-    def randomWalk(self, Fauna):
+    def randomWalk(self, idx):
         """ Description:
-            Pass an animal and it will walk within the borders of the grid.
+            Pass animals and they will walk within the borders of the grid.
             (Moore's Neighborhood)
         
             Variables: 
-            -Fauna.position: current location of fauna
-            -moveX: Array of x positions fauna can move
-            -moveY: Array of y positions fauna can move
+            -idx: row indices of the animals
         
             Output: 
-                Fauna has changed locations
+                Animals have changed locations or waited
         """
-        #Use function for when goWater works
-        #if Fauna.THIRSTY >= Fauna.water:
-        #    self.goWater(Fauna)
-        if(nu.random.uniform(0,1) > const.MOVE_CHANCE):
-            #Moore Neighborhood walk
-            #Directions in x-axis
-            moveX = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
-            #Fauna.position[1] current x location
-            moveX = moveX + Fauna.position[1]
-            
-            #Directions in y-axis
-            moveY = nu.array([1, 0, -1, 1, -1, 1, 0, -1])
-            #Fauna.position[0] current y location
-            moveY = moveY + Fauna.position[0]
-            
-            #Check Borders
-            valid = nu.where(nu.logical_not(nu.logical_or( \
-            nu.logical_or(moveY >= self.length, moveY < 0),\
-            nu.logical_or(moveX >= self.width, moveX < 0))))
-    
-            nu.random.shuffle(valid[0])
-    
-            #Update grid and animal position
-            #X and Y may be flipped for grids
-            if(Fauna.isCarnivore()):
-                self.carnivore_grid[Fauna.position[0], Fauna.position[1]] = 0
-                self.carnivore_grid[moveY[valid[0][0]], moveX[valid[0][0]]] = 1
-                Fauna.move(moveY[valid[0][0]], moveX[valid[0][0]],\
-                           self.temp_grid[moveY[valid[0][0]],\
-                                          moveX[valid[0][0]]])
-                self.carniMove[0] += 1
-            elif(Fauna.isHerbivore()):
-                self.herbivore_grid[Fauna.position[0], Fauna.position[1]] = 0
-                self.herbivore_grid[moveY[valid[0][0]], moveX[valid[0][0]]] = 1
-                Fauna.move(moveY[valid[0][0]], moveX[valid[0][0]],\
-                           self.temp_grid[moveY[valid[0][0]],\
-                                          moveX[valid[0][0]]])
-                self.herbiMove[0] += 1
-        else:
-            Fauna.wait()
-            if(Fauna.isCarnivore()):
-                self.carniMove[3]
-            elif(Fauna.isHerbivore()):
-                self.herbiMove[3] += 1
+        idx = nu.asarray(idx, dtype=int)
+        walk = self.draw(idx, 0) > self.config.MOVE_CHANCE
+        
+        #Moore Neighborhood walk to a random cell inside the borders
+        movers = idx[walk]
+        moveY, moveX, valid = self.neighbours(movers)
+        pick = self.pickRandom(valid, self.draw(movers, 1))
+        rows = nu.arange(len(movers))
+        self.relocate(movers, moveY[rows, pick], moveX[rows, pick], 0)
+        
+        waiters = idx[nu.logical_not(walk)]
+        self.fauna.wait(waiters)
+        self.countMoves(waiters, 3)
         
     # METHOD: track -----------------------------------------------------------
-    def track(self, Fauna):
-        """ Description: Checks if carnivore is hungry and has it track prey if it is
+    def track(self, idx):
+        """ Description: Checks if carnivores are hungry and has them track
+                         prey if they are
         
             Variables: 
-            -Fauna: A carnivore
+            -idx: row indices of carnivores
         
             Output: 
-                Fauna has changed locations if hungry. Stays if not hungry.
+                Hungry carnivores move to the neighbouring cell with the
+                strongest scent. Returns the animals that did not move.
         """
-        #Checks to see if Carnivore should look for food
-        if (Fauna.energy > Fauna.hungry):
-            return 1
-             
-        #Looks around itself in a moore neighborhood to find scent
-        #Init Moore Neighborhood arrays (same as randomWalk)
-        moveX = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
-        moveY = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
+        idx = nu.asarray(idx, dtype=int)
         
-        moveX = Fauna.position[1] + moveX
-        moveY = Fauna.position[0] + moveY
-        
-        #Check Borders
-        valid = nu.where(nu.logical_not(nu.logical_or(nu.logical_or(\
-                moveY >= self.length, moveY < 0),\
-                nu.logical_or(moveX >= self.width, moveX < 0))))
+        #Checks to see if Carnivore should look for food
+        hungry = self.fauna.energy[idx] <= self.fauna.stat('hungry', idx)
+        hunters = idx[hungry]
         
-        scent = nu.zeros(nu.size(valid[0]))
+        #Looks around itself in a moore neighborhood to find scent
+        moveY, moveX, valid = self.neighbours(hunters)
+        scent = nu.where(valid, self.scent_grid[moveY, moveX], -nu.inf)
         
-        for i in range(len(valid[0])):
-            scent[i] = self.scent_grid[moveY[valid[0][i]]][moveX[valid[0][i]]]
-            
-        strongest_scent = scent.argmax()
+        #Ties between the strongest scents are broken randomly
+        strongest = scent == scent.max(axis=1, keepdims=True)
+        pick = self.pickRandom(strongest, self.draw(hunters, 1))
         
-        duplicates = -1
-        for i in range(len(scent)):
-            if (scent[strongest_scent] == scent[i]):
-                duplicates += 1
-            
-        indexToUse = strongest_scent
-            
-        if (duplicates > 0):
-            indexToUse = strongest_scent
-            currentIndex = 0
-            randomNum = random.randint(0, 10)
-            while(randomNum > 0):
-                if(scent[currentIndex] == scent[strongest_scent]):
-                    indexToUse = currentIndex
-                    randomNum -= 1
-                currentIndex += 1
-                if(currentIndex == nu.size(scent)):
-                    currentIndex = 0
-        
-        self.carnivore_grid[Fauna.position[0], Fauna.position[1]] = 0
-        self.carnivore_grid[moveY[valid[0][indexToUse]],\
-                            moveX[valid[0][indexToUse]]] = 1
-        Fauna.move(moveY[valid[0][indexToUse]], moveX[valid[0][indexToUse]],\
-                   self.temp_grid[moveY[valid[0][indexToUse]],\
-                                  moveX[valid[0][indexToUse]]])
-        self.carniMove[1] += 1
-        return 0
+        rows = nu.arange(len(hunters))
+        self.relocate(hunters, moveY[rows, pick], moveX[rows, pick], 1)
+        return idx[nu.logical_not(hungry)]
         
     # METHOD: forage ----------------------------------------------------------
-    def forage(self, Fauna):
-        """ Description: Checks if herbivore is hungry and moves towards flora if it is
+    def forage(self, idx):
+        """ Description: Checks if herbivores are hungry and moves them towards
+                         flora if they are
         
             Variables: 
-            -Fauna: An herbivore
+            -idx: row indices of herbivores
         
             Output: 
-                Fauna has changed locations if hungry. Stays if not hungry.
+                Hungry herbivores next to flora move onto it. Returns the
+                animals that did not move.
         """
-        #Checks to see if Herbivore should look for food
-        if (Fauna.energy > Fauna.hungry):
-            return 1
-             
-        #Looks around itself in a moore neighborhood to find Flora
-        #Init Moore Neighborhood arrays (same as randomWalk)
-        moveX = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
-        moveY = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
+        idx = nu.asarray(idx, dtype=int)
         
-        moveX = Fauna.position[1] + moveX
-        moveY = Fauna.position[0] + moveY
+        #Checks to see if Herbivore should look for food, only herbivores
+        #with flora around them need to look
+        hungry = (self.fauna.energy[idx] <= self.fauna.stat('hungry', idx))\
+                 & self.plantsNearby()[self.fauna.y[idx], self.fauna.x[idx]]
+        seekers = nu.flatnonzero(hungry)
         
-        #Check Borders
-        valid = nu.where(nu.logical_not(nu.logical_or(nu.logical_or(\
-                moveY >= self.length, moveY < 0),\
-                nu.logical_or(moveX >= self.width, moveX < 0))))
-        
-        possibleFood = nu.zeros(nu.size(valid[0]))
-        
-        for i in range(len(valid[0])):
-            possibleFood[i] = self.plant_grid[moveY[valid[0][i]]]\
-                                                [moveX[valid[0][i]]]
-        
-        foundFood = -1
-        for i in range(len(possibleFood)):
-            if (possibleFood[i] == 1):
-                foundFood = i
-        
-        duplicates = -1
-        for i in range(len(possibleFood)):
-            if (1 == possibleFood[i]):
-                duplicates += 1
-        
-        if (duplicates == -1):
-            return 1
-        
-        indexToUse = foundFood
-        
-        if (duplicates > 0):
-            currentIndex = indexToUse
-            randomNum = random.randint(0, 20)
-            while(randomNum > 0):
-                if(possibleFood[currentIndex] == 1):
-                    indexToUse = currentIndex
-                    randomNum -= 1
-                currentIndex += 1
-                if(currentIndex == nu.size(possibleFood)):
-                    currentIndex = 0
-        
-        self.herbivore_grid[Fauna.position[0], Fauna.position[1]] = 0
-        self.herbivore_grid[moveY[valid[0][indexToUse]],\
-                            moveX[valid[0][indexToUse]]] = 1
-        Fauna.move(moveY[valid[0][indexToUse]], moveX[valid[0][indexToUse]],\
-                   self.temp_grid[moveY[valid[0][indexToUse]],\
-                                  moveX[valid[0][indexToUse]]])
-        self.herbiMove[1] += 1
-        return 0
+        #Looks around itself in a moore neighborhood to find Flora
+        moveY, moveX, valid = self.neighbours(idx[seekers])
+        possibleFood = valid & self.plant_grid[moveY, moveX]
+        found = possibleFood.any(axis=1)
+        foraging = nu.zeros(len(idx), dtype=bool)
+        foraging[seekers[found]] = True
+        
+        #Ties between neighbouring plants are broken randomly
+        pick = self.pickRandom(possibleFood[found],\
+                               self.draw(idx[foraging], 1))
+        rows = nu.flatnonzero(found)
+        self.relocate(idx[foraging], moveY[rows, pick], moveX[rows, pick], 1)
+        return idx[nu.logical_not(foraging)]
     
     # METHOD: findWater -------------------------------------------------------
-    def findWater(self, Fauna):
-        """ Description: Checks if herbivore is thirsty and moves towards water
+    def findWater(self, idx):
+        """ Description: Checks if animals are thirsty and moves them towards
+                         water
         
             Variables: 
-            -Fauna: Any fauna
+            -idx: row indices of any fauna
         
             Output: 
-                Fauna has changed locations if thirsty. Stays if not thirsty.
+                Thirsty animals step towards the closest water and drink.
+                Returns the animals that did not move.
         """
-        if(Fauna.water > Fauna.thirsty):
-            return 1
-        
-        valuesY = []
-        valuesX = []
+        if(self.water_field_version != self.water_version):
+            self.buildWaterField()
+        
+        idx = nu.asarray(idx, dtype=int)
+        posY = self.fauna.y[idx]
+        posX = self.fauna.x[idx]
+        
+        #Animals can only look for water if there is any to find
+        thirsty = (self.fauna.water[idx] <= self.fauna.stat('thirsty', idx))\
+                  & (self.water_dist[posY, posX] >= 0)
+        
+        drinkers = idx[thirsty]
+        posY = posY[thirsty]
+        posX = posX[thirsty]
+        self.relocate(drinkers, posY + self.water_step_y[posY, posX],\
+                      posX + self.water_step_x[posY, posX], 2)
+        
+        self.fauna.drink(drinkers, self.fauna.stat('drink_amount', drinkers))
+        self.timesDrunk += len(drinkers)
+        return idx[nu.logical_not(thirsty)]
+    
+    # MEATHOD: buildWaterField ------------------------------------------------
+    def buildWaterField(self):
+        """ Description: Builds the distance from every cell to the closest
+                         water and the step that leads towards it. A breadth
+                         first search spreads out from all water at once.
         
-        for i in range(self.length):
-            for k in range(self.width):
-                if (self.water_grid[i][k] >= 1):
-                    valuesY.append(i)
-                    valuesX.append(k)
-                    
-        distances  = nu.zeros(len(valuesY))
+            Variables: 
+            -self: class instance
         
-        for i in range(len(valuesY)):
-            distances[i] = math.sqrt(math.pow((valuesX[i]-Fauna.position[1]),\
-            2) + math.pow((valuesY[i]-Fauna.position[0]), 2))
-                    
-        closest_water = distances.argmin()
-        
-        addX = 0
-        addY = 0
-        
-        if(valuesY[closest_water] - Fauna.position[0] > 0):
-            addY = 1
-        elif(valuesY[closest_water] - Fauna.position[0] < 0):
-            addY = -1
-        if(valuesX[closest_water] - Fauna.position[1] > 0):
-            addX = 1
-        elif(valuesX[closest_water] - Fauna.position[1] < 0):
-            addX = -1
-        
-        if(Fauna.isCarnivore()):
-            self.carnivore_grid[Fauna.position[0], Fauna.position[1]] = 0
-            self.carnivore_grid[Fauna.position[0] + addY,\
-                                Fauna.position[1] + addX] = 1
-            Fauna.move(Fauna.position[0] + addY, Fauna.position[1] + addX,\
-                       self.temp_grid[Fauna.position[0] + addY,\
-                                      Fauna.position[1] + addX])
-            self.carniMove[2] += 1
-        elif(Fauna.isHerbivore()):
-            self.herbivore_grid[Fauna.position[0], Fauna.position[1]] = 0
-            self.herbivore_grid[Fauna.position[0] + addY,\
-                                Fauna.position[1] + addX] = 1
-            Fauna.move(Fauna.position[0] + addY, Fauna.position[1] + addX,\
-                       self.temp_grid[Fauna.position[0] + addY,\
-                                      Fauna.position[1] + addX])
-            self.herbiMove[2] += 1
-        
-        Fauna.drink(Fauna.drink_amount)
-        self.timesDrunk += 1
-        return 0
+            Output: 
+                water_dist holds the number of moves to the closest water,
+                -1 if there is no water. water_step_y and water_step_x hold
+                the move towards it.
+        """
+        self.water_field_version = self.water_version
+        water = self.water_grid >= 1
+        if(self.water_source is not None and\
+           nu.array_equal(water, self.water_source)):
+            return      # the water moved but no water body changed
+        self.water_source = water
+        
+        self.water_dist = nu.full((self.length, self.width), -1, dtype=int)
+        self.water_step_y = nu.zeros((self.length, self.width), dtype=int)
+        self.water_step_x = nu.zeros((self.length, self.width), dtype=int)
+        self.water_dist[water] = 0
+        
+        frontY, frontX = nu.nonzero(water)
+        level = 0
+        while(len(frontY) > 0):
+            level += 1
+            nextY = []
+            nextX = []
+            for moveY, moveX in zip(self.MOVE_Y, self.MOVE_X):
+                cellY = frontY + moveY
+                cellX = frontX + moveX
+                
+                #Keep unvisited cells inside the borders
+                inside = (cellY >= 0) & (cellY < self.length) &\
+                         (cellX >= 0) & (cellX < self.width)
+                cellY = cellY[inside]
+                cellX = cellX[inside]
+                new = self.water_dist[cellY, cellX] == -1
+                cellY = cellY[new]
+                cellX = cellX[new]
+                
+                #Step back towards the cell it was reached from
+                self.water_dist[cellY, cellX] = level
+                self.water_step_y[cellY, cellX] = -moveY
+                self.water_step_x[cellY, cellX] = -moveX
+                nextY.append(cellY)
+                nextX.append(cellX)
+            frontY = nu.concatenate(nextY)
+            frontX = nu.concatenate(nextX)
     
     # METHOD: animalsEat ------------------------------------------------------
     def animalsEat(self):
@@ -571,149 +1030,130 @@ class EcoSystem:
             Output: 
                 Animals have eaten if hungry. Animals and plants died if eaten.
         """
-        for i in range(len(self.herbivore_list)):
-            #Skip animal if not hungry
-            if self.herbivore_list[i].energy > self.herbivore_list[i].hungry:
-                continue
-            else:
-                self.eatPlant(self.herbivore_list[i])       
-        #iCarn will be every carnivore object in the carnivore_list
-        for iCarn in self.carnivore_list:
-            if iCarn.hungry > iCarn.energy:
-                if self.carnivoreEat(iCarn):
-                    continue
-                else:
-                    #Carnivores do not seem to eat plants when this is used
-                    self.eatPlant(iCarn)
+        self.herbivoresEat()
+        self.carnivoresEat()
+    
+    # METHOD: herbivoresEat ---------------------------------------------------
+    def herbivoresEat(self, idx=None):
+        """ Description: Hungry herbivores eat the plants they stand on
+        
+            Variables: 
+            -idx: row indices of herbivores, all of them by default
+        """
+        fauna = self.fauna
+        if(idx is None):
+            idx = fauna.herbivores()
+        hungry = fauna.energy[idx] <= fauna.stat('hungry', idx)
+        self.eatPlant(idx[hungry])
+    
+    # METHOD: carnivoresEat ---------------------------------------------------
+    def carnivoresEat(self):
+        """ Description: Hungry carnivores eat a herbivore next to them, or
+                         the plant they stand on if there is none. They eat
+                         one at a time in population order.
+        """
+        fauna = self.fauna
+        carns = fauna.carnivores()
+        hungry = fauna.stat('hungry', carns) > fauna.energy[carns]
+        prey = self.nearby(self.herbivore_grid)
+        for iCarn in carns[hungry]:
+            #Only carnivores with herbivores around them can hunt
+            if not (prey[fauna.y[iCarn], fauna.x[iCarn]] and\
+                    self.carnivoreEat(iCarn)):
+                #Carnivores do not seem to eat plants when this is used
+                self.eatPlant([iCarn])
              
     # MEATHOD: eatPlant -------------------------------------------------------
-    def eatPlant(self, Fauna):
-        """ Description: Checks if plants are in the moore neighborhood and
-                         eats them.
+    def eatPlant(self, idx):
+        """ Description: Checks if plants are under the animals and eats them.
+                         Animals sharing a cell eat one after another in
+                         order.
         
             Variables: 
-            -Fauna: An herbivore
+            -idx: row indices of herbivores
         
             Output: 
-                Given fauna has increased its energy if it has eaten.
+                Given fauna have increased their energy if they have eaten.
                 If a plant is eaten, it is considered dead.
                 Dead entities are removed.
                 Increment death counters.
         """
-        j = 0
-        while(j < len(self.plant_list)):
-                #If a plant is found
-                if self.plant_list[j].position[0] == Fauna.position[0] and\
-                self.plant_list[j].position[1] == Fauna.position[1]:
-                    #Eat the max amount if the herbivore is able
-                    nutrition = \
-                        self.plant_list[j].consumed(const.PLANT_UNITS_TO_EAT)
-                    Fauna.eat(nutrition[0])
-                    Fauna.drink(nutrition[1])
-                    #If the plant dies, remove from grid and list
-                    if (not self.plant_list[j].healthCheck()):
-                        self.plant_grid[Fauna.position[0],\
-                                        Fauna.position[1]] = 0
-                        self.plant_list.remove(self.plant_list[j])
-                        self.plantsEaten += 1
-                    j = len(self.plant_list)
-                else:
-                    j += 1
+        idx = nu.asarray(idx, dtype=int)
+        while(len(idx) > 0):
+            #First animal on every cell eats this round
+            cells = self.fauna.y[idx] * self.width + self.fauna.x[idx]
+            first = nu.sort(nu.unique(cells, return_index=True)[1])
+            eaters = idx[first]
+            idx = nu.delete(idx, first)
+            
+            #If a plant is found
+            posY = self.fauna.y[eaters]
+            posX = self.fauna.x[eaters]
+            found = self.plants.alive[posY, posX]
+            eaters = eaters[found]
+            posY = posY[found]
+            posX = posX[found]
+            
+            #Eat the max amount if the herbivore is able
+            nutrition = self.plants.consumed(posY, posX,\
+                                             self.config.PLANT_UNITS_TO_EAT)
+            self.fauna.eat(eaters, nutrition[0])
+            self.fauna.drink(eaters, nutrition[1])
+            
+            #If the plant dies, remove from grid
+            dead = nu.logical_not(self.plants.alive[posY, posX])
+            self.plant_grid[posY[dead], posX[dead]] = False
+            self.plants_near = None
+            self.plantsEaten += int(nu.count_nonzero(dead))
         return
     
     # METHOD: carnivoreEat ----------------------------------------------------
-    def carnivoreEat(self, Fauna):
+    def carnivoreEat(self, i):
         """ Description: Checks if herbivores are in the moore neighborhood and
                          eats them.
         
             Variables: 
-            -Fauna: A carnivore
+            -i: row index of a carnivore
         
             Output: 
                 Given fauna has increased its energy if it has eaten.
                 If a fauna is eaten, it is considered dead.
-                If a plant is eaten, it is considered dead.
-                Dead entities are removed.
                 Increment death counters.
         """
-        #MoveY and moveX renamed to locY and locX - short for location
-        #Boolean flag to let us know if the carnivore has eaten
-        eatCheck = False
-        
-        curY = Fauna.position[0]
-        curX = Fauna.position[1]
-        
-        if self.herbivore_grid[curY, curX] == 1:
-            #Search for herbivore object in list
-            for iHerb in self.herbivore_list:
-                #Location match found
-                if iHerb.position[0] == curY and iHerb.position[1] == curX:
-                    #Trade energy values
-                    nutrition = iHerb.consumed()
-                    Fauna.eat(nutrition[0])
-                    Fauna.drink(nutrition[1])
-                    #Remove herbivore and record its death
-                    self.herbivore_list.remove(iHerb)
-                    self.animalsDeath[4] += 1
-                    self.herbiDied += 1
-                    eatCheck = True
-        
-        if(not eatCheck):
-            locX = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
-            locY = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
-            
-            locX = Fauna.position[1] + locX
-            locY = Fauna.position[0] + locY
-            
-            # Check Borders
-            valid = nu.where(nu.logical_not(nu.logical_or(\
-            nu.logical_or(locY >= self.length, locY < 0),\
-            nu.logical_or(locX >= self.width, locY < 0))))
-            
-            
-            # Check if there is a neighboring herbivore
-            for i in range(len(valid)):
-                # For readability-currentX and currentY are locations we 
-                # are checking
-                curX = valid[0][i]
-                curY = valid[0][i]
-                #If a herbivore is spotted
-                if self.herbivore_grid[curY, curX] == 1:
-                    #Search for herbivore object in list
-                    for iHerb in self.herbivore_list:
-                        #Location match found
-                        if iHerb.position[0] == curY and\
-                        iHerb.position[1] == curX:
-                            #Trade energy values
-                            nutrition = iHerb.consumed()
-                            Fauna.eat(nutrition[0])
-                            Fauna.drink(nutrition[1])
-                            #Remove herbivore and record its death
-                            self.herbivore_list.remove(iHerb)
-                            self.animalsDeath[4] += 1
-                            self.herbiDied += 1
-                            eatCheck = True
-            #return a true or false depending on action - can do something 
-            # about it later
-        return eatCheck
+        fauna = self.fauna
+        
+        #Check the carnivore's own cell before its neighbours
+        moveY, moveX, valid = self.neighbours([i])
+        locY = nu.concatenate(([fauna.y[i]], moveY[0][valid[0]]))
+        locX = nu.concatenate(([fauna.x[i]], moveX[0][valid[0]]))
+        
+        for curY, curX in zip(locY, locX):
+            #If a herbivore is spotted, skipping ones already eaten
+            prey = self.herbivore_index.at(curY, curX)
+            prey = prey[fauna.alive[prey]]
+            if(len(prey) > 0):
+                #Trade energy values, the prey is removed with the dead
+                nutrition = fauna.consumed(prey)
+                for k in range(len(prey)):
+                    fauna.eat(i, nutrition[0][k])
+                    fauna.drink(i, nutrition[1][k])
+                return True
+        return False
     
     # MEATHOD: plantsAbsorb ---------------------------------------------------
     def plantsAbsorb(self):
-        """ Description: Plants increase their size and water using photosynthesis
-                         and drink functions.
+        """ Description: Plants increase their energy and water using 
+                         photosynthesis and drink functions.
         
             Variables: 
-            -Fauna: A carnivore
+            -self: class instance
         
             Output: 
                 Plant status has changed depending on availible lighting and
                 water.
         """
-        for iPlant in self.plant_list:
-            lighting = self.light_grid[iPlant.position[0], iPlant.position[1]]
-            iPlant.photosynth(lighting * const.ENERGY_ABSORB_FACTOR)
-            water = self.water_grid[iPlant.position[0], iPlant.position[1]]
-            iPlant.drink(water * const.WATER_ABSORB_FACTOR)
+        self.plants.photosynth(self.light_grid * self.config.ENERGY_ABSORB_FACTOR)
+        self.plants.drink(self.water_grid * self.config.WATER_ABSORB_FACTOR)
     
     # MEATHOD: checkPlantGrowth -----------------------------------------------      
     def checkPlantGrowth(self):
@@ -725,12 +1165,12 @@ class EcoSystem:
             Output: 
                 Plant consumes water and energy to increase size
         """
-        for iPlant in self.plant_list:
-            iPlant.growth()
+        self.plants.growth()
     
     # MEATHOD: checkStarved ---------------------------------------------------
     def checkStarved(self):
-        """ Description: Removes animals and plants that are no longer alive
+        """ Description: Marks animals and plants that are no longer alive
+                         and removes them
         
             Variables:
             -self: class instance
@@ -739,77 +1179,128 @@ class EcoSystem:
                 Dead entities are removed.
                 Death counters are incremented
         """
-        for iHerb in self.herbivore_list:
-            checks = iHerb.healthCheck()
-            if not checks[0]:
-                self.herbivore_grid[iHerb.position[0], iHerb.position[1]] = 0
-                self.herbivore_list.remove(iHerb)
-                self.herbiDied += 1
-                if(not (checks[1] == -1)):
-                    self.animalsDeath[checks[1]] += 1 
+        self.fauna.healthCheck()
+        self.plants.healthCheck()
+        self.removeDead()
+    
+    # MEATHOD: removeDead -----------------------------------------------------
+    def removeDead(self):
+        """ Description: Removes every animal and plant that died since the
+                         last call in a single pass
+        
+            Variables:
+            -self: class instance
             
-        for iCarn in self.carnivore_list:
-            checks = iCarn.healthCheck()
-            if not checks[0]:
-                self.carnivore_grid[iCarn.position[0], iCarn.position[1]] = 0
-                self.carnivore_list.remove(iCarn)
-                self.carniDied += 1
-                if(not (checks[1] == -1)):
-                    self.animalsDeath[checks[1]] += 1 
-                
-        for iPlant in self.plant_list:
-            if not iPlant.healthCheck():
-                self.plant_grid[iPlant.position[0], iPlant.position[1]] = 0
-                self.plant_list.remove(iPlant)
-                self.plantsDied += 1
-        return
+            Output:
+                Dead entities are removed.
+                Death counters are incremented in bulk
+        """
+        if(not self.fauna.alive.all()):
+            deaths = self.fauna.compact()
+            self.herbiDied += int(deaths[0].sum())
+            self.carniDied += int(deaths[1].sum())
+            for i in range(len(fa.CAUSES)):
+                self.animalsDeath[i] += int(deaths[:, i].sum())
+            self.updateOccupancy()
+        
+        dead = self.plant_grid & nu.logical_not(self.plants.alive)
+        self.plant_grid[dead] = False
+        self.plants_near = None
+        self.plantsDied += int(nu.count_nonzero(dead))
     
     # MEATHOD: updateScent ----------------------------------------------------
-    def updateScent(self):
+    def updateScent(self, spread=None):
         """ Description: scent grids are updated depending on location of scented
-                         entities
+                         entities. Herbivores leave positive scent and 
+                         carnivores negative scent. Every hour the trail
+                         fades by DISSIPATION_RATE and spreads SCENT_SPREAD
+                         cells, faded by DISSIPATION_SPREAD. A cell only
+                         gets spread scent from the cells around it, so its
+                         own trail always fades by DISSIPATION_RATE.
         
             Variables:
             -self: class instance
+            -spread: function(grid, out, work) used in place of spreadMax
             
             Output:
                 Scent grids are updated. 
         """
-        spreadScent = nu.zeros((self.length + (const.SCENT_SPREAD * 2),\
-                                self.width + (const.SCENT_SPREAD * 2)))
-        spreadScent[const.SCENT_SPREAD:-(const.SCENT_SPREAD),\
-                    const.SCENT_SPREAD:-(const.SCENT_SPREAD)] = self.scent_grid
-        for y in range(const.SCENT_SPREAD, self.length + const.SCENT_SPREAD):
-            for x in range(const.SCENT_SPREAD,\
-                           self.width + const.SCENT_SPREAD):        
-                spreadScent[y-const.SCENT_SPREAD:y+const.SCENT_SPREAD,\
-                            x-const.SCENT_SPREAD] =\
-                            spreadScent[y,x] * const.DISSIPATION_SPREAD
-                spreadScent[y-const.SCENT_SPREAD:y+const.SCENT_SPREAD,\
-                            x+const.SCENT_SPREAD] =\
-                            spreadScent[y,x] * const.DISSIPATION_SPREAD
-                spreadScent[y-const.SCENT_SPREAD, x] =\
-                spreadScent[y,x] * const.DISSIPATION_SPREAD
-                spreadScent[y+const.SCENT_SPREAD, x] =\
-                spreadScent[y,x] * const.DISSIPATION_SPREAD
-                
-        herb_scent = nu.fmax(self.herbivore_grid,\
-                             self.scent_grid * const.DISSIPATION_RATE,\
-                             spreadScent[const.SCENT_SPREAD:\
-                                         -(const.SCENT_SPREAD),\
-                                         const.SCENT_SPREAD:\
-                                         -(const.SCENT_SPREAD)])
-        carn_scent = nu.fmax(self.carnivore_grid,\
-                             self.scent_grid * const.DISSIPATION_RATE * -1,\
-                             spreadScent[const.SCENT_SPREAD:\
-                                         -(const.SCENT_SPREAD),\
-                                         const.SCENT_SPREAD:\
-                                         -(const.SCENT_SPREAD)]*-1)
-        self.scent_grid = herb_scent - carn_scent
+        if(spread is None):
+            spread = self.spreadMax
+        work, herbScent, carnScent, trail = self.scent_buffers
+        
+        #Carnivore scent is the strongest negative scent
+        nu.negative(self.scent_grid, out=trail)
+        spread(trail, carnScent, work)
+        carnScent *= self.config.DISSIPATION_SPREAD
+        trail *= self.config.DISSIPATION_RATE
+        nu.fmax(carnScent, trail, out=carnScent)
+        nu.fmax(carnScent, self.carnivore_grid, out=carnScent)
+        
+        #Herbivore scent is the strongest positive scent
+        nu.negative(trail, out=trail)
+        spread(self.scent_grid, herbScent, work)
+        herbScent *= self.config.DISSIPATION_SPREAD
+        nu.fmax(herbScent, trail, out=herbScent)
+        nu.fmax(herbScent, self.herbivore_grid, out=herbScent)
+        
+        nu.subtract(herbScent, carnScent, out=self.scent_grid)
+    
+    # MEATHOD: spreadMax ------------------------------------------------------
+    def spreadMax(self, grid, out, work):
+        """ Description: Finds the largest value of grid within SCENT_SPREAD
+                         cells of every cell, not counting the cell itself.
+                         The rows above and below are filtered one axis at
+                         a time by taking the maximum with shifted slices,
+                         then the cells beside it in its own row are added.
+        
+            Variables:
+            -grid: values to spread
+            -out: grid the result is written into
+            -work: grid used for the intermediate result
+        """
+        spreadY = min(self.config.SCENT_SPREAD, self.length - 1)
+        spreadX = min(self.config.SCENT_SPREAD, self.width - 1)
+        
+        #Spread along the y axis, without the row of the cell
+        work.fill(-nu.inf)
+        for k in range(1, spreadY + 1):
+            nu.maximum(work[k:], grid[:-k], out=work[k:])
+            nu.maximum(work[:-k], grid[k:], out=work[:-k])
+        
+        #Spread along the x axis, and from the cells beside in the row
+        nu.copyto(out, work)
+        for k in range(1, spreadX + 1):
+            nu.maximum(out[:, k:], work[:, :-k], out=out[:, k:])
+            nu.maximum(out[:, :-k], work[:, k:], out=out[:, :-k])
+            nu.maximum(out[:, k:], grid[:, :-k], out=out[:, k:])
+            nu.maximum(out[:, :-k], grid[:, k:], out=out[:, :-k])
+                   
                    
+    # MEATHOD: regions --------------------------------------------------------
+    def regions(self):
+        """ Description: Splits the grid into regions of about REGION_SIZE
+                         cells a side. Ponds, lakes and clouds are laid out
+                         per region, so larger grids look like the default
+                         world repeated.
+        
+            Variables:
+            -self: class instance
+            
+            Output:
+                (regions along y, regions along x)
+        """
+        size = self.config.REGION_SIZE
+        return (max(1, int(round(self.length / size))),\
+                max(1, int(round(self.width / size))))
+    
     # MEATHOD: initWater ------------------------------------------------------
     def initWater(self):
-        """ Description: Creates bodies of water in the environment
+        """ Description: Creates bodies of water in the environment. Every
+                         region gets its own ponds and lake, placed relative
+                         to the region. Their spread is at most one cell
+                         for every CELLS_PER_SPREAD cells of the region, so
+                         small grids are not covered in water.
         
             Variables:
             -self: class instance
@@ -817,26 +1308,42 @@ class EcoSystem:
             Output:
                 Water grids are updated to include ponds and lakes.
         """
-        x = [5, 10, 15, 35, 40, 45]
-        y = [5, 10, 15, 35, 40, 45]
-        nu.random.shuffle(x)
-        nu.random.shuffle(y)
-        
-        ponds = const.NUM_PONDS
-        
-        if(ponds > len(x)):
-            ponds = len(x)  # ensures that we don't try to make more
-                            # than we have available positions for
-                                
-        for i in range(ponds):
-            x1 = int(nu.random.uniform(-2,0)) + x[i]
-            x2 = int(nu.random.uniform(0,2)) + x[i]
-            y1 = int(nu.random.uniform(-2,0)) + y[i]
-            y2 = int(nu.random.uniform(0,2)) + y[i]
-            self.makeWaterBody(x1, y1, x2, y2, const.POND_SPREAD)
-            
-        if(const.HAS_LAKE):
-            self.makeWaterBody(24, 24, 26, 26, const.LAKE_SPREAD)
+        regionsY, regionsX = self.regions()
+        sizeY = self.length / regionsY
+        sizeX = self.width / regionsX
+        limit = int(min(sizeY, sizeX)) // self.CELLS_PER_SPREAD
+        pondSpread = min(self.config.POND_SPREAD, limit)
+        lakeSpread = min(self.config.LAKE_SPREAD, limit)
+        
+        ponds = self.config.NUM_PONDS
+        if(ponds > len(self.POND_SPOTS)):
+            ponds = len(self.POND_SPOTS)    # ensures that we don't try to
+                                            # make more than we have
+                                            # available positions for
+        
+        for regionY in range(regionsY):
+            for regionX in range(regionsX):
+                x = [int(round(sizeX * (regionX + spot)))\
+                     for spot in self.POND_SPOTS]
+                y = [int(round(sizeY * (regionY + spot)))\
+                     for spot in self.POND_SPOTS]
+                self.world_rng.shuffle(x)
+                self.world_rng.shuffle(y)
+                
+                for i in range(ponds):
+                    x1 = int(self.world_rng.uniform(-2,0)) + x[i]
+                    x2 = int(self.world_rng.uniform(0,2)) + x[i]
+                    y1 = int(self.world_rng.uniform(-2,0)) + y[i]
+                    y2 = int(self.world_rng.uniform(0,2)) + y[i]
+                    self.makeWaterBody(x1, y1, x2, y2, pondSpread)
+        
+        if(self.config.HAS_LAKE):
+            for regionY in range(regionsY):
+                for regionX in range(regionsX):
+                    x = int(round(sizeX * (regionX + 0.5)))
+                    y = int(round(sizeY * (regionY + 0.5)))
+                    self.makeWaterBody(x - 1, y - 1, x + 1, y + 1,\
+                                       lakeSpread)
     
     # MEATHOD: makeWaterBody --------------------------------------------------  
     def makeWaterBody(self, x1, y1, x2, y2, spread):
@@ -854,6 +1361,9 @@ class EcoSystem:
                 Water grids are updated to include a water body between 
                 x1 and x2 and y1 and y2 with spread.
         """
+        if(not self.water_grid.flags.writeable):
+            self.water_grid = self.water_grid.copy()    # shared with forks
+        
         ax = min(x1,x2)
         bx = max(x1,x2)
         ay = min(y1,y2)
@@ -887,6 +1397,7 @@ class EcoSystem:
                 x += 1
             if(y < by):
                 y += 1
+        self.water_version += 1
     
     # MEATHOD: wheatherCheck --------------------------------------------------
     def wheatherCheck(self):
@@ -904,20 +1415,32 @@ class EcoSystem:
         if(self.rained):
             check = True
         
-        if(nu.random.uniform(0,1) < const.OVERCAST_CHANCE):
-            self.light_grid *= 0.3
-            if(nu.random.uniform(0,1) < const.RAIN_CHANCE):
-                self.water_grid += 0.2
+        if(self.rng.uniform(0,1) < self.config.OVERCAST_CHANCE):
+            self.light_grid = self.light_grid * 0.3
+            self.light_version += 1
+            self.clear_sky = False
+            if(self.rng.uniform(0,1) < self.config.RAIN_CHANCE):
+                self.water_grid = self.water_grid + 0.2
+                self.water_version += 1
                 self.rained = True
                 check = False
         else:
-            self.light_grid = nu.ones((self.length, self.width))
-            for i in range(const.MAX_CLOUDS):
-                if(nu.random.uniform(0,1) < const.CLOUD_CHANCE):
+            # a clear sky is kept when it is already clear and no cloud forms
+            cloudy = False
+            regionsY, regionsX = self.regions()
+            for i in range(self.config.MAX_CLOUDS * regionsY * regionsX):
+                if(self.rng.uniform(0,1) < self.config.CLOUD_CHANCE):
+                    if(not cloudy):
+                        self.clearSky()     # clouds are cast on a new grid
+                        cloudy = True
                     self.makeCloud()
+            if(not cloudy and not self.clear_sky):
+                self.clearSky()
+            self.clear_sky = not cloudy
                     
         if(check):
-            self.water_grid -= 0.2
+            self.water_grid = self.water_grid - 0.2
+            self.water_version += 1
             self.rained = False
     
     # MEATHOD: makeCloud ------------------------------------------------------
@@ -930,15 +1453,31 @@ class EcoSystem:
             Output:
                 light grids are updated to show a cloud is covering them
         """
-        x = int(nu.random.uniform(0,1) * 50)
-        y = int(nu.random.uniform(0,1) * 50)
+        x = int(self.rng.uniform(0,1) * self.width)
+        y = int(self.rng.uniform(0,1) * self.length)
         
-        thickness = nu.random.uniform(0.3,0.7)
-        spreadX = int(nu.random.uniform(3,15))
-        spreadY = int(nu.random.uniform(3,15))
+        thickness = self.rng.uniform(0.3,0.7)
+        spreadX = int(self.rng.uniform(3,15))
+        spreadY = int(self.rng.uniform(3,15))
         
+        if(not self.light_grid.flags.writeable):
+            self.light_grid = self.light_grid.copy()    # shared with forks
         self.light_grid[y-spreadY:y+spreadY, x-spreadX:x+spreadX] *=\
             1-thickness
+        self.light_version += 1
+        self.clear_sky = False
+    
+    # MEATHOD: clearSky -------------------------------------------------------
+    def clearSky(self):
+        """ Description: replaces the light grid with full sunlight
+                         
+            Variables:
+            -self: class instance
+        """
+        self.light_grid = nu.ones((self.length, self.width),\
+                                  self.light_grid.dtype)
+        self.light_version += 1
+        self.clear_sky = True
         
     # MEATHOD: updateTemp -----------------------------------------------------
     def updateTemp(self):
@@ -948,11 +1487,69 @@ class EcoSystem:
             -self: class instance
             
             Output:
-                update temperature grids depending on light and water conditions
+                update temperature grids depending on light and water conditions.
+                The grid is kept when neither the water nor the light changed.
+        """
+        version = (self.water_version, self.light_version)
+        if(self.temp_version == version):
+            return
+        
+        # a new grid is made so forks can share the old one
+        temp = nu.empty_like(self.temp_grid)
+        temp[-1] = self.temp_grid[-1]       # range of temperatures
+        temp[:-1,:] = self.baseTemp()
+        temp[:-1,:] += self.light_grid * self.config.LIGHT_TEMP
+        self.temp_grid = temp
+        self.temp_version = version
+    
+    # MEATHOD: baseTemp -------------------------------------------------------
+    def baseTemp(self):
+        """ Description: Returns the temperature without light, made from
+                         the water grid and kept until the water changes
+                         
+            Variables:
+            -self: class instance
+        """
+        if(self.base_temp_version != self.water_version):
+            base = nu.full((self.length, self.width), self.config.NATRUAL_TEMP,\
+                           self.temp_grid.dtype)
+            base += self.water_grid * self.config.WATER_TEMP
+            self.base_temp = base
+            self.base_temp_version = self.water_version
+        return self.base_temp
+    
+    # MEATHOD: makeWorld ------------------------------------------------------
+    @classmethod
+    def makeWorld(cls, config, seed=None):
+        """ Description: Makes the world layers of a simulation: the water
+                         grid after initWater() and the temperature it
+                         gives. Simulations of the same config and seed
+                         can share them read only (see __init__).
+            
+            Variables: 
+                -config: SimConfig of the simulations
+                -seed: seed of the simulations, only used if there are ponds
+            
+            Output:
+                dictionary of the water_grid and base_temp arrays
+        """
+        eco = cls(config, seed=seed, generate=False)
+        eco.initWater()
+        world = {'water_grid': eco.water_grid, 'base_temp': eco.baseTemp()}
+        for layer in world.values():
+            layer.flags.writeable = False
+        return world
+    
+    # MEATHOD: worldKey -------------------------------------------------------
+    @classmethod
+    def worldKey(cls, config, seed=None):
+        """ Description: Returns a key that is the same for simulations
+                         whose world layers (see makeWorld) are the same
         """
-        self.temp_grid[:-1,:] = const.NATRUAL_TEMP
-        self.temp_grid[:-1,:] += self.water_grid * const.WATER_TEMP
-        self.temp_grid[:-1,:] += self.light_grid * const.LIGHT_TEMP
+        key = tuple(getattr(config, name) for name in cls.WORLD_CONSTANTS)
+        if(config.NUM_PONDS > 0):
+            key += (seed,)      # the ponds are placed at random
+        return key
     
     # MEATHOD: makePlants -----------------------------------------------------
     def makePlants(self, chance):
@@ -963,39 +1560,62 @@ class EcoSystem:
             -chance: percentage chance a plant is spawned
             
             Output:
-                plant grid and list are updated to include new plants
+                plant grid and field are updated to include new plants
         """
         #Test every grid space for plant growth
-        for y in range(self.length):
-            for x in range(self.width):
-                #Test for growth
-                if nu.random.uniform(0,1) <= chance:
-                    if(self.water_grid[y,x] < 0.75 and\
-                       self.water_grid[y,x] > 0 and\
-                       self.plant_grid[y,x] < 1 and self.burrow_grid[y,x] < 1):
-                        #Make a grass plant
-                        newPlant = fo.Grass(y,x)
-                        self.plant_grid[y,x] = 1
-                        self.plant_list.append(newPlant)
-        #Grid and list should now be initialized
+        growth = self.rng.uniform(0, 1, (self.length, self.width)) <= chance
+        spawn = growth & (self.water_grid < 0.75) & (self.water_grid > 0) &\
+                nu.logical_not(self.plant_grid | self.burrow_grid)
+        
+        #Make grass plants
+        self.plants.spawn(spawn)
+        self.plant_grid[spawn] = True
+        self.plants_near = None
+        #Grid and field should now be initialized
         
     # MEATHOD: initRabbits ----------------------------------------------------
     def initRabbits(self):
-        """ Description: Spawns rabbit burrows for rabbits to spawn around
+        """ Description: Spawns rabbit burrows for rabbits to spawn around.
+                         Burrows are placed on land at least two cells from
+                         the border. Random spots are tried BURROW_TRIES
+                         times per burrow, the burrows still missing then
+                         are picked among the free land cells.
                          
             Variables:
             -self: class instance
             
             Output:
-                rabbit burrows are added to the burrow grid
+                rabbit burrows are added to the burrow grid. Raises
+                ValueError if there is not enough land for the burrows.
         """
+        if(not self.burrow_grid.flags.writeable):
+            self.burrow_grid = self.burrow_grid.copy()  # shared with forks
+        
+        #Land cells a burrow can be placed on
+        land = nu.zeros((self.length, self.width), dtype=bool)
+        land[2:self.length - 2, 2:self.width - 2] = True
+        land &= (self.water_grid < 0.75) & nu.logical_not(self.burrow_grid)
+        if(nu.count_nonzero(land) < self.config.NUM_BURROWS):
+            raise ValueError('not enough land for %d burrows on a %dx%d grid'\
+                             % (self.config.NUM_BURROWS, self.width,\
+                                self.length))
+        
         i = 0
-        while(i < const.NUM_BURROWS):
-            x = int(nu.random.uniform(2,self.width - 2))
-            y = int(nu.random.uniform(2,self.length - 2))
-            if(self.water_grid[y,x] < 0.75 and self.burrow_grid[y,x] < 1):
-                self.burrow_grid[y,x] = 1
+        tries = 0
+        while(i < self.config.NUM_BURROWS and\
+              tries < self.BURROW_TRIES * self.config.NUM_BURROWS):
+            x = int(self.rng.uniform(2,self.width - 2))
+            y = int(self.rng.uniform(2,self.length - 2))
+            tries += 1
+            if(land[y,x]):
+                self.burrow_grid[y,x] = True
+                land[y,x] = False
                 i += 1
+        
+        if(i < self.config.NUM_BURROWS):
+            cells = self.rng.choice(nu.flatnonzero(land),\
+                                    self.config.NUM_BURROWS - i, replace=False)
+            self.burrow_grid.flat[cells] = True
             
         self.spawnRabbits()
     
@@ -1007,32 +1627,28 @@ class EcoSystem:
             -self: class instance
             
             Output:
-                rabbit entities are created and added to herbivore_list
+                rabbit entities are created and added to the population
                 herbivore grid is updated to show location
         """
         #This rabbit spawn is hardcoded so we could keep them away from
         #their predators
         
-        for y in range(self.length):
-            for x in range(self.width):
-                if(self.burrow_grid[y,x] == 1):
-                    placeX = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
-                    placeY = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
+        count = len(self.fauna.herbivores())
+        for y, x in nu.argwhere(self.burrow_grid):
+            placeX = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
+            placeY = nu.array([1, 1, 1, 0, 0, -1, -1, -1])
+    
+            self.rng.shuffle(placeX)
+            self.rng.shuffle(placeY)
             
-                    nu.random.shuffle(placeX)
-                    nu.random.shuffle(placeY)
-                    
-                    for j in range(const.RABBITS_PER_BURROW):
-                        if(len(self.herbivore_list) >= const.MAX_RABBITS):
-                            return
-                        
-                        locX = x + placeX[j]
-                        locY = y + placeY[j]
-                        
-                        newRab = fa.Rabbit(locY,locX)
-                        #Spawns around the burrow
-                        self.herbivore_list.append(newRab)
-                        self.herbivore_grid[locY, locX] = 1
+            spawn = min(self.config.RABBITS_PER_BURROW, self.config.MAX_RABBITS - count)
+            if(spawn <= 0):
+                break
+            
+            #Spawns around the burrow
+            self.fauna.spawn(fa.RABBIT, y + placeY[:spawn], x + placeX[:spawn])
+            count += spawn
+        self.updateOccupancy()
     
     # MEATHOD: initFoxes ------------------------------------------------------        
     def initFoxes(self):
@@ -1042,18 +1658,16 @@ class EcoSystem:
             -self: class instance
             
             Output:
-                fox entities are created and added to carnivore_list
+                fox entities are created and added to the population
                 carnivore grid is updated to show location
         """
         #This fox spawn is hardcoded so we could keep them away from vulnerable
         #animals
         
-        for i in range(const.NUM_FOXES):
-            x = int(nu.random.uniform(0,self.width))
-            y = int(nu.random.uniform(0,self.length))
-            newFox = fa.Fox(y,x)
-            self.carnivore_list.append(newFox)
-            self.carnivore_grid[y, x] = 1
+        x = self.rng.uniform(0, self.width, self.config.NUM_FOXES).astype(int)
+        y = self.rng.uniform(0, self.length, self.config.NUM_FOXES).astype(int)
+        self.fauna.spawn(fa.FOX, y, x)
+        self.updateOccupancy()
      
     # MEATHOD: runADay --------------------------------------------------------
     def runADay(self):
@@ -1066,27 +1680,62 @@ class EcoSystem:
                 Variables change depending on outcome of plant and 
                 animal behaviors.
         """
-        for i in range(const.HOURS_PER_DAY):
+        backend = self.backend
+        timer = self.timer
+        if(timer is not None):
+            backend = timer.wrap(backend)
+            start = timer.clock()
+        hours = self.config.HOURS_PER_DAY
+        for i in range(hours):
             self.iterations += 1
-            for j in range(len(self.herbivore_list)):
-                if(self.findWater(self.herbivore_list[j])):
-                    if(self.forage(self.herbivore_list[j])):
-                        self.randomWalk(self.herbivore_list[j])
-            for j in range(len(self.carnivore_list)):
-                for k in range(const.EXTRA_FOX_STEPS):
-                    if(self.findWater(self.carnivore_list[j])):
-                        if(self.track(self.carnivore_list[j])):
-                            self.randomWalk(self.carnivore_list[j])
-            self.animalsEat()
-            self.updateScent()
-            self.plantsAbsorb()
+            self.drawHour()
+            backend.moveHerbivores(self)
+            backend.moveCarnivores(self)
+            self.updateOccupancy()
+            backend.eat(self)
+            backend.updateScent(self)
+            backend.plantsAbsorb(self)
+            
+            #The last hour is recorded after the end of the day
+            if(i < hours - 1):
+                self.recordHour()
         
         # do at the end of each day
-        self.wheatherCheck()
-        self.updateTemp()
-        self.checkPlantGrowth()
-        self.checkStarved()
-        
+        backend.endOfDay(self)
+        self.recordHour()
+        if(timer is not None):
+            timer.add('runADay', timer.clock() - start)
+        
+        day = self.iterations // hours
+        if(self.save_days > 0 and day % self.save_days == 0):
+            self.checkpoint(self.save_path)
+        
+    # MEATHOD: recordHour -----------------------------------------------------
+    def recordHour(self):
+        """ Description: Passes the hour to the recorder and history writer
+                         if they are in use
+                         
+            Variables:
+            -self: class instance
+        """
+        if(self.recorder is not None):
+            self.recorder.hour(self)
+        if(self.history is not None):
+            self.history.hour(self)
+    
+    # MEATHOD: timings --------------------------------------------------------
+    def timings(self):
+        """ Description: Returns the timing report of the phases of runADay
+                         (see Timer.PhaseTimer.report), empty if no timer
+                         is in use
+                         
+            Variables:
+            -self: class instance
+        """
+        if(self.timer is None):
+            return {}
+        return self.timer.report()
+    
     # MEATHOD: runAWeek -------------------------------------------------------
     def runAWeek(self):
         """ Description: Runs a simulation for one week
@@ -1098,9 +1747,9 @@ class EcoSystem:
                 Variables change depending on outcome of plant and 
                 animal behaviors.
         """
-        for i in range(const.DAYS_PER_WEEK):
+        for i in range(self.config.DAYS_PER_WEEK):
             self.runADay()
-        self.makePlants(const.PLANT_REPOP_CHANCE)
+        self.makePlants(self.config.PLANT_REPOP_CHANCE)
     
     # MEATHOD: runAMonth ------------------------------------------------------
     def runAMonth(self):
@@ -1113,7 +1762,7 @@ class EcoSystem:
                 Variables change depending on outcome of plant and 
                 animal behaviors.
         """
-        for i in range(const.WEEKS_PER_MONTH):
+        for i in range(self.config.WEEKS_PER_MONTH):
             self.runAWeek()
         self.spawnRabbits()
 
@@ -1137,11 +1786,15 @@ def testSim():
         eco.displayGrids()
     eco.displayResults()
     
-def showSim():
+def showSim(days=10, path=None, scale=8):
     """ Description: Test function for the simulation. Displays main visualizer
+                     or writes its frames to a file without a display.
                          
             Variables:
-                None
+                -days: number of days to simulate, one frame per day
+                -path: output for the frames (PNG directory, .gif or .mp4),
+                       None to display them
+                -scale: size in pixels of a grid cell in written frames
             
             Output:
                 Creates an ecosystem object and run a simulation on it.
@@ -1149,15 +1802,29 @@ def showSim():
         """
     # just runs the simulation with set parameters to make sure the sim works
     eco = EcoSystem()
-    for i in range(10):
+    writer = None
+    if(path is not None):
+        writer = fr.FrameWriter(path, EcoSystem.FRAME_COLORS, scale)
+    for i in range(days):
         eco.frame += 1
         eco.runADay()
-        eco.displayFrame()
+        if(writer is None):
+            eco.displayFrame()
+        else:
+            writer.write(eco.frameCodes())
+    if(writer is not None):
+        writer.close()
+
+# FUNCTION: main --------------------------------------------------------------
+def main():
+    """ Description: Entry point when the file is run as a script"""
+    testSim()
+    #showSim() 
 
 # PROGRAM SCRIPT ______________________________________________________________
 # Driver code for program
-testSim()
-#showSim() 
+if __name__ == '__main__':
+    main()
 
 #==============================================================================
 # END FILE
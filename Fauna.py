@@ -4,6 +4,8 @@
 """ This file contains animal objects used in the ecosystem simulation.
     The simulation of these animals are done in the ecosystem file. Here, the
     animal-related variables are stored and modified.
+    Every animal is a row of the Population table, so actions are applied to
+    the whole population at once. The animal classes describe each species.
     Animals in the herbivore class eat plants.
     Animals in the carnivore class eat other animals.
     Some animals can be both herbivores and carnivores.
@@ -23,20 +25,20 @@
 
 #==============================================================================
 # PROGRAM IMPORTS _____________________________________________________________
-import Variables as const
 import numpy as nu
 
 #==============================================================================
 # CLASS: Fauna ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 class Fauna:
-    """ Description: Parent class for all fauna, provides very basic
-                     functions and status
+    """ Description: Parent class for all fauna, describes the constants of a
+                     species. The status of each animal is kept in a row of
+                     the Population table.
     
         Variables: 
-        -energy: the fauna's energy level
-        -water: the fauna's water level
-        -position: the fauna's physical position in the simulation grid
-        -alive: a boolean for checking if the animal is alive
+        -INIT_*: ranges used to initialize energy and water
+        -max_energy, max_water: maximum fauna energy and water
+        -eat_amount, drink_amount: maximum gained by eating or drinking
+        -natural_temp: natural temperature of the species
     """
     
     INIT_ENERGY_MIN = None         # initialization minimum for energy
@@ -44,197 +46,78 @@ class Fauna:
     INIT_WATER_MIN = None          # initialization minimum for water
     INIT_WATER_MAX = None        # initialization range for water
     
-    energy = None                # current fauna energy
     max_energy = None            # maximum fauna energy
-    move_energy_cost = None      # energy cost of moving
-    wait_energy_cost = None      # energy cost of waiting
-    energy_value = None          # energy provided to animal if consumed
-    hungry = None                # threshold for being hungry
     eat_amount = None            # maximum amount of energy gained by eating 
-    starve = None                # threshold for dying of hunger
     
-    water = None                 # current fauna water
     max_water = None             # maximum fauna water
-    move_water_cost = None       # water cost of moving
-    wait_water_cost = None       # water cost of waiting
-    water_value = None           # water provided to animal if consumed
-    thirsty = None               # threshold for being thirsty
     drink_amount = None          # maximum amount of water gained by drinking
-    desiccate = None             # threshold for dying of thirst
     
-    temp = None                  # current temperature
-    cold = None                  # threshold for being cold
-    hot = None                   # threshold for being hot
-    froze = None                 # threshold for dying of cold
-    boiled = None                # threshold for dying of heat
-    
-    position = None              # current position in environment
-    alive = None                 # alive status flag
+    natural_temp = None          # natural temperature
 
-    # MEATHOD: init -----------------------------------------------------------
-    def __init__(self, y, x):
-        """ Description: Class constructor
+    # MEATHOD: steps ----------------------------------------------------------
+    @classmethod
+    def steps(cls, config):
+        """ Description: Returns the number of moves the fauna makes an hour"""
+        return 1
+
+    # MEATHOD: stats ----------------------------------------------------------
+    @classmethod
+    def stats(cls, config):
+        """ Description: Computes the thresholds and action costs of the 
+                         species from its constants
     
             Variables: 
-            -self: instance of class
-            -x: x position
-            -y: y position
+            -cls: species class
+            -config: SimConfig of the simulation
+            
+            Output: dictionary of the species' derived values
         """
-        #Initializes energy and water through uniform distribution
-        self.energy = nu.random.uniform(self.INIT_ENERGY_MIN,\
-                                        self.INIT_ENERGY_MAX)
-        self.water = nu.random.uniform(self.INIT_WATER_MIN,\
-                                       self.INIT_WATER_MAX)
+        stats = {}
         
-        #Initializes temperature depending on natural temperature and environment
-        self.temp = self.natural_temp
-        self.cold = self.natural_temp + const.COLD_OFFSET
-        self.froze = self.natural_temp + const.FROZE_OFFSET
-        self.hot = self.natural_temp + const.HOT_OFFSET
-        self.boiled = self.natural_temp + const.BOILED_OFFSET
+        #Temperature thresholds depending on natural temperature
+        stats['natural_temp'] = cls.natural_temp
+        stats['cold'] = cls.natural_temp + config.COLD_OFFSET
+        stats['froze'] = cls.natural_temp + config.FROZE_OFFSET
+        stats['hot'] = cls.natural_temp + config.HOT_OFFSET
+        stats['boiled'] = cls.natural_temp + config.BOILED_OFFSET
         
-        #Initializes energy and water values for when fauna is consumed
-        self.energy_value = self.max_energy * const.FAUNA_ENERGY_PERCENT
-        self.water_value = self.max_water * const.FAUNA_WATER_PERCENT
+        #Energy and water values for when fauna is consumed
+        stats['energy_value'] = cls.max_energy * config.FAUNA_ENERGY_PERCENT
+        stats['water_value'] = cls.max_water * config.FAUNA_WATER_PERCENT
         
-        #Initializes threshold for when fauna becomes hungry and thirsty
-        self.hungry = self.max_energy * const.HUNGRY_PERCENT
-        self.thirsty = self.max_water * const.THIRSTY_PERCENT
+        #Threshold for when fauna becomes hungry and thirsty
+        stats['hungry'] = cls.max_energy * config.HUNGRY_PERCENT
+        stats['thirsty'] = cls.max_water * config.THIRSTY_PERCENT
         
-        #Initializes threshold for when fauna dies from hunger or thirst
-        self.starve = self.max_energy * const.STARVE_PERCENT
-        self.desiccate = self.max_water * const.DESICCATE_PERCENT
-        
-        #Initializes energy and water costs of taking an action
-        self.move_energy_cost = ((self.max_energy / const.ENERGY_MOVE_FACTOR)\
-                                 / const.HOURS_PER_DAY)
-        self.wait_energy_cost = self.move_energy_cost\
-                                / const.ENERGY_WAIT_REDUCE 
-        self.move_water_cost = ((self.max_water / const.WATER_MOVE_FACTOR)\
-                                / const.HOURS_PER_DAY)
-        self.wait_water_cost = self.move_water_cost / const.WATER_WAIT_REDUCE 
-        
-        #Initializes location in environment
-        self.position = [y, x]
-        self.alive = True           #Set fauna as alive
-
-    # MEATHOD: eat ------------------------------------------------------------
-    def eat(self, amount):
-        """ Description: Updates the fauna's energy based on a given 
-                         amount. If there is more food than the maximum
-                         amount the fauna can eat, it will just eat
-                         the max amount.
-    
-            Variables: 
-            -self: instance of class
-            -amount: variable change to energy level
-                     assumed to be positive
-                     
-            Postconditions: energy is increased depending on amount of food
-                            available when eat was called.
-        """
-        self.energy += min(amount, self.eat_amount)
-
-    # MEATHOD: drink ----------------------------------------------------------
-    def drink(self, amount):
-        """ Description: updates the fauna's position
-    
-            Variables: 
-            -self: instance of class
-            -amount: variable change to water level
-                     assumed to be positive
-        """
-        self.water += min(amount, self.drink_amount)
-
-    # MEATHOD: move -----------------------------------------------------------
-    def move(self, y, x, tempValue):
-        """ Description: updates the fauna's position
-                         deducts the move cost
-    
-            Variables: 
-            -self: instance of class
-            -x: x position
-            -y: y position
-            
-            Postconditions:
-            Fauna's position data is updated. Temperature is updated depending
-            on location. Energy and Water are reduced by the move cost.
-        """
-        if(tempValue < self.temp):
-            self.temp = max(self.temp -\
-                            (abs(tempValue) * const.TEMP_TRANSFER), tempValue)
-        elif(tempValue > self.temp):
-            self.temp = min(self.temp +\
-                            (abs(tempValue) * const.TEMP_TRANSFER), tempValue)
+        #Threshold for when fauna dies from hunger or thirst
+        stats['starve'] = cls.max_energy * config.STARVE_PERCENT
+        stats['desiccate'] = cls.max_water * config.DESICCATE_PERCENT
         
-        self.energy -= self.move_energy_cost
-        self.water -= self.move_water_cost
-        self.position = [y, x]
-
-    # MEATHOD: wait -----------------------------------------------------------
-    def wait(self):
-        """ Description: deducts the wait cost
-    
-            Variables: 
-            -self: instance of class
-            
-            Postconditions:
-            Energy and Water are reduced by the wait cost.
-        """
-        self.energy -= self.wait_energy_cost
-        self.water -= self.wait_water_cost
-    
-    # MEATHOD: consumed -------------------------------------------------------    
-    def consumed(self):
-        """ Description: Fauna has been eaten and it returns the amount of energy and water
-                         it provides.
+        #Energy and water costs of taking an action
+        stats['move_energy_cost'] = ((cls.max_energy\
+                                      / config.ENERGY_MOVE_FACTOR)\
+                                     / config.HOURS_PER_DAY) / cls.steps(config)
+        stats['wait_energy_cost'] = stats['move_energy_cost']\
+                                    / config.ENERGY_WAIT_REDUCE 
+        stats['move_water_cost'] = ((cls.max_water / config.WATER_MOVE_FACTOR)\
+                                    / config.HOURS_PER_DAY) / cls.steps(config)
+        stats['wait_water_cost'] = stats['move_water_cost']\
+                                   / config.WATER_WAIT_REDUCE 
         
-            Variables:
-            -self: instance of class
-           
-            Postconditions:
-            Returns an energy and water value depending on fauna
-            
-        """
-        self.alive = False # it's been eaten
-        # return array of energy and water values to add to predators
-        return [self.energy_value, self.water_value]
-
-    # MEATHOD: healthCheck ----------------------------------------------------
-    def healthCheck(self):
-        """ Description: updates the alive status if needed
-    
-            Variables: 
-            -self: instance of class
-
-            Output: a boolean value indicating the life of the fauna
-        """
-        #Compare current fauna condition to the thresholds
-        num = -1
-
-        if(self.alive):
-            if(self.energy < self.starve):
-                self.alive = False
-                num = 0
-            elif(self.water < self.desiccate):
-                self.alive = False
-                num = 1
-            elif(self.temp <= self.froze):
-                self.alive = False
-                num = 2
-            elif(self.temp >= self.boiled):
-                self.alive = False
-                num = 3
-
-        return [self.alive, num]
+        stats['eat_amount'] = cls.eat_amount
+        stats['drink_amount'] = cls.drink_amount
+        stats['carnivore'] = cls.isCarnivore()
+        return stats
     
     # MEATHOD: isHerbivore ----------------------------------------------------
-    def isHerbivore(self):
+    @classmethod
+    def isHerbivore(cls):
         """ Description: Returns whether a fauna is an herbivore"""
         return False
     
     # MEATHOD: isCarnivore ----------------------------------------------------
-    def isCarnivore(self):
+    @classmethod
+    def isCarnivore(cls):
         """ Description: Returns whether a fauna is a carnivore"""
         return False 
     
@@ -245,7 +128,8 @@ class Herbivore(Fauna):
     """
     
     # MEATHOD: isHerbivore ----------------------------------------------------
-    def isHerbivore(self):
+    @classmethod
+    def isHerbivore(cls):
         """ Description: Returns whether a fauna is an herbivore"""
         return True
 
@@ -256,7 +140,8 @@ class Carnivore(Fauna):
     """
     
     # MEATHOD: isCarnivore ----------------------------------------------------    
-    def isCarnivore(self):
+    @classmethod
+    def isCarnivore(cls):
         """ Description: Returns whether a fauna is a carnivore"""
         return True
     
@@ -267,10 +152,6 @@ class Rabbit(Herbivore):
                      Rabbits roam around the environment, eating plants and looking for 
                      water if they are thirsty. They are spawned from rabbit burrows.
                      Inherits Herbivore
-            
-    
-            Variables: 
-            -self: instance of class
     """
     INIT_ENERGY_MIN = 900         # initialization minimum for energy
     INIT_ENERGY_MAX = 1000       # initialization range for energy
@@ -292,8 +173,6 @@ class Fox(Carnivore, Herbivore):
                      down rabbits by following their scent. They can also eat
                      plants to survive.
                      Inherits Herbivore, Carnivore
-                     
-    
     """
     
     INIT_ENERGY_MIN = 3500       # initialization minimum for energy
@@ -309,54 +188,359 @@ class Fox(Carnivore, Herbivore):
     
     natural_temp = 10           # natural temperature
 
+    # MEATHOD: steps ----------------------------------------------------------
+    @classmethod
+    def steps(cls, config):
+        """ Description: Foxes split their hourly costs over their extra
+                         steps
+        """
+        return config.EXTRA_FOX_STEPS
+
+#==============================================================================
+# SPECIES CODES _______________________________________________________________
+# Index of each species in the species column of the Population table
+RABBIT = 0
+FOX = 1
+SPECIES = (Rabbit, Fox)
+
+# CAUSES OF DEATH _____________________________________________________________
+# Index of each cause in the cause column of the Population table
+STARVED = 0
+DESICCATED = 1
+FROZE = 2
+BOILED = 3
+EATEN = 4
+CAUSES = ('Starved', 'Desiccated', 'Frozen', 'Boiled', 'Eaten')
+
+# FUNCTION: statsTable --------------------------------------------------------
+def statsTable(config):
+    """ Description: Builds the lookup tables of the species values
+    
+        Variables: 
+        -config: SimConfig of the simulation
+        
+        Output: dictionary of arrays indexed by species code
+    """
+    table = [species.stats(config) for species in SPECIES]
+    stats = {}
+    for key in table[0]:
+        stats[key] = nu.array([row[key] for row in table])
+    return stats
+
+# CLASS: Population +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class Population:
+    """ Description: Structure-of-arrays table of every animal in the 
+                     simulation. An animal is a row index into the columns,
+                     and the actions take arrays of row indices so they are
+                     applied to many animals in one step.
+    
+        Variables: 
+        -energy: column of fauna energy levels
+        -water: column of fauna water levels
+        -temp: column of fauna temperatures
+        -y, x: columns of fauna grid positions
+        -species: column of species codes (index into SPECIES)
+        -alive: column of alive status flags
+        -cause: column of causes of death, -1 while alive
+        -stats: per species arrays of thresholds and costs
+        -config: SimConfig of the simulation
+        -rng: random number generator of the simulation
+    """
+    
     # MEATHOD: init -----------------------------------------------------------
-    def __init__(self, y, x):
-        """ Description: Class constructor
+    def __init__(self, config, rng):
+        """ Description: Class constructor, creates an empty table
     
             Variables: 
             -self: instance of class
-            -x: x position
-            -y: y position
+            -config: SimConfig of the simulation
+            -rng: random number generator of the simulation
+        """
+        self.config = config
+        self.rng = rng
+        self.energy = nu.zeros(0)                   # current fauna energy
+        self.water = nu.zeros(0)                    # current fauna water
+        self.temp = nu.zeros(0)                     # current temperature
+        self.y = nu.zeros(0, dtype=int)             # current y position
+        self.x = nu.zeros(0, dtype=int)             # current x position
+        self.species = nu.zeros(0, dtype=int)       # species code
+        self.alive = nu.zeros(0, dtype=bool)        # alive status flag
+        self.cause = nu.zeros(0, dtype=int)         # cause of death
+        
+        #Lookup tables indexed by species code
+        self.stats = config.fauna_stats
+
+    # MEATHOD: len ------------------------------------------------------------
+    def __len__(self):
+        """ Description: Returns the number of rows in the table"""
+        return len(self.alive)
+
+    # MEATHOD: stat -----------------------------------------------------------
+    def stat(self, name, idx):
+        """ Description: Looks up a species value for every given animal
+    
+            Variables: 
+            -name: key of the species value
+            -idx: row indices of the animals
+        """
+        return self.stats[name][self.species[idx]]
+
+    # MEATHOD: copy -----------------------------------------------------------
+    def copy(self, config, rng):
+        """ Description: Copies the table for another simulation
+    
+            Variables: 
+            -config: SimConfig of the other simulation
+            -rng: random number generator of the other simulation
             
-            PostConditions: 
-            One of the fauna objects are created.
+            Output: the new table
         """
-        #Initializes energy and water through uniform distribution
-        self.energy = nu.random.uniform(self.INIT_ENERGY_MIN,\
-                                        self.INIT_ENERGY_MAX)
-        self.water = nu.random.uniform(self.INIT_WATER_MIN,\
-                                       self.INIT_WATER_MAX)
+        table = Population(config, rng)
+        table.energy = self.energy.copy()
+        table.water = self.water.copy()
+        table.temp = self.temp.copy()
+        table.y = self.y.copy()
+        table.x = self.x.copy()
+        table.species = self.species.copy()
+        table.alive = self.alive.copy()
+        table.cause = self.cause.copy()
+        return table
+
+    # MEATHOD: spawn ----------------------------------------------------------
+    def spawn(self, species, y, x):
+        """ Description: Adds new animals of one species to the table
+    
+            Variables: 
+            -species: species code of the new animals
+            -y: y positions of the new animals
+            -x: x positions of the new animals
+            
+            Output: row indices of the new animals
+        """
+        y = nu.asarray(y, dtype=int).ravel()
+        x = nu.asarray(x, dtype=int).ravel()
+        count = len(y)
+        kind = SPECIES[species]
         
-        #Initializes temperature depending on natural temperature and environment
-        self.temp = self.natural_temp
-        self.cold = self.natural_temp + const.COLD_OFFSET
-        self.froze = self.natural_temp + const.FROZE_OFFSET
-        self.hot = self.natural_temp + const.HOT_OFFSET
-        self.boiled = self.natural_temp + const.BOILED_OFFSET
+        #Initializes energy and water through uniform distribution
+        energy = self.rng.uniform(kind.INIT_ENERGY_MIN,\
+                                   kind.INIT_ENERGY_MAX, count)
+        water = self.rng.uniform(kind.INIT_WATER_MIN,\
+                                  kind.INIT_WATER_MAX, count)
         
-        #Initializes energy and water values for when fauna is consumed
-        self.energy_value = self.max_energy * const.FAUNA_ENERGY_PERCENT
-        self.water_value = self.max_water * const.FAUNA_WATER_PERCENT
+        first = len(self)
+        self.energy = nu.concatenate((self.energy, energy))
+        self.water = nu.concatenate((self.water, water))
+        self.temp = nu.concatenate((self.temp,\
+                                    nu.full(count, float(kind.natural_temp))))
+        self.y = nu.concatenate((self.y, y))
+        self.x = nu.concatenate((self.x, x))
+        self.species = nu.concatenate((self.species,\
+                                       nu.full(count, species, dtype=int)))
+        self.alive = nu.concatenate((self.alive, nu.ones(count, dtype=bool)))
+        self.cause = nu.concatenate((self.cause, nu.full(count, -1)))
+        return nu.arange(first, first + count)
+
+    # MEATHOD: kill ----------------------------------------------------------
+    def kill(self, idx, cause):
+        """ Description: Marks the given animals as dead. The rows are kept
+                         as tombstones until the table is compacted.
+    
+            Variables: 
+            -idx: row indices of the animals
+            -cause: cause of death (STARVED, DESICCATED, FROZE, BOILED or
+                    EATEN), a single value or one per animal
+        """
+        self.alive[idx] = False
+        self.cause[idx] = cause
+
+    # MEATHOD: compact --------------------------------------------------------
+    def compact(self):
+        """ Description: Deletes every dead row from the table in one pass
+    
+            Output: array of deaths counted by [carnivore, cause], rows 
+                    0 herbivores and 1 carnivores
+        """
+        dead = nu.logical_not(self.alive)
+        carnivore = self.stats['carnivore'][self.species[dead]]
+        deaths = nu.bincount(carnivore * len(CAUSES) + self.cause[dead],\
+                             minlength=2 * len(CAUSES))
         
-        #Initializes threshold for when fauna becomes hungry and thirsty
-        self.hungry = self.max_energy * const.HUNGRY_PERCENT
-        self.thirsty = self.max_water * const.THIRSTY_PERCENT
+        keep = self.alive
+        self.energy = self.energy[keep]
+        self.water = self.water[keep]
+        self.temp = self.temp[keep]
+        self.y = self.y[keep]
+        self.x = self.x[keep]
+        self.species = self.species[keep]
+        self.cause = self.cause[keep]
+        self.alive = self.alive[keep]
+        return deaths.reshape(2, len(CAUSES))
+
+    # MEATHOD: herbivores -----------------------------------------------------
+    def herbivores(self):
+        """ Description: Returns the row indices of living herbivores.
+                         Animals that are also carnivores are excluded.
+        """
+        carnivore = self.stats['carnivore'][self.species]
+        return nu.flatnonzero(self.alive & nu.logical_not(carnivore))
+
+    # MEATHOD: carnivores -----------------------------------------------------
+    def carnivores(self):
+        """ Description: Returns the row indices of living carnivores"""
+        carnivore = self.stats['carnivore'][self.species]
+        return nu.flatnonzero(self.alive & carnivore)
+
+    # MEATHOD: eat ------------------------------------------------------------
+    def eat(self, idx, amount):
+        """ Description: Updates the given animals' energy. If there is more
+                         food than the maximum amount an animal can eat, it
+                         will just eat the max amount.
+    
+            Variables: 
+            -idx: row indices of the animals
+            -amount: variable change to energy level
+                     assumed to be positive
+                     
+            Postconditions: energy is increased depending on amount of food
+                            available when eat was called.
+        """
+        self.energy[idx] += nu.minimum(amount, self.stat('eat_amount', idx))
+
+    # MEATHOD: drink ----------------------------------------------------------
+    def drink(self, idx, amount):
+        """ Description: Updates the given animals' water
+    
+            Variables: 
+            -idx: row indices of the animals
+            -amount: variable change to water level
+                     assumed to be positive
+        """
+        self.water[idx] += nu.minimum(amount, self.stat('drink_amount', idx))
+
+    # MEATHOD: move -----------------------------------------------------------
+    def move(self, idx, y, x, tempValue):
+        """ Description: Updates the given animals' positions and
+                         deducts the move cost
+    
+            Variables: 
+            -idx: row indices of the animals
+            -y: new y positions
+            -x: new x positions
+            -tempValue: temperatures at the new positions
+            
+            Postconditions:
+            Fauna's position data is updated. Temperature is updated depending
+            on location. Energy and Water are reduced by the move cost.
+        """
+        temp = self.temp[idx]
+        change = nu.abs(tempValue) * self.config.TEMP_TRANSFER
+        temp = nu.where(tempValue < temp,\
+                        nu.maximum(temp - change, tempValue),\
+                        nu.where(tempValue > temp,\
+                                 nu.minimum(temp + change, tempValue), temp))
         
-        #Initializes threshold for when fauna dies from hunger or thirst
-        self.starve = self.max_energy * const.STARVE_PERCENT
-        self.desiccate = self.max_water * const.DESICCATE_PERCENT
+        self.temp[idx] = temp
+        self.energy[idx] -= self.stat('move_energy_cost', idx)
+        self.water[idx] -= self.stat('move_water_cost', idx)
+        self.y[idx] = y
+        self.x[idx] = x
+
+    # MEATHOD: wait -----------------------------------------------------------
+    def wait(self, idx):
+        """ Description: Deducts the wait cost from the given animals
+    
+            Variables: 
+            -idx: row indices of the animals
+            
+            Postconditions:
+            Energy and Water are reduced by the wait cost.
+        """
+        self.energy[idx] -= self.stat('wait_energy_cost', idx)
+        self.water[idx] -= self.stat('wait_water_cost', idx)
+    
+    # MEATHOD: consumed -------------------------------------------------------    
+    def consumed(self, idx):
+        """ Description: The given animals have been eaten, returns the amount
+                         of energy and water each provides.
         
-        #Initializes energy and water costs of taking an action
-        self.move_energy_cost = ((self.max_energy / const.ENERGY_MOVE_FACTOR)\
-                                 / const.HOURS_PER_DAY) / const.EXTRA_FOX_STEPS
-        self.wait_energy_cost = self.move_energy_cost\
-                                / const.ENERGY_WAIT_REDUCE 
-        self.move_water_cost = ((self.max_water / const.WATER_MOVE_FACTOR)\
-                                / const.HOURS_PER_DAY) / const.EXTRA_FOX_STEPS
-        self.wait_water_cost = self.move_water_cost / const.WATER_WAIT_REDUCE 
+            Variables:
+            -idx: row indices of the animals
+           
+            Postconditions:
+            Returns arrays of energy and water values depending on fauna
+        """
+        self.kill(idx, EATEN) # it's been eaten
+        return [self.stat('energy_value', idx), self.stat('water_value', idx)]
+
+    # MEATHOD: healthCheck ----------------------------------------------------
+    def healthCheck(self):
+        """ Description: Updates the alive status of every animal. Animals 
+                         that died are marked with their cause of death.
+    
+            Output: boolean array indicating the life of each animal
+        """
+        #Compare current fauna condition to the thresholds
+        conditions = [self.energy < self.stats['starve'][self.species],\
+                      self.water < self.stats['desiccate'][self.species],\
+                      self.temp <= self.stats['froze'][self.species],\
+                      self.temp >= self.stats['boiled'][self.species]]
+        cause = nu.select(conditions, [STARVED, DESICCATED, FROZE, BOILED], -1)
+        dead = nu.flatnonzero(self.alive & (cause != -1))
+        self.kill(dead, cause[dead])
+        return self.alive
+
+# CLASS: CellIndex ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class CellIndex:
+    """ Description: Index from grid cell to the animals standing on it.
+                     Row indices are grouped by cell, so the animals on a 
+                     cell are found without scanning the whole population.
+    
+        Variables: 
+        -count: grid of the number of animals on each cell
+        -start: grid of the offset of each cell's animals in rows
+        -rows: population row indices sorted by cell
+    """
+    
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self, length, width):
+        """ Description: Class constructor, creates an empty index
+    
+            Variables: 
+            -length: number of grid rows
+            -width: number of grid columns
+        """
+        self.width = width
+        self.count = nu.zeros((length, width), dtype=int)
+        self.start = nu.zeros((length, width), dtype=int)
+        self.rows = nu.zeros(0, dtype=int)
+
+    # MEATHOD: rebuild --------------------------------------------------------
+    def rebuild(self, y, x, rows):
+        """ Description: Indexes the given animals by their positions
+    
+            Variables: 
+            -y, x: positions of the animals
+            -rows: population row indices of the animals
+        """
+        cells = y * self.width + x
+        order = nu.argsort(cells, kind='stable')
+        self.rows = nu.asarray(rows, dtype=int)[order]
         
-        #Initializes location in environment
-        self.position = [y, x]
-        self.alive = True      #Set fauna as alive
+        count = nu.bincount(cells, minlength=self.count.size)
+        self.count.ravel()[:] = count
+        self.start.ravel()[:] = nu.cumsum(count) - count
+
+    # MEATHOD: at -------------------------------------------------------------
+    def at(self, y, x):
+        """ Description: Returns the row indices of the animals on a cell"""
+        first = self.start[y, x]
+        return self.rows[first:first + self.count[y, x]]
+
+    # MEATHOD: occupied -------------------------------------------------------
+    def occupied(self):
+        """ Description: Returns a boolean grid of the cells with animals"""
+        return self.count > 0
+
 #==============================================================================
 # END FILE
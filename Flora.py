@@ -4,7 +4,9 @@
 """ This file contains Flora objects used in the ecosystem simulation
     Flora contain water and energy which are updated depending on the environment.
     They return water and energy when they are eaten by fauna.
-    Current Fauna: Grass
+    The state of every plant is kept in grid shaped arrays of the PlantField,
+    so plants are updated for the whole grid at once.
+    Current Flora: Grass
     See code documentation for specifics on code functionality
 """
 
@@ -21,7 +23,6 @@
 
 #==============================================================================
 # PROGRAM IMPORTS _____________________________________________________________
-import Variables as const
 import numpy as nu
 
 #==============================================================================
@@ -29,13 +30,14 @@ import numpy as nu
 class Flora:
     """ Description: The flora class is a plant and remains in one place during
                      the simulation. Fauna can eat flora to gain energy. 
+                     The class describes the constants of a species, the
+                     state of each plant is kept in the PlantField.
     
         Variables: 
-        -energy: the flora's energy level
-        -water: the flora's water level
-        -size: the flora's size level
-        -position: the flora's physical position in the simulation grid
-        -alive: a boolean for checking if the animal is alive
+        -INIT_*: ranges used to initialize size, energy and water
+        -unit_*: energy and water a unit of size costs and can store
+        -photo_amount, drink_amount: minimum absorbed per unit an hour
+        -max_units: maximum size of a plant
     """
     INIT_ENERGY_MIN = None         # initialization minimum for energy
     INIT_ENERGY_MAX = None       # initialization range for energy
@@ -44,102 +46,180 @@ class Flora:
     INIT_SIZE_MIN = None         # initialization minimum for size
     INIT_SIZE_MAX = None         # initialization range for size
     
-    energy = None                # current energy amount
     unit_extra_energy = None
     unit_energy_cost = None
-    energy_per_unit = None
     photo_amount = None
     
-    water = None                 # current water amount
     unit_extra_water = None
     unit_water_cost = None
-    water_per_unit = None
     drink_amount = None
     
-    size = None                 # current size
     max_units = None            # maximum units per object
+
+# CLASS: Grass ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class Grass(Flora):
+    """ Description: Grass Plant
+                     Grass will grow in the same place until an animal eats all
+                     of it. Grass provides energy and water to fauna in the
+                     simulation.
+    
+    """
+    
+    INIT_ENERGY_MIN = 500         # initialization minimum for energy
+    INIT_ENERGY_MAX = 1000       # initialization range for energy
+    INIT_WATER_MIN = 500         # initialization minimum for water
+    INIT_WATER_MAX = 1000        # initialization range for water
+    INIT_SIZE_MIN = 1            # initialization minimum for size
+    INIT_SIZE_MAX = 3            # initialization range for size
+    
+    max_units = 5                # maximum amount of units per grass object
+    
+    unit_energy_cost = 500
+    unit_extra_energy = 500
+    photo_amount = 1000
     
-    position = None             # location of flora
-    alive = None                # alive flag
+    unit_water_cost = 500
+    unit_extra_water = 500
+    drink_amount = 1000
+
+# CLASS: PlantField +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class PlantField:
+    """ Description: Grid shaped arrays holding the state of one plant per 
+                     cell. Cells without a plant hold zeros, which keeps them
+                     unchanged by the whole grid updates.
+    
+        Variables: 
+        -size: grid of plant sizes
+        -energy: grid of plant energy levels
+        -water: grid of plant water levels
+        -alive: grid of alive flags
+        -kind: flora species growing in the field
+        -rng: random number generator of the simulation
+    """
     
     # MEATHOD: init -----------------------------------------------------------
-    def __init__(self, y, x):
-        """ Description: Class constructor
+    def __init__(self, length, width, config, rng, kind=Grass):
+        """ Description: Class constructor, creates an empty field
     
             Variables: 
             -self: instance of class
-            -x: x position
-            -y: y position
+            -length: number of grid rows
+            -width: number of grid columns
+            -config: SimConfig of the simulation
+            -rng: random number generator of the simulation
+            -kind: flora species growing in the field
+        """
+        self.kind = kind
+        self.rng = rng
+        self.size = nu.zeros((length, width))       # current size
+        self.energy = nu.zeros((length, width))     # current energy amount
+        self.water = nu.zeros((length, width))      # current water amount
+        self.alive = nu.zeros((length, width), dtype=bool)  # alive flags
+        
+        self.energy_per_unit = kind.unit_energy_cost\
+                                * config.FLORA_ENERGY_PERCENT
+        self.water_per_unit = kind.unit_water_cost\
+                                * config.FLORA_WATER_PERCENT
+        self.max_energy_unit = kind.unit_extra_energy + kind.unit_energy_cost
+        self.max_water_unit = kind.unit_extra_water + kind.unit_water_cost
+
+    # MEATHOD: copy -----------------------------------------------------------
+    def copy(self, config, rng):
+        """ Description: Copies the field for another simulation
+    
+            Variables: 
+            -config: SimConfig of the other simulation
+            -rng: random number generator of the other simulation
             
-            Postconditions: Flora object is created
+            Output: the new field
         """
-        #Initialize size, energy and water through uniform distribution
-        self.size = nu.random.uniform(self.INIT_SIZE_MIN, self.INIT_SIZE_MAX)
-        self.energy = nu.random.uniform(self.INIT_ENERGY_MIN*self.size,\
-                                        self.INIT_ENERGY_MAX*self.size)
-        self.water = nu.random.uniform(self.INIT_WATER_MIN*self.size,\
-                                       self.INIT_WATER_MAX*self.size)
+        length, width = self.size.shape
+        field = PlantField(length, width, config, rng, self.kind)
+        field.size = self.size.copy()
+        field.energy = self.energy.copy()
+        field.water = self.water.copy()
+        field.alive = self.alive.copy()
+        return field
+
+    # MEATHOD: spawn ----------------------------------------------------------
+    def spawn(self, mask):
+        """ Description: Creates a plant in every masked cell
+    
+            Variables: 
+            -mask: boolean grid, True where a plant is created
+            
+            Postconditions: the cells hold new plants
+        """
+        kind = self.kind
+        count = int(nu.count_nonzero(mask))
         
-        self.energy_per_unit = self.unit_energy_cost\
-                                * const.FLORA_ENERGY_PERCENT
-        self.water_per_unit = self.unit_water_cost\
-                                * const.FLORA_WATER_PERCENT
-        #position of plant
-        self.position = [y, x]
-        self.alive = True       #set plant to alive
+        #Initialize size, energy and water through uniform distribution
+        size = self.rng.uniform(kind.INIT_SIZE_MIN, kind.INIT_SIZE_MAX, count)
+        self.size[mask] = size
+        self.energy[mask] = self.rng.uniform(kind.INIT_ENERGY_MIN * size,\
+                                              kind.INIT_ENERGY_MAX * size)
+        self.water[mask] = self.rng.uniform(kind.INIT_WATER_MIN * size,\
+                                             kind.INIT_WATER_MAX * size)
+        self.alive[mask] = True
 
     # MEATHOD: photosynth -----------------------------------------------------
     def photosynth(self, amount):
-        """ Description: updates the flora's energy value
+        """ Description: updates the flora's energy values
     
             Variables: 
             -self: instance of class
-            -amount: variable change to water value
+            -amount: grid of variable change to energy value
                      assumed to be positive
                      
         """
-        self.energy += max(amount * self.size, self.photo_amount * self.size)
-        maxEnergy = (self.unit_extra_energy + self.unit_energy_cost)\
-                    * self.size
-        self.energy = min(self.energy, maxEnergy)
+        self.energy += nu.maximum(amount * self.size,\
+                                  self.kind.photo_amount * self.size)
+        nu.minimum(self.energy, self.max_energy_unit * self.size,\
+                   out=self.energy)
 
     # MEATHOD: drink ----------------------------------------------------------
     def drink(self, amount):
-        """ Description: updates the flora's water value
+        """ Description: updates the flora's water values
     
             Variables: 
             -self: instance of class
-            -amount: variable change to water value
+            -amount: grid of variable change to water value
                      assumed to be positive
                     
         """
-        self.water = max(amount * self.size, self.drink_amount * self.size)
-        maxWater = (self.unit_extra_water + self.unit_water_cost) * self.size
-        self.water = min(self.water, maxWater)
+        nu.maximum(amount * self.size, self.kind.drink_amount * self.size,\
+                   out=self.water)
+        nu.minimum(self.water, self.max_water_unit * self.size,\
+                   out=self.water)
 
     # MEATHOD: growth ---------------------------------------------------------
     def growth(self):
-        """ Description: updates the flora's size
+        """ Description: updates the flora's sizes
+                         Every whole unit of size costs a unit of energy and
+                         water. A plant that can't pay for all of its units
+                         shrinks back to one unit.
     
             Variables: 
             -self: instance of class
         """
-        #Consumes energy to increase size
-        for i in range(int(self.size)):
-            if(self.energy >= self.unit_energy_cost and\
-               self.water >= self.unit_water_cost):
-                self.energy = max(self.energy - self.unit_energy_cost, 0)
-                self.water = max(self.water - self.unit_water_cost, 0)
-            else:
-                self.size -= max(0, self.size - 1)
-                print('a')
-                if(self.size == 0):
-                    self.alive = False
+        kind = self.kind
+        units = nu.floor(self.size)
+        
+        #Consumes energy to keep its size
+        paid = nu.minimum(units,\
+                          nu.minimum(nu.floor(self.energy\
+                                              / kind.unit_energy_cost),\
+                                     nu.floor(self.water\
+                                              / kind.unit_water_cost)))
+        self.energy -= paid * kind.unit_energy_cost
+        self.water -= paid * kind.unit_water_cost
+        shrink = (paid < units) & (self.size > 1)
+        self.size[shrink] = 1
         
         # if both energy and water are positive
-        if(self.energy >= self.unit_energy_cost and\
-           self.water >= self.unit_water_cost):
-            self.size = min(self.max_units, self.size + 1)
+        grow = (self.energy >= kind.unit_energy_cost) &\
+               (self.water >= kind.unit_water_cost)
+        self.size[grow] = nu.minimum(kind.max_units, self.size[grow] + 1)
 
     # MEATHOD: healthCheck ----------------------------------------------------
     def healthCheck(self):
@@ -148,72 +228,40 @@ class Flora:
             Variables: 
             -self: instance of class
 
-            Output: a boolean value indicating the life of the fauna
+            Output: a boolean grid indicating the life of the flora
         """
-        if(self.alive):
-            if(self.size <= 0):
-                self.alive = False
+        self.alive &= self.size > 0
         return self.alive
     
     # MEATHOD: consumed -------------------------------------------------------
-    def consumed(self, units):
-        """ Description: Provides energy and water to fauna that eats the flora
+    def consumed(self, y, x, units):
+        """ Description: Provides energy and water to fauna that eat the flora
+                         at the given cells
         
             Variables:
             -self: instance of class
-            units:
+            -y, x: positions of the eaten plants, each cell at most once
+            -units: amount of size each plant loses
             
             Postconditions: returns energy and water values from being eaten
         """
         # If animal can eat the whole plant, reduce plant size to 0 and return
         # all the energy it would have given.
         # variable energy is not plant energy, it is energy for the animal.
-        energyValue = 0
-        waterValue = 0
+        size = self.size[y, x]
+        eaten = nu.minimum(units, size)
+        energyValue = eaten * self.energy_per_unit
+        waterValue = eaten * self.energy_per_unit
         
-        if units >= self.size:
-            energyValue = self.size * self.energy_per_unit
-            waterValue = self.size * self.energy_per_unit
-            self.size = 0
-            self.alive = False
-        else:
-            self.size -= units
-            energyValue = units * self.energy_per_unit
-            waterValue = units * self.energy_per_unit
-            self.energy = min(self.energy,\
-                              (self.unit_extra_energy + self.unit_energy_cost)\
-                              * self.size)
-            self.water = min(self.water,\
-                             (self.unit_extra_water + self.unit_water_cost)\
-                             * self.size)
+        size = size - eaten
+        self.size[y, x] = size
+        self.energy[y, x] = nu.minimum(self.energy[y, x],\
+                                       self.max_energy_unit * size)
+        self.water[y, x] = nu.minimum(self.water[y, x],\
+                                      self.max_water_unit * size)
+        self.alive[y, x] = size > 0
             
         return [energyValue, waterValue]
-
-# CLASS: Grass ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-class Grass(Flora):
-    """ Description: Grass Plant
-                     Grass will grow in the same place until an animal eats all
-                     of it. Grass provides energy and water to fauna in the
-                     simulation.
-    
-    """
-    
-    INIT_ENERGY_MIN = 500         # initialization minimum for energy
-    INIT_ENERGY_MAX = 1000       # initialization range for energy
-    INIT_WATER_MIN = 500         # initialization minimum for water
-    INIT_WATER_MAX = 1000        # initialization range for water
-    INIT_SIZE_MIN = 1            # initialization minimum for size
-    INIT_SIZE_MAX = 3            # initialization range for size
-    
-    max_units = 5                # maximum amount of units per grass object
-    
-    unit_energy_cost = 500
-    unit_extra_energy = 500
-    photo_amount = 1000
-    
-    unit_water_cost = 500
-    unit_extra_water = 500
-    drink_amount = 1000
     
 #==============================================================================
 # END FILE
@@ -0,0 +1,170 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the frame writer used to save the ecosystem simulation
+    without a display.
+    Frames are grids of colour codes (see EcoSystem.frameCodes) and are
+    encoded as soon as they are written, so long runs never hold more than
+    one frame in memory.
+    Output formats:
+        - a directory: one numbered PNG file per frame
+        - a .gif file: an animated GIF
+        - a .mp4 file: a video encoded by ffmpeg (must be on the PATH)
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.7
+# - Uses Pillow, which is installed along with matplotlib
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import numpy as nu
+import os
+import shutil
+import subprocess
+
+#==============================================================================
+# CLASS: FrameWriter ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class FrameWriter:
+    """ Description: Encodes simulation frames into a PNG sequence, an
+                     animated GIF or an MP4 file while the simulation runs.
+                     Can be used as a context manager.
+
+        Variables:
+        -path: output directory or file
+        -palette: array of RGB colours (0 to 1) indexed by colour code
+        -scale: size in pixels of one grid cell
+        -fps: frames per second of animated outputs
+        -count: number of frames written
+    """
+
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self, path, palette, scale=1, fps=2):
+        """ Description: Class constructor, opens the output
+
+            Variables:
+            -path: directory for PNG frames, or a .gif or .mp4 file
+            -palette: array of RGB colours (0 to 1) indexed by colour code
+            -scale: size in pixels of one grid cell
+            -fps: frames per second of animated outputs
+        """
+        self.path = path
+        self.palette = nu.asarray(palette, dtype=float)
+        self.scale = int(scale)
+        self.fps = fps
+        self.count = 0
+
+        self.file = None            # open GIF file
+        self.process = None         # running ffmpeg process
+        self.mode = os.path.splitext(path)[1].lower()
+        if(self.mode not in ('.gif', '.mp4')):
+            self.mode = '.png'
+            os.makedirs(path, exist_ok=True)
+
+    # MEATHOD: write ----------------------------------------------------------
+    def write(self, codes):
+        """ Description: Encodes a frame and writes it to the output
+
+            Variables:
+            -codes: 2D grid of colour codes, first row at the top
+        """
+        codes = nu.asarray(codes, dtype=nu.uint8)
+        if(self.scale > 1):
+            codes = codes.repeat(self.scale, axis=0)\
+                         .repeat(self.scale, axis=1)
+
+        if(self.mode == '.png'):
+            name = os.path.join(self.path, 'frame_%05d.png' % self.count)
+            self.paletteImage(codes).save(name)
+        elif(self.mode == '.gif'):
+            self.writeGif(codes)
+        else:
+            self.writeVideo(codes)
+        self.count += 1
+
+    # MEATHOD: paletteImage ---------------------------------------------------
+    def paletteImage(self, codes):
+        """ Description: Wraps a grid of colour codes in a palette image"""
+        from PIL import Image
+        image = Image.fromarray(codes, 'P')
+        image.putpalette(self.paletteBytes())
+        return image
+
+    # MEATHOD: paletteBytes ---------------------------------------------------
+    def paletteBytes(self):
+        """ Description: Returns the palette as a flat list of 0-255 values"""
+        return [int(round(v * 255)) for v in self.palette.ravel()]
+
+    # MEATHOD: writeGif -------------------------------------------------------
+    def writeGif(self, codes):
+        """ Description: Appends a frame to the animated GIF. The header is
+                         written with the first frame and the file is ended
+                         by close.
+
+            Variables:
+            -codes: 2D grid of colour codes
+        """
+        from PIL import GifImagePlugin
+        image = self.paletteImage(codes)
+        if(self.file is None):
+            self.file = open(self.path, 'wb')
+            header = GifImagePlugin.getheader(image, self.paletteBytes())[0]
+            header[0] = b'GIF89a' + header[0][6:]
+            for chunk in header:
+                self.file.write(chunk)
+            # loop the animation forever
+            self.file.write(b'!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+        duration = int(1000 / self.fps)
+        for chunk in GifImagePlugin.getdata(image, duration=duration):
+            self.file.write(chunk)
+
+    # MEATHOD: writeVideo -----------------------------------------------------
+    def writeVideo(self, codes):
+        """ Description: Pipes a frame into ffmpeg. ffmpeg is started with the
+                         first frame.
+
+            Variables:
+            -codes: 2D grid of colour codes
+        """
+        rgb = nu.round(self.palette[codes] * 255).astype(nu.uint8)
+        if(self.process is None):
+            ffmpeg = shutil.which('ffmpeg')
+            if(ffmpeg is None):
+                raise RuntimeError('ffmpeg is needed to write ' + self.path)
+            height, width = codes.shape
+            self.process = subprocess.Popen([ffmpeg, '-y', '-loglevel',\
+                'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s',\
+                '%dx%d' % (width, height), '-r', str(self.fps), '-i', '-',\
+                '-pix_fmt', 'yuv420p', '-vf',\
+                'pad=ceil(iw/2)*2:ceil(ih/2)*2', self.path],\
+                stdin=subprocess.PIPE)
+        self.process.stdin.write(rgb.tobytes())
+
+    # MEATHOD: close ----------------------------------------------------------
+    def close(self):
+        """ Description: Finishes the output file"""
+        if(self.file is not None):
+            self.file.write(b';')
+            self.file.close()
+            self.file = None
+        if(self.process is not None):
+            self.process.stdin.close()
+            self.process.wait()
+            self.process = None
+
+    # MEATHOD: enter ----------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # MEATHOD: exit -----------------------------------------------------------
+    def __exit__(self, *args):
+        self.close()
+
+#==============================================================================
+# END FILE
@@ -0,0 +1,219 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the grid history of the ecosystem simulation.
+    The writer copies grids of the simulation into memory mapped files laid
+    out as time x rows x columns, one file per grid, so histories far larger
+    than memory can be recorded. The reader opens the files without loading
+    them and returns slices of a time range and region.
+    Recording is off unless a writer is given to the ecosystem:
+        eco.history = HistoryWriter('run_history', eco)
+    Files in the history directory:
+        - history.json: grids, shape, data types and number of hours
+        - hours.dat: simulation hour of every record
+        - <grid>.dat: one file per recorded grid
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.7
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import numpy as nu
+import json
+import os
+
+#==============================================================================
+# PROGRAM CONSTANTS ___________________________________________________________
+# Recorded grids: EcoSystem attribute and data type of the file
+GRIDS = {'scent': ('scent_grid', 'float32'),
+         'temp': ('temp_grid', 'float32'),
+         'light': ('light_grid', 'float32'),
+         'water': ('water_grid', 'float32'),
+         'plant': ('plant_grid', 'uint8'),
+         'herbivore': ('herbivore_grid', 'uint8'),
+         'carnivore': ('carnivore_grid', 'uint8')}
+
+#==============================================================================
+# CLASS: HistoryWriter ++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class HistoryWriter:
+    """ Description: Records grids of the simulation every few hours into
+                     memory mapped files. The files grow as needed. Can be
+                     used as a context manager.
+
+        Variables:
+        -path: history directory
+        -grids: names of the recorded grids (keys of GRIDS)
+        -every: hours between records
+        -count: number of records written
+        -capacity: number of records the files currently hold
+    """
+
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self, path, eco, grids=None, every=1, capacity=1024):
+        """ Description: Class constructor, creates the history files
+
+            Variables:
+            -path: history directory
+            -eco: ecosystem whose grids are recorded
+            -grids: names of the grids to record, all of GRIDS by default
+            -every: hours between records
+            -capacity: records the files are first made for
+        """
+        self.path = path
+        self.grids = list(GRIDS if grids is None else grids)
+        self.every = every
+        self.shape = (eco.length, eco.width)
+        self.count = 0
+        self.capacity = 0
+        self.files = {}
+        os.makedirs(path, exist_ok=True)
+        self.grow(capacity)
+
+    # MEATHOD: grow -----------------------------------------------------------
+    def grow(self, capacity):
+        """ Description: Extends the files to hold capacity records
+
+            Variables:
+            -capacity: new number of records
+        """
+        for name in self.files:
+            self.files[name].flush()
+        self.files = {}     # close the maps before the files are resized
+        layout = [('hours', 'int64', ())] +\
+                 [(name, GRIDS[name][1], self.shape) for name in self.grids]
+        for name, dtype, shape in layout:
+            fileName = os.path.join(self.path, name + '.dat')
+            size = capacity * int(nu.prod(shape)) * nu.dtype(dtype).itemsize
+            with open(fileName, 'ab') as file:
+                file.truncate(size)
+            self.files[name] = nu.memmap(fileName, dtype=dtype, mode='r+',\
+                                         shape=(capacity,) + shape)
+        self.capacity = capacity
+        self.writeInfo()
+
+    # MEATHOD: hour -----------------------------------------------------------
+    def hour(self, eco):
+        """ Description: Called by the ecosystem after every hour, records
+                         the grids every few hours
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        if(eco.iterations % self.every == 0):
+            self.record(eco)
+
+    # MEATHOD: record ---------------------------------------------------------
+    def record(self, eco):
+        """ Description: Copies the grids of the ecosystem into the files
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        if(self.count == self.capacity):
+            self.grow(2 * self.capacity)
+
+        self.files['hours'][self.count] = eco.iterations
+        for name in self.grids:
+            grid = getattr(eco, GRIDS[name][0])
+            # the temperature grid has an extra row holding its range
+            self.files[name][self.count] = grid[:self.shape[0]]
+        self.count += 1
+
+    # MEATHOD: writeInfo ------------------------------------------------------
+    def writeInfo(self):
+        """ Description: Writes the description of the files"""
+        info = {'grids': {name: GRIDS[name][1] for name in self.grids},\
+                'shape': list(self.shape), 'count': self.count,\
+                'capacity': self.capacity}
+        with open(os.path.join(self.path, 'history.json'), 'w') as file:
+            json.dump(info, file)
+
+    # MEATHOD: flush ----------------------------------------------------------
+    def flush(self):
+        """ Description: Writes the records to disk"""
+        for name in self.files:
+            self.files[name].flush()
+        self.writeInfo()
+
+    # MEATHOD: close ----------------------------------------------------------
+    def close(self):
+        """ Description: Writes the records to disk and closes the files"""
+        self.flush()
+        self.files = {}
+
+    # MEATHOD: enter ----------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # MEATHOD: exit -----------------------------------------------------------
+    def __exit__(self, *args):
+        self.close()
+
+# CLASS: HistoryReader ++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class HistoryReader:
+    """ Description: Opens a history written by HistoryWriter without loading
+                     it. Only the slices that are read are loaded.
+
+        Variables:
+        -grids: names of the recorded grids
+        -shape: rows and columns of the grids
+        -hours: simulation hour of every record
+    """
+
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self, path):
+        """ Description: Class constructor, opens the history files
+
+            Variables:
+            -path: history directory
+        """
+        with open(os.path.join(path, 'history.json')) as file:
+            info = json.load(file)
+        self.shape = tuple(info['shape'])
+        self.grids = list(info['grids'])
+        count = info['count']
+        capacity = info['capacity']
+
+        self.files = {}
+        for name in self.grids:
+            data = nu.memmap(os.path.join(path, name + '.dat'),\
+                             dtype=info['grids'][name], mode='r',\
+                             shape=(capacity,) + self.shape)
+            self.files[name] = data[:count]
+        self.hours = nu.array(nu.memmap(os.path.join(path, 'hours.dat'),\
+                                        dtype='int64', mode='r',\
+                                        shape=(capacity,))[:count])
+
+    # MEATHOD: len ------------------------------------------------------------
+    def __len__(self):
+        """ Description: Returns the number of records"""
+        return len(self.hours)
+
+    # MEATHOD: read -----------------------------------------------------------
+    def read(self, grid, start=None, stop=None, rows=None, columns=None):
+        """ Description: Reads a time range and region of a grid
+
+            Variables:
+            -grid: name of the grid
+            -start, stop: range of simulation hours, stop excluded
+            -rows: (first, last) rows of the region, last excluded
+            -columns: (first, last) columns of the region, last excluded
+
+            Output: array of time x rows x columns
+        """
+        first = 0 if start is None else\
+                int(nu.searchsorted(self.hours, start))
+        last = len(self) if stop is None else\
+               int(nu.searchsorted(self.hours, stop))
+        rows = slice(*rows) if rows is not None else slice(None)
+        columns = slice(*columns) if columns is not None else slice(None)
+        return nu.array(self.files[grid][first:last, rows, columns])
+
+#==============================================================================
+# END FILE
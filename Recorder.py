@@ -0,0 +1,222 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the recorder used to save time series of the
+    ecosystem simulation.
+    Every hour (or every few hours) the recorder takes one row of metrics:
+    population sizes, deaths by cause, drinks, moves by type and the mean
+    energy and water of the animals. Rows are kept in a fixed size buffer
+    and written out in chunks, so recording never grows the memory used.
+    Output formats:
+        - a directory: one .npy file per chunk, read back with read()
+        - a .csv file: rows appended to one file with a header line
+    Outputs are append only: a recorder opened on an earlier recording
+    adds its rows after the ones already there, if the columns match.
+    Recording is off unless a recorder is given to the ecosystem:
+        eco.recorder = Recorder('run.csv')
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.7
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import Fauna as fa
+import numpy as nu
+import glob
+import json
+import os
+
+#==============================================================================
+# PROGRAM CONSTANTS ___________________________________________________________
+MOVES = ('random', 'food', 'water', 'waited')  # order of the move counters
+
+# Names of the recorded columns, death and move counters are running totals
+COLUMNS = ('hour', 'herbivores', 'carnivores', 'plants') +\
+          tuple('died_' + cause.lower() for cause in fa.CAUSES) +\
+          ('plants_eaten', 'plants_died', 'drinks') +\
+          tuple('herbivore_' + move for move in MOVES) +\
+          tuple('carnivore_' + move for move in MOVES) +\
+          ('herbivore_energy', 'herbivore_water',\
+           'carnivore_energy', 'carnivore_water')
+
+#==============================================================================
+# CLASS: Recorder +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class Recorder:
+    """ Description: Records a row of metrics every few simulated hours into
+                     a ring buffer that is flushed to disk when full. Can be
+                     used as a context manager.
+
+        Variables:
+        -path: output directory or .csv file
+        -every: hours between rows, HOURS_PER_DAY records once a day
+        -buffer: preallocated rows waiting to be written
+        -count: number of rows in the buffer
+        -chunks: number of the next chunk, chunks already in the
+                 directory are kept
+    """
+
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self, path, every=1, chunk=1024):
+        """ Description: Class constructor, opens the output. An existing
+                         output is appended to, a ValueError is raised if
+                         it has other columns.
+
+            Variables:
+            -path: directory for .npy chunks or a .csv file
+            -every: hours between rows
+            -chunk: rows kept in memory before they are written
+        """
+        self.path = path
+        self.every = every
+        self.buffer = nu.empty((chunk, len(COLUMNS)))
+        self.count = 0
+        self.chunks = 0
+
+        self.csv = os.path.splitext(path)[1].lower() == '.csv'
+        if(self.csv):
+            if(os.path.exists(path) and os.path.getsize(path) > 0):
+                with open(path) as file:
+                    checkColumns(path, file.readline().strip().split(','))
+            else:
+                with open(path, 'w') as file:
+                    file.write(','.join(COLUMNS) + '\n')
+        else:
+            os.makedirs(path, exist_ok=True)
+            header = os.path.join(path, 'columns.json')
+            if(os.path.exists(header)):
+                with open(header) as file:
+                    checkColumns(path, json.load(file))
+                chunks = chunkFiles(path)
+                if(len(chunks) > 0):
+                    self.chunks = int(os.path.basename(chunks[-1])[6:-4]) + 1
+            else:
+                with open(header, 'w') as file:
+                    json.dump(COLUMNS, file)
+
+    # MEATHOD: hour -----------------------------------------------------------
+    def hour(self, eco):
+        """ Description: Called by the ecosystem after every hour, records a
+                         row every few hours
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        if(eco.iterations % self.every == 0):
+            self.record(eco)
+
+    # MEATHOD: record ---------------------------------------------------------
+    def record(self, eco):
+        """ Description: Adds a row of the ecosystem's metrics to the buffer
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        fauna = eco.fauna
+        herbs = fauna.herbivores()
+        carns = fauna.carnivores()
+
+        row = self.buffer[self.count]
+        row[0] = eco.iterations
+        row[1] = len(herbs)
+        row[2] = len(carns)
+        row[3] = nu.count_nonzero(eco.plant_grid)
+        k = 4
+        row[k:k + len(fa.CAUSES)] = eco.animalsDeath
+        k += len(fa.CAUSES)
+        row[k:k + 3] = [eco.plantsEaten, eco.plantsDied, eco.timesDrunk]
+        k += 3
+        row[k:k + len(MOVES)] = eco.herbiMove
+        k += len(MOVES)
+        row[k:k + len(MOVES)] = eco.carniMove
+        k += len(MOVES)
+        row[k:k + 4] = [mean(fauna.energy[herbs]), mean(fauna.water[herbs]),\
+                        mean(fauna.energy[carns]), mean(fauna.water[carns])]
+
+        self.count += 1
+        if(self.count == len(self.buffer)):
+            self.flush()
+
+    # MEATHOD: flush ----------------------------------------------------------
+    def flush(self):
+        """ Description: Writes the buffered rows and empties the buffer"""
+        if(self.count == 0):
+            return
+        rows = self.buffer[:self.count]
+        if(self.csv):
+            with open(self.path, 'a') as file:
+                nu.savetxt(file, rows, delimiter=',', fmt='%.10g')
+        else:
+            name = os.path.join(self.path, 'chunk_%06d.npy' % self.chunks)
+            nu.save(name, rows)
+        self.chunks += 1
+        self.count = 0
+
+    # MEATHOD: close ----------------------------------------------------------
+    def close(self):
+        """ Description: Writes the rows left in the buffer"""
+        self.flush()
+
+    # MEATHOD: enter ----------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # MEATHOD: exit -----------------------------------------------------------
+    def __exit__(self, *args):
+        self.close()
+
+# FUNCTION: mean --------------------------------------------------------------
+def mean(values):
+    """ Description: Mean of an array, nan if it is empty"""
+    if(len(values) == 0):
+        return nu.nan
+    return values.mean()
+
+# FUNCTION: checkColumns ------------------------------------------------------
+def checkColumns(path, columns):
+    """ Description: Raises a ValueError if an existing output has other
+                     columns than a recorder writes
+
+        Variables:
+        -path: output directory or .csv file
+        -columns: names of the columns of the output
+    """
+    if(tuple(columns) != COLUMNS):
+        raise ValueError('cannot append to %s, it has other columns' % path)
+
+# FUNCTION: chunkFiles --------------------------------------------------------
+def chunkFiles(path):
+    """ Description: Returns the chunk files of a directory in order"""
+    return sorted(glob.glob(os.path.join(path, 'chunk_*.npy')))
+
+# FUNCTION: read --------------------------------------------------------------
+def read(path):
+    """ Description: Reads the rows written by a Recorder
+
+        Variables:
+        -path: output directory or .csv file of the recorder
+
+        Output: dictionary of arrays, one per column
+    """
+    if(os.path.splitext(path)[1].lower() == '.csv'):
+        rows = nu.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+        with open(path) as file:
+            columns = file.readline().strip().split(',')
+    else:
+        with open(os.path.join(path, 'columns.json')) as file:
+            columns = json.load(file)
+        chunks = chunkFiles(path)
+        rows = [nu.load(name) for name in chunks]
+        if(len(rows) == 0):
+            rows = nu.empty((0, len(columns)))
+        else:
+            rows = nu.concatenate(rows)
+    return {name: rows[:, k] for k, name in enumerate(columns)}
+
+#==============================================================================
+# END FILE
@@ -0,0 +1,160 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the shared memory used by the parallel parts of the
+    ecosystem simulation.
+    The main process publishes named arrays into an Arena, which holds them
+    in multiprocessing.shared_memory blocks. Workers attach to the blocks
+    by the specs the arena returns and see the arrays without copies:
+        arena = Arena()
+        spec = arena.put('water_grid', eco.water_grid)
+        water = attach(spec)            # in a worker process
+    Used by the tiled backend (Tiled.py) and the sweeps of Analysis.py.
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.8, the first with multiprocessing.shared_memory
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import numpy as nu
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    raise ImportError('shared memory needs Python 3.8 or newer')
+
+#==============================================================================
+# PROGRAM CONSTANTS ___________________________________________________________
+MIN_BYTES = 4096    # Smallest shared block
+BLOCKS = {}         # Shared blocks this process is attached to, by name
+KEYS = {}           # Block last attached under every key
+VIEWED = []         # Released blocks that were still viewed
+
+#==============================================================================
+# CLASS: Arena ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class Arena:
+    """ Description: Named arrays in shared memory. A block is reused while
+                     the array fits in it and replaced by a larger one when
+                     it does not.
+
+        Variables:
+        -blocks: SharedMemory block of every array
+        -arrays: array of every name, a view of its block
+        -sources: array last copied into every static name
+    """
+
+    # MEATHOD: INIT -----------------------------------------------------------
+    def __init__(self):
+        """ Description: Class constructor"""
+        self.blocks = {}
+        self.arrays = {}
+        self.sources = {}
+
+    # MEATHOD: put ------------------------------------------------------------
+    def put(self, name, array, static=False, copy=True):
+        """ Description: Publishes an array
+
+            Variables:
+            -name: name of the array
+            -array: values to publish
+            -static: the values are only copied when array is not the one
+                     published last time
+            -copy: False only makes room for an array of the same shape
+
+            Output: (block name, shape, dtype) used by workers to attach
+        """
+        view = self.arrays.get(name)
+        if(view is None or view.shape != array.shape or\
+           view.dtype != array.dtype):
+            block = self.blocks.get(name)
+            if(block is None or block.size < array.nbytes):
+                if(block is not None):
+                    self.arrays.pop(name, None)     # no view of the block
+                    release(block)
+                size = max(MIN_BYTES, array.nbytes + array.nbytes // 2)
+                block = shared_memory.SharedMemory(create=True, size=size)
+                self.blocks[name] = block
+            view = nu.ndarray(array.shape, array.dtype, buffer=block.buf)
+            self.arrays[name] = view
+            self.sources.pop(name, None)
+
+        if(copy and not (static and self.sources.get(name) is array)):
+            nu.copyto(view, array)
+            if(static):
+                self.sources[name] = array
+        return self.spec(name)
+
+    # MEATHOD: spec -----------------------------------------------------------
+    def spec(self, name):
+        """ Description: Returns the spec workers attach to a name with"""
+        view = self.arrays[name]
+        return (self.blocks[name].name, view.shape, view.dtype.str)
+
+    # MEATHOD: get ------------------------------------------------------------
+    def get(self, name):
+        """ Description: Returns the shared array of a name"""
+        return self.arrays[name]
+
+    # MEATHOD: close ----------------------------------------------------------
+    def close(self):
+        """ Description: Frees every block"""
+        self.arrays = {}
+        self.sources = {}
+        for name in self.blocks:
+            release(self.blocks[name])
+        self.blocks = {}
+
+# FUNCTION: attach ------------------------------------------------------------
+def attach(spec, writeable=True, key=None):
+    """ Description: Returns the array of a spec made by Arena.put. Blocks
+                     stay attached for the life of the process, so a block
+                     is only mapped once.
+
+        Variables:
+        -spec: (block name, shape, dtype)
+        -writeable: False gives a read only view
+        -key: name the array is known by. A block attached before under
+              the same key is detached when the key gets another block,
+              so replaced blocks are not kept mapped.
+    """
+    name, shape, dtype = spec
+    if(key is not None):
+        old = KEYS.get(key)
+        if(old is not None and old != name and old in BLOCKS):
+            release(BLOCKS.pop(old), unlink=False)
+        KEYS[key] = name
+    if(name not in BLOCKS):
+        BLOCKS[name] = shared_memory.SharedMemory(name=name)
+    array = nu.ndarray(shape, dtype, buffer=BLOCKS[name].buf)
+    array.flags.writeable = writeable
+    return array
+
+# FUNCTION: release -----------------------------------------------------------
+def release(block, unlink=True):
+    """ Description: Closes and removes a shared block. A block that is
+                     still viewed cannot be closed, it is kept in VIEWED
+                     so it stays mapped while the views are used.
+
+        Variables:
+        -block: SharedMemory block
+        -unlink: False only closes the block, for blocks this process
+                 did not make
+    """
+    try:
+        block.close()
+    except BufferError:
+        VIEWED.append(block)
+    if(unlink):
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+#==============================================================================
+# END FILE
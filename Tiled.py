@@ -0,0 +1,526 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the tiled backend of the ecosystem simulation.
+    The world is split into slabs of whole rows, the tiles. Each tile owns
+    its rows of every grid and the animals standing in them, and the tiles
+    of a phase run at the same time on a pool of processes.
+    The grids and animal columns live in multiprocessing.shared_memory
+    (see Shared.py) for as long as the backend runs the ecosystem: the
+    ecosystem's own arrays are views of the shared blocks, so nothing is
+    copied between phases or hours. Only arrays the ecosystem replaces,
+    e.g. the animal columns after the dead are removed, are copied in
+    again. A task only names the blocks and its rows, and every worker
+    works on its slab and a halo of rows around it:
+        - updateScent: each tile spreads the scent of its slab and a halo
+          of SCENT_SPREAD rows, and writes its own rows into a second
+          buffer, so no tile reads a row another one has already changed.
+          The buffers swap every hour.
+        - moveHerbivores, moveCarnivores: each tile moves its own animals
+          in the coordinates of its slab. The halo holds every row an
+          animal can see or reach in the phase. Animals that step out of
+          a tile are handed over to the tile they land in.
+        - eat: herbivores eat on their own cells in their tile. Carnivores
+          hunt one at a time in population order, so they stay in the main
+          process, as do the daily phases.
+        - plantsAbsorb: each tile updates the plants of its rows
+    Every phase gives the same result as the numpy backend, so runs are
+    identical for a seed whatever the tiles and workers.
+    Usage:
+        backend = TiledBackend(tiles=8, workers=4)
+        eco = EcoSystem(config, backend=backend)
+        eco.runAWeek()
+        backend.close()                     # or when it is collected
+        eco = EcoSystem(config, backend='tiled')   # one tile per core
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.8, the first with multiprocessing.shared_memory
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import Ecosystem as sim
+import Backends as bk
+import Shared as sh
+import numpy as nu
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+#==============================================================================
+# PROGRAM CONSTANTS ___________________________________________________________
+FAUNA = ['fauna.' + name for name in\
+         ('energy', 'water', 'temp', 'y', 'x', 'species', 'alive')]
+PLANTS = ['plants.' + name for name in ('size', 'energy', 'water', 'alive')]
+WATER_FIELD = ['water_dist', 'water_step_y', 'water_step_x']
+
+# Arrays the phases only read. The ecosystem replaces them instead of
+# changing them, so they are copied in only when it holds a new array.
+INPUTS = ('light_grid', 'water_grid', 'temp_grid', 'draws') +\
+         tuple(WATER_FIELD)
+
+# Arrays the phases change, the ecosystem's arrays are views of the blocks
+STATE = tuple(FAUNA + PLANTS) +\
+        ('plant_grid', 'herbivore_grid', 'carnivore_grid', 'scent_grid')
+
+# Blocks the scent is spread between, the first holds scent_grid
+SCENT = ('scent_a', 'scent_b')
+SCENT_OUT = 'scent_out'         # Key of the buffer the tiles write into
+
+# Arrays every phase reads, EcoSystem attribute paths
+PHASES = {'moveHerbivores': FAUNA + WATER_FIELD +\
+                            ['draws', 'temp_grid', 'plant_grid'],
+          'moveCarnivores': FAUNA + WATER_FIELD +\
+                            ['draws', 'temp_grid', 'scent_grid'],
+          'eat': FAUNA + PLANTS + ['plant_grid'],
+          'updateScent': ['scent_grid', 'herbivore_grid', 'carnivore_grid'],
+          'plantsAbsorb': PLANTS[:3] + ['light_grid', 'water_grid']}
+
+ANIMAL_PHASES = ('moveHerbivores', 'moveCarnivores', 'eat')
+
+#==============================================================================
+# CLASS: TiledBackend +++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class TiledBackend(bk.Backend):
+    """ Description: Runs the hourly phases tile by tile on a process pool
+                     over shared memory. The daily phases run in the main
+                     process. One ecosystem uses the backend at a time: when
+                     another one runs, the arrays of the last one are copied
+                     out of the shared blocks first.
+
+        Variables:
+        -tiles: number of slabs of rows the world is split into
+        -workers: number of processes, 1 runs the tiles in this process
+        -arena: shared blocks of the arrays
+        -pool: process pool, None with one worker
+        -adopted: weak reference to the ecosystem whose arrays are views
+                  of the arena, shared with the finalizer
+        -members: row indices of the animals of every tile
+        -scent: arena names of the scent buffers, the current one first
+    """
+    name = 'tiled'
+
+    # MEATHOD: INIT -----------------------------------------------------------
+    def __init__(self, tiles=None, workers=None):
+        """ Description: Class constructor
+
+            Variables:
+            -tiles: number of slabs of rows, one per worker by default
+            -workers: number of processes, all cores by default
+        """
+        if(workers is None):
+            workers = os.cpu_count() or 1
+        if(tiles is None):
+            tiles = workers
+        self.tiles = int(tiles)
+        self.workers = workers
+        self.arena = sh.Arena()
+        self.pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        self.adopted = {'eco': None}
+        self.members = None
+        self.scent = list(SCENT)
+        self.finalizer = weakref.finalize(self, shutdown, self.pool,\
+                                          self.arena, self.adopted)
+
+    # MEATHOD: moveHerbivores -------------------------------------------------
+    def moveHerbivores(self, eco, idx=None):
+        """ Description: Every tile moves the herbivores standing in it
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the herbivores that move, all by default.
+                  A subset is moved by the numpy backend in this process.
+        """
+        if(idx is not None):
+            self.release()
+            bk.Backend.moveHerbivores(self, eco, idx)
+        else:
+            self.run(eco, 'moveHerbivores')
+
+    # MEATHOD: moveCarnivores -------------------------------------------------
+    def moveCarnivores(self, eco, idx=None):
+        """ Description: Every tile moves the carnivores standing in it
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the carnivores that move, all by default.
+                  A subset is moved by the numpy backend in this process.
+        """
+        if(idx is not None):
+            self.release()
+            bk.Backend.moveCarnivores(self, eco, idx)
+        else:
+            self.run(eco, 'moveCarnivores')
+
+    # MEATHOD: eat ------------------------------------------------------------
+    def eat(self, eco):
+        """ Description: Every tile has its herbivores eat, then carnivores
+                         hunt in population order and the eaten are removed
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        self.run(eco, 'eat')
+        eco.plants_near = None
+        eco.carnivoresEat()
+        eco.removeDead()
+
+    # MEATHOD: updateScent ----------------------------------------------------
+    def updateScent(self, eco):
+        """ Description: Every tile updates the scent of its rows
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        self.run(eco, 'updateScent')
+
+    # MEATHOD: plantsAbsorb ---------------------------------------------------
+    def plantsAbsorb(self, eco):
+        """ Description: Every tile updates the plants of its rows
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        self.run(eco, 'plantsAbsorb')
+
+    # MEATHOD: edges ----------------------------------------------------------
+    def edges(self, eco):
+        """ Description: Returns the first row of every tile, followed by
+                         the number of rows of the grid. There are never
+                         more tiles than rows.
+        """
+        tiles = min(self.tiles, eco.length)
+        return nu.linspace(0, eco.length, tiles + 1).astype(int)
+
+    # MEATHOD: halo -----------------------------------------------------------
+    def halo(self, eco, phase):
+        """ Description: Returns the rows a tile sees on each side of its
+                         own in a phase: the scent spread, the steps a
+                         carnivore takes, one for the herbivore Moore
+                         neighbourhood, and none when only the own cells
+                         are used
+        """
+        if(phase == 'updateScent'):
+            return eco.config.SCENT_SPREAD
+        if(phase == 'moveCarnivores'):
+            return max(1, eco.config.EXTRA_FOX_STEPS)
+        if(phase == 'moveHerbivores'):
+            return 1
+        return 0
+
+    # MEATHOD: adopt ----------------------------------------------------------
+    def adopt(self, eco, paths):
+        """ Description: Makes the ecosystem the one the backend runs. Its
+                         changing arrays become views of shared blocks,
+                         copied in only when it holds an array that is not
+                         a view already. The arrays it only reads are
+                         copied in when it holds a new one.
+
+            Variables:
+            -eco: ecosystem being simulated
+            -paths: arrays the phase reads
+
+            Output: dictionary of the arena name and spec of every shared
+                    array
+        """
+        if(self.adopted['eco'] is None or self.adopted['eco']() is not eco):
+            self.release()
+            self.adopted['eco'] = weakref.ref(eco)
+
+        specs = {}
+        for path in STATE:
+            name = self.scent[0] if path == 'scent_grid' else path
+            array = getPath(eco, path)
+            if(array is not self.arena.arrays.get(name)):
+                self.arena.put(name, array)
+                setPath(eco, path, self.arena.get(name))
+                if(path in FAUNA):
+                    self.members = None     # the rows of the animals changed
+            specs[path] = (name, self.arena.spec(name))
+        for path in INPUTS:
+            if(path in paths):
+                specs[path] = (path,\
+                               self.arena.put(path, getPath(eco, path), True))
+        return specs
+
+    # MEATHOD: release --------------------------------------------------------
+    def release(self):
+        """ Description: Copies the arrays of the adopted ecosystem out of
+                         the shared blocks, so it no longer uses them
+        """
+        eco = self.adopted['eco']() if self.adopted['eco'] else None
+        if(eco is not None):
+            release(eco, self.arena)
+        self.adopted['eco'] = None
+        self.members = None
+
+    # MEATHOD: tileMembers ----------------------------------------------------
+    def tileMembers(self, eco, edges):
+        """ Description: Returns the row indices of the animals of every
+                         tile, in population order. Made from the positions
+                         when the animal rows change, and kept up to date by
+                         the hand overs of the moves otherwise.
+        """
+        if(self.members is None or len(self.members) != len(edges) - 1):
+            tile = nu.searchsorted(edges, eco.fauna.y, 'right') - 1
+            order = nu.argsort(tile, kind='stable')
+            counts = nu.bincount(tile, minlength=len(edges) - 1)
+            self.members = nu.split(order, nu.cumsum(counts)[:-1])
+        return self.members
+
+    # MEATHOD: handOver -------------------------------------------------------
+    def handOver(self, results):
+        """ Description: Moves the animals that left a tile to the tile
+                         they landed in
+
+            Variables:
+            -results: results of the tiles, with the rows that left and
+                      their new tiles
+        """
+        arrivals = [[] for k in range(len(self.members))]
+        for k, result in enumerate(results):
+            rows, tiles = result['left']
+            if(len(rows) == 0):
+                continue
+            self.members[k] = self.members[k][nu.isin(self.members[k], rows,\
+                                                      invert=True)]
+            for tile in nu.unique(tiles):
+                arrivals[tile].append(rows[tiles == tile])
+        for k in range(len(arrivals)):
+            if(len(arrivals[k]) > 0):
+                self.members[k] = nu.sort(nu.concatenate([self.members[k]] +\
+                                                         arrivals[k]))
+
+    # MEATHOD: run ------------------------------------------------------------
+    def run(self, eco, phase):
+        """ Description: Runs a phase on every tile
+
+            Variables:
+            -eco: ecosystem being simulated
+            -phase: name of the phase (key of PHASES)
+        """
+        if(not self.finalizer.alive):
+            raise RuntimeError('the tiled backend is closed')
+        if(phase.startswith('move') and\
+           eco.water_field_version != eco.water_version):
+            eco.buildWaterField()
+
+        shared = self.adopt(eco, PHASES[phase])
+        specs = {path: shared[path] for path in PHASES[phase]}
+        if(phase == 'updateScent'):
+            specs[SCENT_OUT] = (self.scent[1],\
+                                self.arena.put(self.scent[1], eco.scent_grid,\
+                                               False, False))
+
+        edges = self.edges(eco)
+        halo = self.halo(eco, phase)
+        members = [None] * (len(edges) - 1)
+        if(phase in ANIMAL_PHASES):
+            members = self.tileMembers(eco, edges)
+        tasks = [(phase, k, edges, halo, specs, members[k], eco.config)\
+                 for k in range(len(edges) - 1)]
+        if(self.pool is None):
+            arrays = {path: self.arena.get(specs[path][0]) for path in specs}
+            results = [runTile(task, arrays) for task in tasks]
+        else:
+            results = list(self.pool.map(runTile, tasks))
+
+        if(phase.startswith('move')):
+            self.handOver(results)
+        if(phase == 'updateScent'):
+            eco.scent_grid = self.arena.get(self.scent[1])
+            self.scent.reverse()
+        for counters in results:
+            for k in range(len(eco.herbiMove)):
+                eco.herbiMove[k] += counters['herbiMove'][k]
+                eco.carniMove[k] += counters['carniMove'][k]
+            eco.timesDrunk += counters['timesDrunk']
+            eco.plantsEaten += counters['plantsEaten']
+
+    # MEATHOD: close ----------------------------------------------------------
+    def close(self):
+        """ Description: Copies the arrays of the ecosystem out of the
+                         shared blocks, stops the workers and frees the
+                         blocks. Done when the backend is collected too,
+                         the backend cannot run phases afterwards.
+        """
+        self.members = None
+        self.finalizer()
+
+# FUNCTION: release -----------------------------------------------------------
+def release(eco, arena):
+    """ Description: Replaces the arrays of an ecosystem that are views of
+                     the blocks of an arena by copies
+
+        Variables:
+        -eco: ecosystem
+        -arena: arena of the blocks
+    """
+    views = [arena.arrays[name] for name in arena.arrays]
+    for path in STATE:
+        array = getPath(eco, path)
+        if(any(array is view for view in views)):
+            setPath(eco, path, array.copy())
+
+# FUNCTION: shutdown ----------------------------------------------------------
+def shutdown(pool, arena, adopted):
+    """ Description: Finalizer of a backend: releases its ecosystem, stops
+                     the pool and frees the shared blocks
+
+        Variables:
+        -pool: process pool or None
+        -arena: shared blocks
+        -adopted: dictionary with the weak reference to the ecosystem
+    """
+    eco = adopted['eco']() if adopted['eco'] else None
+    if(eco is not None):
+        release(eco, arena)
+    adopted['eco'] = None
+    if(pool is not None):
+        pool.shutdown()
+    arena.close()
+
+#==============================================================================
+# WORKER FUNCTIONS ____________________________________________________________
+SHELLS = {}         # Empty ecosystem of every configuration
+BUFFERS = {}        # Scent buffers of every window shape
+
+# FUNCTION: runTile -----------------------------------------------------------
+def runTile(task, arrays=None):
+    """ Description: Runs a phase on one tile, in a worker process. The
+                     grids of the tile are its slab and halo, and the
+                     animals are moved in the coordinates of the slab.
+
+        Variables:
+        -task: tuple of (phase, tile number, first row of every tile,
+                         halo rows, arena name and spec of every array, row
+                         indices of the animals of the tile, config)
+        -arrays: the shared arrays of the specs, attached when not given
+
+        Output: dictionary of the counters the tile added to, and the rows
+                of the animals that left the tile with their new tiles
+    """
+    phase, number, edges, halo, specs, members, config = task
+    if(arrays is None):
+        arrays = {path: sh.attach(specs[path][1], key=specs[path][0])\
+                  for path in specs}
+    top = int(edges[number])
+    bottom = int(edges[number + 1])
+    low = max(top - halo, 0)
+    high = min(bottom + halo, config.GRID_Y)
+
+    eco = shell(config)
+    eco.length = high - low
+    for path in arrays:
+        if(path in FAUNA or path == 'draws'):
+            setPath(eco, path, arrays[path])
+        elif(path != SCENT_OUT):
+            setPath(eco, path, arrays[path][low:high])
+    left = (nu.zeros(0, dtype=int), nu.zeros(0, dtype=int))
+
+    try:
+        if(phase == 'updateScent'):
+            #The slab is spread as a small grid, its own rows are kept
+            eco.scent_grid = eco.scent_grid.copy()
+            eco.scent_buffers = buffers(eco.scent_grid.shape,\
+                                        eco.scent_grid.dtype)
+            eco.updateScent()
+            arrays[SCENT_OUT][top:bottom] =\
+                eco.scent_grid[top - low:bottom - low]
+        elif(phase == 'plantsAbsorb'):
+            eco.plantsAbsorb()
+        else:
+            moved = moveTile(eco, phase, members, low)
+            tile = nu.searchsorted(edges, eco.fauna.y[moved], 'right') - 1
+            left = (moved[tile != number], tile[tile != number])
+        return {'herbiMove': eco.herbiMove, 'carniMove': eco.carniMove,\
+                'timesDrunk': eco.timesDrunk,\
+                'plantsEaten': eco.plantsEaten, 'left': left}
+    finally:
+        for path in arrays:
+            if(path != SCENT_OUT):
+                setPath(eco, path, None)    # the shell keeps no views
+
+# FUNCTION: moveTile ----------------------------------------------------------
+def moveTile(eco, phase, members, low):
+    """ Description: Runs an animal phase on the animals of a tile. Their
+                     rows are shifted into the slab while it runs.
+
+        Variables:
+        -eco: shell of the tile
+        -phase: name of the phase
+        -members: row indices of the animals of the tile
+        -low: first row of the slab
+
+        Output: row indices of the animals that changed rows
+    """
+    fauna = eco.fauna
+    members = members[fauna.alive[members]]
+    carnivore = fauna.stat('carnivore', members).astype(bool)
+    start = fauna.y[members]
+    fauna.y[members] -= low
+    eco.plants_near = None
+    try:
+        if(phase == 'moveHerbivores'):
+            NUMPY.moveHerbivores(eco, members[nu.logical_not(carnivore)])
+        elif(phase == 'moveCarnivores'):
+            NUMPY.moveCarnivores(eco, members[carnivore])
+        else:
+            eco.herbivoresEat(members[nu.logical_not(carnivore)])
+    finally:
+        fauna.y[members] += low
+    return members[fauna.y[members] != start]
+
+# FUNCTION: shell -------------------------------------------------------------
+def shell(config):
+    """ Description: Returns an empty ecosystem of a configuration with its
+                     counters set to zero. The arrays of a task are put
+                     into it before the phase runs.
+    """
+    if(config not in SHELLS):
+        eco = sim.EcoSystem(config, generate=False)
+        eco.rng = None      # tiles never draw random numbers
+        eco.water_version = 0
+        eco.water_field_version = 0
+        SHELLS[config] = eco
+    eco = SHELLS[config]
+    eco.length = config.GRID_Y
+    eco.width = config.GRID_X
+    eco.herbiMove = [0, 0, 0, 0]
+    eco.carniMove = [0, 0, 0, 0]
+    eco.timesDrunk = 0
+    eco.plantsEaten = 0
+    return eco
+
+# FUNCTION: buffers -----------------------------------------------------------
+def buffers(shape, dtype):
+    """ Description: Returns the scent buffers of a window shape"""
+    key = (shape, dtype.str)
+    if(key not in BUFFERS):
+        BUFFERS[key] = [nu.zeros(shape, dtype) for i in range(4)]
+    return BUFFERS[key]
+
+# FUNCTION: getPath -----------------------------------------------------------
+def getPath(obj, path):
+    """ Description: Gets an attribute by dotted path, e.g. 'fauna.y'"""
+    for name in path.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+# FUNCTION: setPath -----------------------------------------------------------
+def setPath(obj, path, value):
+    """ Description: Sets an attribute by dotted path, e.g. 'fauna.y'"""
+    names = path.split('.')
+    for name in names[:-1]:
+        obj = getattr(obj, name)
+    setattr(obj, names[-1], value)
+
+# Numpy backend the tiles run the animal phases with
+NUMPY = bk.Backend()
+
+#==============================================================================
+# END FILE
@@ -0,0 +1,230 @@
+# START FILE
+#==============================================================================
+# GENERAL DOCUMENTATION _______________________________________________________
+""" This file contains the phase timer of the ecosystem simulation.
+    The timer measures every phase of runADay: the hourly movement, eating,
+    scent and absorption phases and each of the end of day phases. The
+    report gives the total, mean and percentiles of every phase.
+    Timing is off unless a timer is given to the ecosystem, and costs
+    nothing when it is off:
+        eco.timer = PhaseTimer()
+        eco.runAWeek()
+        print(eco.timer.format())
+    See code documentation for specifics on code functionality
+"""
+
+# ADDITIONAL DOCUMENTATION ____________________________________________________
+#Authors: Christian Rahmel, William Taing, Morgan Du Bois
+
+# Notes:
+# - Written for Python 3.7
+# - Documentation style inspired by CSS 458 professor Johnny Lin
+
+#==============================================================================
+# PROGRAM IMPORTS _____________________________________________________________
+import numpy as nu
+import time
+
+#==============================================================================
+# PROGRAM CONSTANTS ___________________________________________________________
+PERCENTILES = (50, 90, 99)      # Percentiles of the report
+DAY = 'runADay'                 # Name of the whole day in the report
+
+#==============================================================================
+# CLASS: PhaseTimer +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class PhaseTimer:
+    """ Description: Collects the time of every call of every phase
+
+        Variables:
+        -samples: seconds of every call, keyed by phase name in the order
+                  the phases first ran
+
+        Methods: clock() - Current time in seconds
+                 add() - Adds the time of one call of a phase
+                 time() - Calls a function and adds its time to a phase
+                 wrap() - Backend whose phases are timed
+                 reset() - Forgets every time
+                 report() - Statistics of every phase
+                 format() - The report as a table
+    """
+
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self):
+        """ Description: Class constructor"""
+        self.samples = {}
+        self.clock = time.perf_counter
+
+    # MEATHOD: add ------------------------------------------------------------
+    def add(self, name, seconds):
+        """ Description: Adds the time of one call of a phase
+
+            Variables:
+            -name: name of the phase
+            -seconds: time the call took
+        """
+        if(name not in self.samples):
+            self.samples[name] = []
+        self.samples[name].append(seconds)
+
+    # MEATHOD: time -----------------------------------------------------------
+    def time(self, name, function, *args):
+        """ Description: Calls a function and adds its time to a phase
+
+            Variables:
+            -name: name of the phase
+            -function: function that is called
+            -args: arguments of the function
+
+            Output: the result of the function
+        """
+        start = self.clock()
+        result = function(*args)
+        self.add(name, self.clock() - start)
+        return result
+
+    # MEATHOD: wrap -----------------------------------------------------------
+    def wrap(self, backend):
+        """ Description: Returns a backend that times the phases of backend
+
+            Variables:
+            -backend: backend of the ecosystem
+        """
+        return TimedBackend(backend, self)
+
+    # MEATHOD: reset ----------------------------------------------------------
+    def reset(self):
+        """ Description: Forgets every time"""
+        self.samples = {}
+
+    # MEATHOD: report ---------------------------------------------------------
+    def report(self):
+        """ Description: Statistics of every phase. The share is the part of
+                         the time of the whole days spent in the phase.
+
+            Output: dictionary keyed by phase of dictionaries with calls,
+                    total, mean, max, share and p50, p90, p99 in seconds
+        """
+        days = sum(self.samples.get(DAY, []))
+        report = {}
+        for name in self.samples:
+            seconds = nu.array(self.samples[name])
+            stats = {'calls': len(seconds), 'total': float(seconds.sum()),\
+                     'mean': float(seconds.mean()),\
+                     'max': float(seconds.max())}
+            for p, value in zip(PERCENTILES,\
+                                nu.percentile(seconds, PERCENTILES)):
+                stats['p%d' % p] = float(value)
+            stats['share'] = stats['total'] / days if days > 0 else nu.nan
+            report[name] = stats
+        return report
+
+    # MEATHOD: format ---------------------------------------------------------
+    def format(self):
+        """ Description: Returns the report as a table, times in milliseconds
+        """
+        report = self.report()
+        lines = ['%-18s %7s %10s %9s' % ('phase', 'calls', 'total ms',\
+                                        'mean ms') +\
+                 ''.join('%9s' % ('p%d ms' % p) for p in PERCENTILES) +\
+                 '%8s' % 'share']
+        for name in report:
+            stats = report[name]
+            lines.append('%-18s %7d %10.2f %9.3f' % (name, stats['calls'],\
+                         1000 * stats['total'], 1000 * stats['mean']) +\
+                         ''.join('%9.3f' % (1000 * stats['p%d' % p])\
+                                 for p in PERCENTILES) +\
+                         '%7.1f%%' % (100 * stats['share']))
+        return '\n'.join(lines)
+
+# CLASS: TimedBackend +++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class TimedBackend:
+    """ Description: Runs the phases of a backend and times each of them.
+                     The end of day is timed one daily phase at a time
+                     (see Backends.DAILY), work a backend does outside of
+                     them is only part of the time of the whole day.
+
+        Variables:
+        -backend: backend that computes the phases
+        -timer: PhaseTimer the times are added to
+    """
+
+    # MEATHOD: init -----------------------------------------------------------
+    def __init__(self, backend, timer):
+        """ Description: Class constructor
+
+            Variables:
+            -backend: backend that computes the phases
+            -timer: PhaseTimer the times are added to
+        """
+        self.backend = backend
+        self.timer = timer
+
+    # MEATHOD: moveHerbivores -------------------------------------------------
+    def moveHerbivores(self, eco, idx=None):
+        """ Description: Times the herbivore movement of the backend
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the herbivores that move, all by default
+        """
+        self.timer.time('moveHerbivores', self.backend.moveHerbivores, eco,\
+                        idx)
+
+    # MEATHOD: moveCarnivores -------------------------------------------------
+    def moveCarnivores(self, eco, idx=None):
+        """ Description: Times the carnivore movement of the backend
+
+            Variables:
+            -eco: ecosystem being simulated
+            -idx: row indices of the carnivores that move, all by default
+        """
+        self.timer.time('moveCarnivores', self.backend.moveCarnivores, eco,\
+                        idx)
+
+    # MEATHOD: eat ------------------------------------------------------------
+    def eat(self, eco):
+        """ Description: Times the eating phase of the backend
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        self.timer.time('animalsEat', self.backend.eat, eco)
+
+    # MEATHOD: updateScent ----------------------------------------------------
+    def updateScent(self, eco):
+        """ Description: Times the scent update of the backend
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        self.timer.time('updateScent', self.backend.updateScent, eco)
+
+    # MEATHOD: plantsAbsorb ---------------------------------------------------
+    def plantsAbsorb(self, eco):
+        """ Description: Times the plant absorption of the backend
+
+            Variables:
+            -eco: ecosystem being simulated
+        """
+        self.timer.time('plantsAbsorb', self.backend.plantsAbsorb, eco)
+
+    # MEATHOD: endOfDay -------------------------------------------------------
+    def endOfDay(self, eco, phase=None):
+        """ Description: Runs the end of day of the backend, timing every
+                         daily phase (Backends.DAILY) through its phase
+                         hook
+
+            Variables:
+            -eco: ecosystem being simulated
+            -phase: phase hook of the caller, each phase runs through it
+                    inside the timing
+        """
+        if(phase is None):
+            timed = self.timer.time
+        else:
+            timed = lambda name, function:\
+                    self.timer.time(name, phase, name, function)
+        self.backend.endOfDay(eco, timed)
+
+#==============================================================================
+# END FILE
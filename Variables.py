@@ -4,8 +4,8 @@
 """ This file contains constants used in the ecosystem simulation.
     The current values associated with the variables are the default values
     that the simulation uses.
-    These variables can be modified safely and returned to their default values
-    after use when used in the Analysis.py file.
+    A simulation reads them through a SimConfig (see Config.py), which can
+    change any of them for one simulation without modifying this module.
     See code documentation for specifics on code functionality
 """
 
@@ -28,6 +28,12 @@
 # ECOSYSTEM FILE
 GRID_X = 50                     # Grid length
 GRID_Y = 50                     # Grid Width
+REGION_SIZE = 50                # Size of the area the ponds, lake and
+                                # clouds are laid out for, larger grids
+                                # repeat the layout once per region
+FIELD_DTYPE = 'float64'         # Precision of the light, water, temp and
+                                # scent grids, 'float32' halves their
+                                # memory on large grids
 
 # Sim execution itterations
 NUM_SIMS = 5                    # Number of Sims to run for each 